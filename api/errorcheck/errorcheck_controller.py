@@ -1,10 +1,12 @@
 from fastapi import APIRouter
 
+from configs.routing import db_free
 from exceptions.app_exception import ConflictError
 
 router = APIRouter()
 
 @router.get("/conflict")
+@db_free
 def health_check_error_test():
     """
     Endpoint này cố tình gây ra lỗi để kiểm tra exception handler.
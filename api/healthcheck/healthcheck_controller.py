@@ -1,8 +1,15 @@
+from http import HTTPStatus
+
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
+
+from configs.routing import db_free
+from utils.health import health_report
 
 router = APIRouter()
 
 @router.get("/")
+@db_free
 def health_check_root():
     """
     Endpoint cơ bản để kiểm tra sức khỏe.
@@ -11,15 +18,31 @@ def health_check_root():
     # Ví dụ: user_email = request.state.user.email
     return "Health check is OK!"
 
+@router.get("/live")
+@db_free
+def health_check_live():
+    """
+    Liveness probe: chỉ xác nhận process còn phản hồi, không kiểm tra dịch vụ nào.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+@db_free
+async def health_check_ready():
+    """
+    Readiness probe: chạy song song các kiểm tra (database, pool, cache), mỗi kiểm tra
+    có timeout riêng. Kết quả được cache trong HEALTH_CACHE_TTL giây.
+    Trả về 503 khi có kiểm tra thất bại; trạng thái "warn" (dịch vụ suy giảm, ví dụ
+    một replica không phản hồi) vẫn trả về 200.
+    """
+    report = await health_report.get()
+    status_code = HTTPStatus.SERVICE_UNAVAILABLE if report["status"] == "fail" else HTTPStatus.OK
+    return ORJSONResponse(content=report, status_code=status_code)
+
 @router.get("/details")
-def health_check_details():
+@db_free
+async def health_check_details():
     """
-    Endpoint trả về thông tin chi tiết hơn.
+    Endpoint trả về thông tin chi tiết hơn: trạng thái và độ trễ (ms) của từng kiểm tra.
     """
-    return {
-        "status": "Healthy",
-        "services": {
-            "database": "Connected",
-            "cache": "Connected"
-        }
-    }
+    return await health_report.get()
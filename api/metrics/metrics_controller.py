@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from configs.routing import db_free
+from utils.metrics import registry
+
+router = APIRouter()
+
+@router.get("/", response_class=PlainTextResponse)
+@db_free
+def metrics():
+    """
+    Endpoint trả về metrics theo định dạng Prometheus.
+    """
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
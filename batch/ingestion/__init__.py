@@ -0,0 +1,4 @@
+from batch.ingestion.checkpoint import Checkpoint
+from batch.ingestion.pipeline import IngestionPipeline, IngestionStats
+from batch.ingestion.readers import read_csv, read_rows, read_xlsx
+from batch.ingestion.validation import RowValidationError, RowValidator
@@ -0,0 +1,42 @@
+"""
+Loads a CSV/XLSX file into a table with COPY.
+
+> python -m batch.ingestion data.xlsx --table data_facility_one --columns code,name,value
+"""
+import argparse
+
+from batch.ingestion.pipeline import DEFAULT_CHUNK_SIZE, IngestionPipeline
+from batch.ingestion.validation import RowValidator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", help="CSV or XLSX file")
+    parser.add_argument("--table", required=True, help="target table ([schema.]table)")
+    parser.add_argument("--columns", required=True, help="comma separated target columns, matching the file header")
+    parser.add_argument("--required", default="", help="comma separated NOT NULL columns")
+    parser.add_argument("--sheet", default=None, help="XLSX sheet name")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--no-resume", action="store_true",
+        help="load the whole file, ignoring the progress recorded in ingestion_checkpoint",
+    )
+    parser.add_argument("--rejects", default=None, help="CSV file receiving the rejected rows")
+    args = parser.parse_args()
+
+    columns = [column.strip() for column in args.columns.split(",") if column.strip()]
+    required = {column.strip() for column in args.required.split(",") if column.strip()}
+
+    pipeline = IngestionPipeline(
+        table=args.table,
+        columns=columns,
+        validator=RowValidator(columns, required=required),
+        chunk_size=args.chunk_size,
+        resume=not args.no_resume,
+        rejects_path=args.rejects,
+    )
+    print(pipeline.run(args.path, args.sheet))
+
+
+if __name__ == "__main__":
+    main()
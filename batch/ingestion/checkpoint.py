@@ -0,0 +1,69 @@
+import json
+import os
+
+# created by the alembic revision ver0_init
+CHECKPOINT_TABLE = "ingestion_checkpoint"
+
+_SAVE_SQL = f"""
+INSERT INTO {CHECKPOINT_TABLE} (source, target, signature, rows_done)
+VALUES (%s, %s, %s, %s)
+ON CONFLICT (source, target)
+DO UPDATE SET signature = EXCLUDED.signature, rows_done = EXCLUDED.rows_done, updated_at = now()
+"""
+
+
+class Checkpoint:
+    """
+    Progress of one source file into one table, stored in the database.
+
+    save() runs on the connection loading the chunk, before its commit: the
+    rows and the progress are committed together, so a resume never loads a
+    committed chunk twice (COPY has no conflict handling).
+    """
+
+    def __init__(self, source: str, target: str):
+        self.source = os.path.abspath(source)
+        self.target = target
+        stat = os.stat(self.source)
+        self.signature = json.dumps({"size": stat.st_size, "mtime": int(stat.st_mtime)})
+
+    def load(self, connection) -> int:
+        """
+        Returns the number of source rows already processed, 0 when there is
+        no checkpoint or it belongs to a different version of the file.
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f"SELECT signature, rows_done FROM {CHECKPOINT_TABLE} WHERE source = %s AND target = %s",
+                (self.source, self.target),
+            )
+            row = cursor.fetchone()
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        if row is None or row[0] != self.signature:
+            return 0
+        return int(row[1])
+
+    def save(self, cursor, rows_done: int) -> None:
+        """Records the progress in the current transaction of the cursor, the caller commits."""
+        cursor.execute(_SAVE_SQL, (self.source, self.target, self.signature, rows_done))
+
+    def clear(self, connection) -> None:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f"DELETE FROM {CHECKPOINT_TABLE} WHERE source = %s AND target = %s",
+                (self.source, self.target),
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
@@ -0,0 +1,225 @@
+import csv
+import io
+import time
+from datetime import date, datetime, time as dt_time
+from itertools import islice
+from typing import Any, Callable, Iterator
+
+from configs.logging_conf import logger
+from batch.ingestion.checkpoint import Checkpoint
+from batch.ingestion.readers import read_rows
+from batch.ingestion.validation import RowValidationError, RowValidator
+
+DEFAULT_CHUNK_SIZE = 10000
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value: Any) -> str:
+    """Returns the COPY text format representation of a value."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    return str(value).translate(_COPY_ESCAPES)
+
+
+class StageStats:
+    """Rows and wall time of one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.seconds = 0.0
+
+    def add(self, rows: int, seconds: float) -> None:
+        self.rows += rows
+        self.seconds += seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.rows} rows in {self.seconds:.2f}s ({self.rows_per_second:.0f} rows/s)"
+
+
+class IngestionStats:
+    def __init__(self):
+        self.read = StageStats("read")
+        self.validate = StageStats("validate")
+        self.copy = StageStats("copy")
+        self.skipped = 0
+        self.rejected = 0
+        self.chunks = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.chunks} chunks, {self.skipped} rows resumed, {self.rejected} rows rejected | "
+            f"{self.read} | {self.validate} | {self.copy}"
+        )
+
+
+class IngestionPipeline:
+    """
+    Streams a CSV/XLSX file through validation into `COPY ... FROM STDIN`.
+
+    Rows are processed chunk_size at a time; every chunk is committed on its
+    own together with the checkpoint (the ingestion_checkpoint table), so an
+    interrupted load resumes after the last committed chunk without loading
+    any row twice. The rejected rows of a chunk are appended to rejects_path
+    once it is committed. Memory is bounded by one chunk.
+
+    The checkpoint table is created by the alembic migrations
+    (alembic upgrade head).
+    """
+
+    def __init__(
+        self,
+        table: str,
+        columns: list[str],
+        validator: RowValidator | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        resume: bool = True,
+        rejects_path: str | None = None,
+        connection_factory: Callable[[], Any] | None = None,
+    ):
+        self.table = table
+        self.columns = columns
+        self.validator = validator or RowValidator(columns)
+        self.chunk_size = chunk_size
+        self.resume = resume
+        self.rejects_path = rejects_path
+        self.connection_factory = connection_factory
+
+    def _connect(self):
+        if self.connection_factory is not None:
+            return self.connection_factory()
+
+        from configs.database import engine
+
+        return engine.raw_connection()
+
+    def _copy_sql(self, cursor) -> str:
+        from psycopg2 import sql
+
+        return sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(*self.table.split(".")),
+            sql.SQL(", ").join(sql.Identifier(column) for column in self.columns),
+        ).as_string(cursor)
+
+    def _chunks(self, rows: Iterator[tuple], stats: IngestionStats) -> Iterator[list[tuple]]:
+        while True:
+            start = time.perf_counter()
+            chunk = list(islice(rows, self.chunk_size))
+            stats.read.add(len(chunk), time.perf_counter() - start)
+            if not chunk:
+                return
+            yield chunk
+
+    def _validate(
+        self, chunk: list[tuple], offset: int, stats: IngestionStats
+    ) -> tuple[list[tuple], list[list]]:
+        """
+        Returns the valid rows of the chunk and its rejects file lines.
+
+        :param chunk: The source rows.
+        :param offset: The source rows before the chunk.
+        :param stats: The pipeline statistics.
+        :return: The valid rows and the [row number, error, *row] rejects.
+        """
+        start = time.perf_counter()
+        valid, rejected = [], []
+        for number, row in enumerate(chunk, start=offset + 1):
+            try:
+                valid.append(self.validator(row))
+            except (RowValidationError, ValueError) as e:
+                rejected.append([number, str(e), *row])
+        stats.rejected += len(rejected)
+        stats.validate.add(len(chunk), time.perf_counter() - start)
+        return valid, rejected
+
+    def _copy(
+        self,
+        connection,
+        rows: list[tuple],
+        stats: IngestionStats,
+        checkpoint: Checkpoint,
+        done: int,
+    ) -> None:
+        """
+        Loads the rows of a chunk and commits them with the checkpoint.
+
+        :param connection: The DBAPI connection.
+        :param rows: The valid rows of the chunk, may be empty.
+        :param stats: The pipeline statistics.
+        :param checkpoint: The checkpoint of the load.
+        :param done: The source rows processed once the chunk is committed.
+        """
+        start = time.perf_counter()
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(value) for value in row))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        cursor = connection.cursor()
+        try:
+            if rows:
+                cursor.copy_expert(self._copy_sql(cursor), buffer)
+            checkpoint.save(cursor, done)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        stats.copy.add(len(rows), time.perf_counter() - start)
+
+    def run(self, path: str, sheet: str | None = None) -> IngestionStats:
+        """
+        Loads the file, resuming from its checkpoint when there is one.
+
+        :param path: The CSV/XLSX file path.
+        :param sheet: The XLSX sheet name.
+        :return: The per stage statistics.
+        """
+        stats = IngestionStats()
+        header, rows = read_rows(path, sheet)
+        self.validator.bind(header)
+
+        checkpoint = Checkpoint(path, self.table)
+        rejects_file = open(self.rejects_path, "a", encoding="utf-8", newline="") if self.rejects_path else None
+        rejects = csv.writer(rejects_file) if rejects_file else None
+        connection = self._connect()
+        try:
+            done = checkpoint.load(connection)
+            if done and not self.resume:
+                logger.info(f">>>>>> Ignoring the checkpoint of {path} ({done} rows)")
+                done = 0
+            if done:
+                stats.skipped = sum(1 for _ in islice(rows, done))
+                logger.info(f">>>>>> Resuming {path} after {done} rows")
+
+            for chunk in self._chunks(rows, stats):
+                valid, rejected = self._validate(chunk, done, stats)
+                done += len(chunk)
+                self._copy(connection, valid, stats, checkpoint, done)
+                # written once the chunk is committed: a resumed load does not
+                # reject the rows of a rolled back chunk twice
+                if rejects is not None:
+                    rejects.writerows(rejected)
+                    rejects_file.flush()
+                stats.chunks += 1
+                logger.info(f">>>>>> {self.table}: {done} rows processed | {stats}")
+
+            checkpoint.clear(connection)
+        finally:
+            connection.close()
+            if rejects_file:
+                rejects_file.close()
+
+        logger.info(f">>>>>> {self.table}: finished {path} | {stats}")
+        return stats
@@ -0,0 +1,65 @@
+import csv
+import os
+from typing import Iterator
+
+Row = tuple
+
+
+def read_csv(path: str, encoding: str = "utf-8-sig") -> tuple[list[str], Iterator[Row]]:
+    """
+    Streams a CSV file row by row.
+
+    :param path: The CSV file path.
+    :param encoding: The file encoding (utf-8-sig also accepts a BOM).
+    :return: The header and an iterator of the data rows.
+    """
+    file = open(path, "r", encoding=encoding, newline="")
+    reader = csv.reader(file)
+    header = [name.strip() for name in next(reader, [])]
+
+    def rows() -> Iterator[Row]:
+        try:
+            for row in reader:
+                if row:
+                    yield tuple(row)
+        finally:
+            file.close()
+
+    return header, rows()
+
+
+def read_xlsx(path: str, sheet: str | None = None) -> tuple[list[str], Iterator[Row]]:
+    """
+    Streams an XLSX sheet row by row with openpyxl read-only mode, which does
+    not load the whole sheet in memory.
+
+    :param path: The XLSX file path.
+    :param sheet: The sheet name, the active sheet by default.
+    :return: The header and an iterator of the data rows.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    worksheet = workbook[sheet] if sheet else workbook.active
+    iterator = worksheet.iter_rows(values_only=True)
+    header = [str(name).strip() if name is not None else "" for name in next(iterator, ())]
+
+    def rows() -> Iterator[Row]:
+        try:
+            for row in iterator:
+                if any(value is not None for value in row):
+                    yield row
+        finally:
+            workbook.close()
+
+    return header, rows()
+
+
+def read_rows(path: str, sheet: str | None = None) -> tuple[list[str], Iterator[Row]]:
+    """Streams a CSV or XLSX file depending on its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        return read_xlsx(path, sheet)
+    if extension in (".csv", ".txt"):
+        return read_csv(path)
+    raise ValueError(f"Unsupported file type: {extension}")
@@ -0,0 +1,54 @@
+from typing import Any, Callable
+
+
+class RowValidationError(ValueError):
+    """Raised by a validator for a row that must not be loaded."""
+
+
+# a field check receives the (already stripped) value and returns the value to load
+FieldCheck = Callable[[Any], Any]
+
+
+class RowValidator:
+    """
+    Validates and normalizes source rows into the target column order.
+
+    Strings are stripped and empty strings become NULL. Optional per-column
+    checks can convert values or raise RowValidationError.
+    """
+
+    def __init__(
+        self,
+        columns: list[str],
+        required: set[str] | None = None,
+        checks: dict[str, FieldCheck] | None = None,
+    ):
+        self.columns = columns
+        self.required = required or set()
+        self.checks = checks or {}
+
+    def bind(self, header: list[str]) -> None:
+        """
+        Resolves the position of every target column in the source header.
+
+        :param header: The source header.
+        :raises RowValidationError: If a target column is missing.
+        """
+        missing = [column for column in self.columns if column not in header]
+        if missing:
+            raise RowValidationError(f"Missing columns: {', '.join(missing)}")
+        self._positions = [header.index(column) for column in self.columns]
+
+    def __call__(self, row: tuple) -> tuple:
+        values = []
+        for column, position in zip(self.columns, self._positions):
+            value = row[position] if position < len(row) else None
+            if isinstance(value, str):
+                value = value.strip() or None
+            if value is None and column in self.required:
+                raise RowValidationError(f"{column} is required.")
+            check = self.checks.get(column)
+            if check is not None and value is not None:
+                value = check(value)
+            values.append(value)
+        return tuple(values)
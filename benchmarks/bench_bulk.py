@@ -0,0 +1,104 @@
+"""
+Rows-per-second benchmark of the BaseRepository write paths against a local
+Postgres (the DATABASE_* settings).
+
+Compares create() in a loop with bulk_create, upsert and bulk_update on a
+temporary table that is dropped afterwards.
+
+Usage (from the project root, with a .env pointing to a disposable database):
+
+> python -m benchmarks.bench_bulk --rows 20000
+"""
+import argparse
+import time
+
+from sqlalchemy import Column, Integer, Numeric, String
+from sqlalchemy.orm import declarative_base
+
+from configs.database import SessionLocal, engine
+from repositories.base_repository import BaseRepository
+
+Base = declarative_base()
+
+
+class BenchBulkRow(Base):
+    __tablename__ = "bench_bulk_row"
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String(20), unique=True, nullable=False)
+    name = Column(String(200))
+    value = Column(Numeric(12, 3))
+
+
+class BenchBulkRowRepository(BaseRepository[BenchBulkRow]):
+    model = BenchBulkRow
+
+
+def make_rows(count: int, offset: int = 0) -> list[dict]:
+    return [
+        {"code": f"C{i + offset:09d}", "name": f"row {i}", "value": i / 10}
+        for i in range(count)
+    ]
+
+
+def timed(label: str, count: int, func) -> None:
+    session = SessionLocal()
+    try:
+        repository = BenchBulkRowRepository(session)
+        start = time.perf_counter()
+        func(repository)
+        session.commit()
+        elapsed = time.perf_counter() - start
+    finally:
+        session.close()
+    print(f"{label:>22}: {count / elapsed:10.0f} rows/s  ({elapsed:.2f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+    count = args.rows
+
+    # keep statement echo out of the measurement
+    engine.echo = False
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    try:
+        def create_loop(repository):
+            for row in make_rows(count):
+                repository.create(row)
+
+        timed("create() loop", count, create_loop)
+        timed(
+            "bulk_create",
+            count,
+            lambda repository: repository.bulk_create(make_rows(count, count)),
+        )
+        timed(
+            "bulk_create + ids",
+            count,
+            lambda repository: repository.bulk_create(make_rows(count, 2 * count), return_ids=True),
+        )
+        # half conflicting, half new rows
+        timed(
+            "upsert",
+            count,
+            lambda repository: repository.upsert(
+                make_rows(count, 2 * count + count // 2), conflict_keys=["code"], return_ids=True
+            ),
+        )
+        timed(
+            "bulk_update",
+            count,
+            lambda repository: repository.bulk_update(
+                {"id": i + 1, "name": "updated"} for i in range(count)
+            ),
+        )
+    finally:
+        Base.metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Cost of building failed responses.
+
+Compares the previous response_fail (dict envelope encoded by JSONResponse,
+"before") with the compiled error catalog ("after"), for a fixed message, a
+parameterized message and a batch of validation errors. Exception creation
+is included in both.
+
+Usage (from the project root, with a .env or the environment configured):
+
+> python -m benchmarks.bench_errors --iterations 50000
+"""
+import argparse
+import time
+
+from fastapi.responses import JSONResponse
+
+from exceptions.app_exception import MaxLengthError, RequiredError, Unauthorized, ValidationErrors
+from utils.response import response_fail
+
+
+def legacy_response_fail(exc):
+    errors = getattr(exc, "errors", None) or [exc]
+    return JSONResponse(
+        content={
+            "success": False,
+            "data": None,
+            "errors": [{"code": e.error_code, "message": e.message} for e in errors],
+        },
+        status_code=exc.http_code,
+    )
+
+
+CASES = {
+    "fixed": Unauthorized,
+    "parameterized": lambda: MaxLengthError("facility_name", 200),
+    "batch of 10": lambda: ValidationErrors([RequiredError(f"field_{i}") for i in range(10)]),
+}
+
+
+def timed(func, make_exception, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(make_exception())
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    for label, make_exception in CASES.items():
+        assert legacy_response_fail(make_exception()).body == response_fail(make_exception()).body
+        before = timed(legacy_response_fail, make_exception, args.iterations)
+        after = timed(response_fail, make_exception, args.iterations)
+        print(f"{label:>14}: before {before:6.2f} us  after {after:6.2f} us  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Memory and throughput of the XLSX export.
+
+Compares a normal openpyxl Workbook filled from a fully loaded result
+(get_all, "before") with utils.excel_export writing streamed rows
+(BaseRepository.stream, "after") into a write-only workbook. Rows are built
+in memory, the database is not involved. Every case runs in its own process
+and reports its peak RSS.
+
+Usage (from the project root, with a .env or the environment configured):
+
+> python -m benchmarks.bench_excel_export --rows 100000 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import Boolean, Column, Date, DateTime, Integer, Numeric, String
+from sqlalchemy.orm import declarative_base
+
+from utils.excel_export import columns_for_model, write_xlsx
+
+Base = declarative_base()
+
+
+class BenchFacility(Base):
+    __tablename__ = "bench_facility"
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String(20))
+    name = Column(String(200))
+    capacity = Column(Numeric(12, 3))
+    active = Column(Boolean)
+    opened_on = Column(Date)
+    created_at = Column(DateTime)
+    note = Column(String(500))
+
+
+def iter_rows(count: int):
+    now = datetime(2024, 1, 1, 8, 30, 15)
+    for i in range(count):
+        yield BenchFacility(
+            id=i,
+            code=f"FAC-{i:07d}",
+            name=f"Facility number {i}",
+            capacity=Decimal(i) / 7,
+            active=i % 2 == 0,
+            opened_on=date(2020, 1, 1) + timedelta(days=i % 1000),
+            created_at=now + timedelta(minutes=i),
+            note=None if i % 3 else "ほげ",
+        )
+
+
+def before(count: int) -> str:
+    from openpyxl import Workbook
+
+    rows = list(iter_rows(count))
+    columns = columns_for_model(BenchFacility)
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append([column.key for column in columns])
+    for row in rows:
+        worksheet.append([getattr(row, column.key) for column in columns])
+    path = f"bench-before-{os.getpid()}.xlsx"
+    workbook.save(path)
+    return path
+
+
+def after(count: int) -> str:
+    path, _ = write_xlsx(iter_rows(count), columns_for_model(BenchFacility))
+    return path
+
+
+def run_case(case: str, count: int) -> None:
+    start = time.perf_counter()
+    path = {"before": before, "after": after}[case](count)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    os.remove(path)
+    # ru_maxrss is in KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps({"seconds": elapsed, "peak": peak, "size": size}))
+
+
+def measure(case: str, count: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_excel_export", "--case", case, "--rows", str(count)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--case", choices=["before", "after"], help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--skip-before-above", type=int, default=None,
+        help="do not run the in-memory workbook above this number of rows",
+    )
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case, args.rows[0])
+        return
+
+    for count in args.rows:
+        for case in ("before", "after"):
+            if case == "before" and args.skip_before_above and count > args.skip_before_above:
+                print(f"{count:>8} rows {case:>6}: skipped")
+                continue
+            result = measure(case, count)
+            print(
+                f"{count:>8} rows {case:>6}: {count / result['seconds']:8.0f} rows/s  "
+                f"peak RSS {result['peak'] / 2**20:7.1f} MiB  file {result['size'] / 2**20:6.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
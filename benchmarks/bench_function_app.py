@@ -0,0 +1,83 @@
+"""
+Per-invocation overhead of the Function App entry point.
+
+Calls main_api with /api/healthcheck/ requests, comparing the previous entry
+point, which built a func.AsgiMiddleware per invocation ("before"), with the
+module-level bridge of function_app ("after").
+
+Usage (from the project root, with a .env or the environment configured):
+
+> python -m benchmarks.bench_function_app --requests 5000
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import azure.functions as func
+
+import function_app
+from api.main import app as main_app
+from configs.logging_conf import logger
+
+URL = "http://localhost/api/healthcheck/"
+
+
+async def before_main_api(req: func.HttpRequest, context) -> func.HttpResponse:
+    return await func.AsgiMiddleware(main_app).handle_async(req, context)
+
+
+after_main_api = function_app.app.get_functions()[0].get_user_function()
+
+
+def make_request() -> func.HttpRequest:
+    return func.HttpRequest(method="GET", url=URL, headers={}, body=b"")
+
+
+async def measure(main_api, count: int, latencies: list[float]) -> None:
+    for _ in range(count):
+        request = make_request()
+        start = time.perf_counter()
+        response = await main_api(request, None)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200
+
+
+def report(label: str, latencies: list[float]) -> None:
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1e6
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1e6
+    mean = statistics.fmean(latencies) * 1e6
+    print(f"{label:>7}: p50 {p50:8.1f} us  p99 {p99:8.1f} us  mean {mean:8.1f} us")
+
+
+async def run(count: int, rounds: int) -> None:
+    # first invocations (lifespan startup for "after") are not measured
+    await before_main_api(make_request(), None)
+    await after_main_api(make_request(), None)
+
+    # alternate rounds so that both sides see the same machine noise
+    before, after = [], []
+    for _ in range(rounds):
+        await measure(before_main_api, count // rounds, before)
+        await measure(after_main_api, count // rounds, after)
+
+    report("before", before)
+    report("after", after)
+    await function_app.asgi_bridge.notify_shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    # measure the bridge, not the log output
+    logger.setLevel(logging.WARNING)
+    asyncio.run(run(args.requests, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Cold start budget of api.main.app, measured with python -X importtime.
+
+Imports the app in fresh interpreters and reports the median import time and
+the heaviest modules. Fails (exit code 1) when the median exceeds the budget
+or when a module that must stay lazy (DB drivers, SQLAlchemy, pyjwt,
+openpyxl) is imported by the app startup.
+
+Usage (from the project root, with a .env or the environment configured):
+
+> python -m benchmarks.bench_import_time --runs 5 --budget-ms 1000
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+MODULE = "api.main"
+
+# loaded on first use only: the first DB query, token or Excel file
+LAZY_MODULES = ("sqlalchemy", "psycopg2", "asyncpg", "jwt", "cryptography", "openpyxl")
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_times() -> dict[str, int]:
+    """Returns the cumulative import time (us) of every module imported by a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        capture_output=True,
+        text=True,
+        env=os.environ,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(2))
+    return times
+
+
+def loaded_lazy_modules() -> list[str]:
+    code = (
+        f"import sys, {MODULE}; "
+        f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=os.environ, check=True
+    )
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    totals = [times[MODULE] / 1000 for times in runs]
+    median = statistics.median(totals)
+
+    last = runs[-1]
+    print(f"heaviest imports ({MODULE}, cumulative):")
+    for name, micros in sorted(last.items(), key=lambda item: -item[1])[1 : args.top + 1]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    print(f"\n{MODULE}: median {median:.1f} ms, min {min(totals):.1f} ms ({args.runs} runs)")
+    print(f"budget: {args.budget_ms:.0f} ms")
+
+    failed = False
+    if median > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+
+    loaded = loaded_lazy_modules()
+    if loaded:
+        print(f"FAIL: imported at startup: {', '.join(loaded)}")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Per-request logging overhead on the request thread.
+
+Emits the six middleware log lines of a request through the previous
+synchronous StreamHandler setup ("before") and through the queue pipeline of
+configs.logging_conf ("after"), both writing to os.devnull.
+
+Usage (from the project root, with a .env or the environment configured):
+
+> python -m benchmarks.bench_logging --requests 20000
+"""
+import argparse
+import logging
+import os
+import time
+
+from configs.logging_conf import (
+    ContextFilter,
+    console_handler,
+    logger,
+    stop_logging,
+)
+
+LINES = (
+    ">>>>>> Start request",
+    ">>>>>>> Start DB session",
+    ">>>>>> Start auth",
+    ">>>>>> End auth",
+    ">>>>>>> End DB session",
+    ">>>>>> End request",
+)
+
+
+class LegacyOneLineExceptionFormatter(logging.Formatter):
+    def formatException(self, exc_info):
+        return repr(super().formatException(exc_info))
+
+    def format(self, record):
+        s = super().format(record)
+        if record:
+            s = s.replace("\r\n", "").replace("\n", "")
+        return s
+
+
+def legacy_logger(stream) -> logging.Logger:
+    legacy = logging.getLogger("bench.legacy")
+    legacy.setLevel(logging.DEBUG)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(
+        LegacyOneLineExceptionFormatter(
+            "%(asctime)-15s - %(request_id)s - %(name)-5s - %(levelname)s - [%(filename)s:%(lineno)s - %(funcName)s() ] - %(message)s"
+        )
+    )
+    legacy.addHandler(handler)
+    legacy.addFilter(ContextFilter())
+    legacy.propagate = False
+    return legacy
+
+
+def measure(target: logging.Logger, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        for line in LINES:
+            target.info(line)
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w")
+    console_handler.setStream(devnull)
+    logger.setLevel(logging.DEBUG)
+
+    before = measure(legacy_logger(devnull), args.requests)
+    after = measure(logger, args.requests)
+    # the time to drain the queue is reported separately
+    start = time.perf_counter()
+    stop_logging()
+    drain = time.perf_counter() - start
+
+    print(f"before: {before * 1e6:7.1f} us/request on the request thread")
+    print(f" after: {after * 1e6:7.1f} us/request on the request thread ({before / after:.1f}x)")
+    print(f"listener drained the backlog in {drain:.2f} s")
+
+    # INFO logs the six lines, WARNING (LOG_LEVEL=WARNING) filters them out
+    for level in (logging.INFO, logging.WARNING):
+        logger.setLevel(level)
+        per_request = measure(logger, args.requests)
+        print(f"{logging.getLevelName(level):>10} level: {per_request * 1e6:7.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Latency / throughput benchmark of the request pipeline.
+
+Compares the previous BaseHTTPMiddleware stack ("before") with the pure ASGI
+middlewares used by api.main.app ("after") on /api/healthcheck/.
+
+Usage (from the project root, with a .env or the environment configured):
+
+> python -m benchmarks.bench_middleware --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from api.healthcheck.healthcheck_controller import router as healthcheck_router
+from api.main import app as after_app
+from configs.context import request_id
+from configs.database import SessionLocal
+from configs.logging_conf import logger
+from exceptions.app_exception import AppException
+from exceptions.handler import app_exception_handler, system_exception_handler
+from exceptions.system_exception import SystemException
+from utils.response import response_fail
+
+PATH = "/api/healthcheck/"
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id.set(uuid.uuid4())
+        logger.info(">>>>>> Start request")
+        try:
+            logging.info(f"FastAPI is processing path: {request.scope.get('path')}")
+            return await call_next(request)
+        except AppException as e:
+            return response_fail(e)
+        except Exception:
+            logger.exception("")
+            return response_fail(SystemException())
+        finally:
+            logger.info(">>>>>> End request")
+
+
+class LegacyDatabaseSessionMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        logger.info(">>>>>>> Start DB session")
+        request.state.db = SessionLocal()
+        try:
+            response = await call_next(request)
+            request.state.db.commit()
+            return response
+        finally:
+            request.state.db.close()
+            logger.info(">>>>>>> End DB session")
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        logger.info(">>>>>> Start auth")
+        try:
+            return await call_next(request)
+        except AppException as e:
+            return response_fail(e)
+        except Exception:
+            logger.exception("")
+            return response_fail(SystemException())
+        finally:
+            logger.info(">>>>>> End auth")
+
+
+def create_before_app() -> FastAPI:
+    app = FastAPI()
+    app.add_exception_handler(AppException, app_exception_handler)
+    app.add_exception_handler(SystemException, system_exception_handler)
+    for middleware in [
+        LegacyRequestLoggingMiddleware,
+        LegacyDatabaseSessionMiddleware,
+        LegacyAuthMiddleware,
+    ].__reversed__():
+        app.add_middleware(middleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins="*",
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.include_router(healthcheck_router, prefix="/api/healthcheck")
+    return app
+
+
+async def run(app: FastAPI, total: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # warm up
+        for _ in range(50):
+            await client.get(PATH)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(PATH)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # keep stdout logging out of the measurement
+    logger.disabled = True
+    logging.getLogger().setLevel(logging.WARNING)
+
+    for name, app in (("before", create_before_app()), ("after", after_app)):
+        result = asyncio.run(run(app, args.requests, args.concurrency))
+        print(
+            f"{name:>6}: {result['rps']:8.1f} req/s  "
+            f"p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Per call overhead of the BaseRepository reads.
+
+Compares a repository building its statement on every call
+(statement_cache = False, "before") with the statements cached per query
+shape with bound parameters ("after") for get_by_id, get_by, get_all sorted,
+get_all with_total and with a join set. The database round trip is stubbed
+out by an in-memory SQLite database holding a few rows, so the timings are
+the Python side: query building, SQLAlchemy cache key and compiled cache
+lookup, result processing.
+
+Usage (from the project root, with a .env or the environment configured):
+
+> python -m benchmarks.bench_repository --calls 20000
+"""
+import argparse
+import time
+
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base, relationship
+from sqlalchemy.pool import StaticPool
+
+from repositories.base_repository import BaseRepository
+
+Base = declarative_base()
+
+
+class BenchParent(Base):
+    __tablename__ = "bench_parent"
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String(20), unique=True)
+    name = Column(String(200))
+    children = relationship("BenchChild")
+
+
+class BenchChild(Base):
+    __tablename__ = "bench_child"
+
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(ForeignKey("bench_parent.id"))
+
+
+class BeforeRepository(BaseRepository[BenchParent]):
+    model = BenchParent
+    statement_cache = False
+
+
+class AfterRepository(BaseRepository[BenchParent]):
+    model = BenchParent
+
+
+CASES = {
+    "get_by_id": lambda repository, i: repository.get_by_id(i % 20 + 1),
+    "get_by": lambda repository, i: repository.get_by("code", f"C{i % 20 + 1}", unique=True),
+    "get_all sorted": lambda repository, i: repository.get_all(
+        i % 10, 5, sort_by="name", sort_desc=True
+    ),
+    "get_all with_total": lambda repository, i: repository.get_all(i % 10, 5, with_total=True),
+    "get_all join": lambda repository, i: repository.get_all(i % 10, 5, join_={"children"}),
+    "get_by_id join": lambda repository, i: repository.get_by_id(
+        i % 20 + 1, join_={"children"}
+    ),
+}
+
+
+def make_session() -> Session:
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    session.add_all(
+        BenchParent(id=i, code=f"C{i}", name=f"parent {i}", children=[BenchChild()])
+        for i in range(1, 21)
+    )
+    session.commit()
+    return session
+
+
+def measure(repository: BaseRepository, case, calls: int) -> float:
+    for i in range(min(calls, 200)):
+        case(repository, i)
+    # identity map lookups would hide the query cost of get_by_id
+    repository.session.expunge_all()
+    start = time.perf_counter()
+    for i in range(calls):
+        case(repository, i)
+        repository.session.expunge_all()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    session = make_session()
+    before, after = BeforeRepository(session), AfterRepository(session)
+    for name, case in CASES.items():
+        before_us = measure(before, case, args.calls)
+        after_us = measure(after, case, args.calls)
+        print(
+            f"{name:>20}: before {before_us:7.1f} us/call  after {after_us:7.1f} us/call  "
+            f"({before_us / after_us:4.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Serialization benchmark of utils.response.response_success over 10k ORM rows.
+
+Compares the previous recursive serialize_data + stdlib JSONResponse
+("before") with the cached per-type serializers + ORJSONResponse ("after"),
+and checks that both produce the same JSON document.
+
+Usage (from the project root, with a .env or the environment configured):
+
+> python -m benchmarks.bench_serialization --rows 10000
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import Boolean, Column, Date, DateTime, Integer, Numeric, String, Uuid
+from sqlalchemy.orm import declarative_base
+
+from utils.response import response_success
+
+Base = declarative_base()
+
+
+class BenchFacility(Base):
+    __tablename__ = "bench_facility"
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String(20))
+    name = Column(String(200))
+    capacity = Column(Numeric(12, 3))
+    active = Column(Boolean)
+    guid = Column(Uuid)
+    opened_on = Column(Date)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    note = Column(String(500))
+
+
+def legacy_serialize_data(data: any) -> any:
+    if hasattr(data, "__dict__"):
+        data_dict: dict[str, any] = data.__dict__
+        data = {k: v for k, v in data_dict.items() if not k.startswith("_")}
+        return legacy_serialize_data(data)
+    elif isinstance(data, dict):
+        return {key: legacy_serialize_data(value) for key, value in data.items()}
+    elif isinstance(data, (list, tuple)):
+        return [legacy_serialize_data(item) for item in data]
+    elif isinstance(data, datetime):
+        return data.strftime("%Y-%m-%d %H:%M:%S")
+    elif isinstance(data, (str, int, float, bool, type(None))):
+        return data
+    else:
+        return str(data)
+
+
+def legacy_response_success(data: any):
+    return JSONResponse(
+        content={"success": True, "data": legacy_serialize_data(data), "errors": []},
+        status_code=200,
+    )
+
+
+def make_rows(count: int) -> list[BenchFacility]:
+    now = datetime(2024, 1, 1, 8, 30, 15)
+    return [
+        BenchFacility(
+            id=i,
+            code=f"FAC-{i:06d}",
+            name=f"Facility number {i}",
+            capacity=Decimal(i) / 7,
+            active=i % 2 == 0,
+            guid=uuid.uuid4(),
+            opened_on=date(2020, 1, 1) + timedelta(days=i % 1000),
+            created_at=now + timedelta(minutes=i),
+            updated_at=now + timedelta(minutes=i, seconds=30),
+            note=None if i % 3 else "ほげ",
+        )
+        for i in range(count)
+    ]
+
+
+def measure(func, data, repeat: int) -> tuple[float, bytes]:
+    best = float("inf")
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(data).body
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+
+    before, before_body = measure(legacy_response_success, rows, args.repeat)
+    after, after_body = measure(response_success, rows, args.repeat)
+
+    assert json.loads(before_body) == json.loads(after_body), "output differs"
+
+    print(f"rows: {args.rows}, payload: {len(after_body) / 1024:.0f} KiB")
+    print(f"before: {before * 1000:8.1f} ms")
+    print(f" after: {after * 1000:8.1f} ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
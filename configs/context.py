@@ -5,3 +5,9 @@ from contextvars import ContextVar
 request_id: ContextVar[uuid.UUID] = ContextVar(
     "request_id", default=uuid.UUID("00000000-0000-0000-0000-000000000000")
 )
+
+# measurements of the current request (utils.request_metrics.RequestTimings),
+# a mutable object so sync handlers running in the thread pool can add to it
+request_timings: ContextVar["RequestTimings | None"] = ContextVar(
+    "request_timings", default=None
+)
@@ -1,9 +1,32 @@
-from typing import TypeVar
+import math
+from functools import lru_cache
+from typing import Any, TypeVar
 from fastapi import Request
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from configs.env import get_settings
+from configs.routing import db_free  # noqa: F401 (re-exported)
 from sqlalchemy.engine import URL
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.pool import NullPool
+
+from exceptions.system_exception import DBOperationalError
+from utils.lazy_loads import record_lazy_load
+from utils.read_replicas import ReplicaSet, RoutingSession
+from utils.request_metrics import record_stage
+from utils.sql_instrumentation import instrument_engine
+from utils.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedNullPool,
+    InstrumentedQueuePool,
+    register_engine,
+)
 
 settings = get_settings()
 
@@ -16,16 +39,265 @@ database_url = URL.create(
     database=settings.database_name,
 )
 
-engine = create_engine(database_url, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_database_url = database_url.set(drivername="postgresql+asyncpg")
+
+
+def replica_urls() -> dict[str, URL]:
+    """Returns the URL of every DATABASE_REPLICA_HOSTNAMES entry by engine name."""
+    urls = {}
+    hostnames = [host.strip() for host in (settings.database_replica_hostnames or "").split(",")]
+    for index, hostname in enumerate(host for host in hostnames if host):
+        host, _, port = hostname.partition(":")
+        urls[f"replica_{index}"] = database_url.set(host=host, port=int(port) if port else database_url.port)
+    return urls
+
+
+def engine_options(name: str, is_async: bool = False) -> dict:
+    """
+    Returns the create_engine() pool options built from the settings.
+
+    :param name: The engine name used as pool metrics label.
+    :param is_async: Whether the options are for the asyncpg engine.
+    :return: Keyword arguments for create_engine / create_async_engine.
+    """
+    # statements are echoed through the sqlalchemy.engine logger, whose level
+    # is set by configs.logging_conf (INFO on LOCAL only)
+    options = {
+        "echo": False,
+        "pool_logging_name": name,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+
+    if settings.database_pgbouncer:
+        # PgBouncer owns the pooling; server side prepared statements do not
+        # survive transaction pooling, so asyncpg must not cache them.
+        options["poolclass"] = InstrumentedNullPool
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+            }
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_recycle=settings.database_pool_recycle,
+    )
+    return options
+
+
+# Engines and session factories are built on first use: importing this
+# module (every controller does, for db_free) must not load the DBAPI
+# drivers nor create pools, which only matters once a route queries.
+
+
+@lru_cache
+def get_engine() -> Engine:
+    """Returns the sync (psycopg2) engine, created on first call."""
+    engine = create_engine(database_url, **engine_options("primary"))
+    register_engine("primary", engine)
+    instrument_engine(engine, "primary")
+    return engine
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """Returns the async (asyncpg) engine, created on first call."""
+    async_engine = create_async_engine(
+        async_database_url, **engine_options("primary_async", is_async=True)
+    )
+    register_engine("primary_async", async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine, "primary_async")
+    return async_engine
+
+
+@lru_cache
+def get_replica_set() -> ReplicaSet | None:
+    """Returns the sync read replicas, None when DATABASE_REPLICA_HOSTNAMES is empty."""
+    engines = {}
+    for name, url in replica_urls().items():
+        engine = create_engine(url, **engine_options(name))
+        register_engine(name, engine)
+        instrument_engine(engine, name)
+        engines[name] = engine
+    return ReplicaSet(engines, settings.database_replica_retry_interval) if engines else None
+
+
+@lru_cache
+def get_async_replica_set() -> ReplicaSet | None:
+    """Returns the async read replicas, None when DATABASE_REPLICA_HOSTNAMES is empty."""
+    engines = {}
+    for name, url in replica_urls().items():
+        name = f"{name}_async"
+        async_engine = create_async_engine(
+            url.set(drivername="postgresql+asyncpg"), **engine_options(name, is_async=True)
+        )
+        register_engine(name, async_engine.sync_engine)
+        instrument_engine(async_engine.sync_engine, name)
+        engines[name] = async_engine.sync_engine
+    return ReplicaSet(engines, settings.database_replica_retry_interval) if engines else None
+
+
+def probe_options(is_async: bool = False) -> dict:
+    """
+    Returns the create_engine() options of the health check engines: no pool
+    and a connect timeout of HEALTH_CHECK_TIMEOUT, so that a probe of an
+    unreachable database gives its thread back instead of piling up in the
+    threadpool (asyncio.wait_for only abandons the await).
+
+    :param is_async: Whether the options are for the asyncpg engine.
+    :return: Keyword arguments for create_engine / create_async_engine.
+    """
+    if is_async:
+        connect_args = {"timeout": settings.health_check_timeout}
+    else:
+        # libpq takes whole seconds
+        connect_args = {"connect_timeout": max(1, math.ceil(settings.health_check_timeout))}
+    return {"poolclass": NullPool, "connect_args": connect_args}
+
+
+def _probe_url(name: str) -> URL:
+    return database_url if name == "primary" else replica_urls()[name]
+
+
+@lru_cache
+def get_probe_engine(name: str = "primary") -> Engine:
+    """Returns the sync health check engine of the primary or of a replica_N."""
+    return create_engine(_probe_url(name), **probe_options())
+
+
+@lru_cache
+def get_async_probe_engine(name: str = "primary") -> AsyncEngine:
+    """Returns the async health check engine of the primary or of a replica_N."""
+    return create_async_engine(
+        _probe_url(name).set(drivername="postgresql+asyncpg"), **probe_options(is_async=True)
+    )
+
+
+@lru_cache
+def get_sessionmaker() -> sessionmaker[Session]:
+    replicas = get_replica_set()
+    if replicas is not None:
+        return sessionmaker(
+            autocommit=False, autoflush=False, bind=get_engine(),
+            class_=RoutingSession, replicas=replicas,
+        )
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    replicas = get_async_replica_set()
+    if replicas is not None:
+        return async_sessionmaker(
+            bind=get_async_engine(), autoflush=False, expire_on_commit=False,
+            sync_session_class=RoutingSession, replicas=replicas,
+        )
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+# module attributes kept for existing imports (from configs.database import engine)
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "async_engine": get_async_engine,
+    "SessionLocal": get_sessionmaker,
+    "AsyncSessionLocal": get_async_sessionmaker,
+}
+
+
+def __getattr__(name: str) -> Any:
+    factory = _LAZY_ATTRIBUTES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
+
 
 Base = declarative_base()
 ModelType = TypeVar("ModelType", bound=Base)  # type: ignore
 
 
-def get_db(request: Request):
-    return request.state.db # pragma: no cover
+def get_db(request: Request) -> Session | AsyncSession:
+    """
+    Returns the session of the request, created on first use.
+
+    DatabaseSessionMiddleware only commits and closes the session when a
+    route actually asked for it.
+    """
+    state = request.scope.setdefault("state", {})
+    db = state.get("db")
+    if db is None:
+        endpoint = request.scope.get("endpoint")
+        if getattr(endpoint, "db_free", False):
+            raise RuntimeError(f"{endpoint.__name__} is declared DB-free")
+        with record_stage("session"):
+            db = state["db"] = get_db_session()
+    return db
+
+
+def get_db_session() -> Session | AsyncSession:
+    """Returns a new session from the engine selected by DATABASE_SESSION_MODE."""
+    if settings.database_session_mode == "async":
+        return get_async_sessionmaker()()  # pragma: no cover
+    return get_sessionmaker()() # pragma: no cover
+
+
+def has_pending_changes(db: Session | AsyncSession) -> bool:
+    """
+    Returns whether the session has anything to commit.
+
+    Covers both unflushed changes and writes already flushed in the current
+    transaction (e.g. BaseRepository.create flushes right away).
+    """
+    if isinstance(db, AsyncSession):
+        db = db.sync_session
+    return bool(db.new or db.dirty or db.deleted or db.info.get("has_writes"))
+
+
+async def commit_if_pending(db: Session | AsyncSession) -> None:
+    """
+    Commits the request session when it has anything to commit.
+
+    :raises DBOperationalError: If the commit fails.
+    """
+    if not has_pending_changes(db):
+        return
+
+    try:
+        with record_stage("commit"):
+            if isinstance(db, AsyncSession):
+                await db.commit()
+            else:
+                db.commit()
+    except DatabaseError as e:
+        raise DBOperationalError() from e
+
+
+async def close_session(db: Session | AsyncSession) -> None:
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        db.close()
+
+
+event.listen(Session, "do_orm_execute", record_lazy_load)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_writes(session: Session, _flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state) -> None:
+    # bulk INSERT/UPDATE/DELETE statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
 
 
-def get_db_session():
-    return SessionLocal() # pragma: no cover
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_writes(session: Session) -> None:
+    session.info.pop("has_writes", None)
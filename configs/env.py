@@ -2,6 +2,7 @@ import os
 from functools import lru_cache
 from typing import Literal
 
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +11,14 @@ class Settings(BaseSettings):
     api_version: str = os.environ.get("API_VERSION")
     api_prefix: str = os.environ.get("API_PREFIX") or "/api/v1"
     algorithms_jwt: str = os.environ.get("ALGORITHMS_JWT")
+    # JWT verification (AuthMiddleware), keys from JWKS_URL or JWKS_FILE
+    auth_enabled: bool = os.environ.get("AUTH_ENABLED") or False
+    jwks_url: str | None = os.environ.get("JWKS_URL") or None
+    jwks_file: str | None = os.environ.get("JWKS_FILE") or None
+    jwks_min_refresh_interval: float = os.environ.get("JWKS_MIN_REFRESH_INTERVAL") or 60
+    jwt_audience: str | None = os.environ.get("JWT_AUDIENCE") or None
+    jwt_issuer: str | None = os.environ.get("JWT_ISSUER") or None
+    jwt_cache_size: int = os.environ.get("JWT_CACHE_SIZE") or 1024
     environment: Literal["LOCAL", "STAGING", "PRODUCTION"] = (
         os.environ.get("ENVIRONMENT") or "LOCAL"
     )
@@ -19,7 +28,65 @@ class Settings(BaseSettings):
     database_port: str = os.environ.get("DATABASE_PORT")
     database_name: str = os.environ.get("DATABASE_NAME")
     database_name_test: str = os.environ.get("DATABASE_NAME_TEST")
+    # "sync" (psycopg2 Session) or "async" (asyncpg AsyncSession) for request sessions
+    database_session_mode: Literal["sync", "async"] = (
+        os.environ.get("DATABASE_SESSION_MODE") or "sync"
+    )
+    # connection pool (ignored when database_pgbouncer is enabled)
+    database_pool_size: int = os.environ.get("DATABASE_POOL_SIZE") or 5
+    database_max_overflow: int = os.environ.get("DATABASE_MAX_OVERFLOW") or 10
+    database_pool_timeout: float = os.environ.get("DATABASE_POOL_TIMEOUT") or 30
+    database_pool_recycle: int = os.environ.get("DATABASE_POOL_RECYCLE") or 1800
+    database_pool_pre_ping: bool = os.environ.get("DATABASE_POOL_PRE_PING") or True
+    # comma separated read replica host[:port] list (same credentials and database)
+    database_replica_hostnames: str | None = os.environ.get("DATABASE_REPLICA_HOSTNAMES")
+    # seconds a failed replica is left out before reads try it again
+    database_replica_retry_interval: float = os.environ.get("DATABASE_REPLICA_RETRY_INTERVAL") or 30
+    # PgBouncer (transaction pooling) friendly mode: NullPool, no prepared statements
+    database_pgbouncer: bool = os.environ.get("DATABASE_PGBOUNCER") or False
+    # statements slower than this are logged as warnings
+    sql_slow_threshold_ms: float = os.environ.get("SQL_SLOW_THRESHOLD_MS") or 500
+    # fraction (0..1) of the other statements logged
+    sql_log_sample_rate: float = os.environ.get("SQL_LOG_SAMPLE_RATE") or 0
+    # request profiling (the middleware is only installed when one is set)
+    profiling_enabled: bool = os.environ.get("PROFILING_ENABLED") or False
+    profiling_sample_rate: float = os.environ.get("PROFILING_SAMPLE_RATE") or 0
+    profiling_mode: Literal["sampling", "cprofile"] = (
+        os.environ.get("PROFILING_MODE") or "sampling"
+    )
+    profiling_interval_ms: float = os.environ.get("PROFILING_INTERVAL_MS") or 5
+    profiling_dir: str = os.environ.get("PROFILING_DIR") or "profiles"
+    profiling_max_files: int = os.environ.get("PROFILING_MAX_FILES") or 100
+    profiling_max_bytes: int = os.environ.get("PROFILING_MAX_BYTES") or 50 * 1024 * 1024
+    # app startup (ASGI lifespan) pre-warm: DB connections opened ahead of the first request
+    prewarm_enabled: bool = os.environ.get("PREWARM_ENABLED") or False
+    prewarm_connections: int = os.environ.get("PREWARM_CONNECTIONS") or 1
+    # query result cache of the repositories declaring a cache_ttl
+    query_cache_backend: Literal["memory", "redis"] = (
+        os.environ.get("QUERY_CACHE_BACKEND") or "memory"
+    )
+    query_cache_size: int = os.environ.get("QUERY_CACHE_SIZE") or 1024
+    query_cache_redis_url: str | None = os.environ.get("QUERY_CACHE_REDIS_URL")
+    # response compression (brotli when the package is installed, else gzip)
+    compression_enabled: bool = os.environ.get("COMPRESSION_ENABLED") or True
+    compression_minimum_size: int = os.environ.get("COMPRESSION_MINIMUM_SIZE") or 1024
+    compression_gzip_level: int = os.environ.get("COMPRESSION_GZIP_LEVEL") or 6
+    compression_brotli_quality: int = os.environ.get("COMPRESSION_BROTLI_QUALITY") or 4
+    # ETag / If-None-Match on the single body 200 GET responses
+    etag_enabled: bool = os.environ.get("ETAG_ENABLED") or True
+    # readiness checks: database ping timeout (seconds) and report cache TTL (seconds)
+    health_check_timeout: float = os.environ.get("HEALTH_CHECK_TIMEOUT") or 2
+    health_cache_ttl: float = os.environ.get("HEALTH_CACHE_TTL") or 5
     system_log_file: str | None = os.environ.get("SYSTEM_LOG_FILE")
+    # defaults to DEBUG on LOCAL, INFO on STAGING and PRODUCTION
+    log_level: str | None = os.environ.get("LOG_LEVEL")
+    log_format: Literal["text", "json"] = os.environ.get("LOG_FORMAT") or "text"
+
+    @field_validator("jwks_url", "jwks_file", "jwt_audience", "jwt_issuer", mode="before")
+    @classmethod
+    def empty_as_none(cls, value):
+        # JWT_ISSUER= in the .env would otherwise verify tokens against ""
+        return value or None
 
     class Config:
         env_file = ".env"
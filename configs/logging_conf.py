@@ -1,7 +1,26 @@
+import atexit
 import logging
+import queue
 import sys
+import threading
+import warnings
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
 
 from configs.context import request_id
+from configs.env import get_settings
+
+settings = get_settings()
+
+# default level per environment, LOG_LEVEL overrides it; INFO keeps the
+# start/end lines of every request (the middlewares' access log)
+ENVIRONMENT_LOG_LEVELS = {
+    "LOCAL": logging.DEBUG,
+    "STAGING": logging.INFO,
+    "PRODUCTION": logging.INFO,
+}
 
 
 class OneLineExceptionFormatter(logging.Formatter):
@@ -12,11 +31,36 @@ class OneLineExceptionFormatter(logging.Formatter):
     def format(self, record):
         s = super(OneLineExceptionFormatter, self).format(record)
 
-        if record:
+        if "\n" in s or "\r" in s:
             s = s.replace("\r\n", "").replace("\n", "")
         return s
 
 
+class JsonLineFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    Fields are rendered lazily: optional ones (exception, stack) are only
+    computed when present on the record.
+    """
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", None),
+            "location": f"{record.filename}:{record.lineno}",
+            "function": record.funcName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(data, default=str).decode()
+
+
 class ContextFilter(logging.Filter):
     """ "Provides request id parameter for the logger"""
 
@@ -25,27 +69,105 @@ class ContextFilter(logging.Filter):
         return True
 
 
-# common formatter
-formatter = OneLineExceptionFormatter(
-    "%(asctime)-15s - %(request_id)s - %(name)-5s - %(levelname)s - [%(filename)s:%(lineno)s - %(funcName)s() ] - %(message)s"
-)
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Enqueues records for the listener thread.
 
-# root logger
-logger = logging.getLogger("app.fastapi")
-logger.setLevel(logging.DEBUG)
+    Unlike QueueHandler.prepare, the record is not formatted on the caller
+    thread: only the message arguments are merged (they may be mutated after
+    the call) and formatting happens in the listener thread. With a bounded
+    queue, records are dropped (and counted) rather than blocking when it
+    is full.
+    """
+
+    dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogQueueListener(QueueListener):
+    """
+    QueueListener with a public handle on its thread: samplers
+    (utils.profiling) leave it out, stop() may be called twice.
+    """
+
+    thread: threading.Thread | None = None
+
+    def start(self):
+        super().start()
+        self.thread = self._thread
+
+    def stop(self):
+        """Writes the queued records, then stops the thread."""
+        if self.thread is None:
+            return
+        super().stop()
+        self.thread = None
+
+
+def get_log_level() -> int:
+    default = ENVIRONMENT_LOG_LEVELS.get(settings.environment, logging.DEBUG)
+    if not settings.log_level:
+        return default
+    # getLevelName returns "Level X" for unknown names, setLevel would raise
+    level = logging.getLevelName(settings.log_level.strip().upper())
+    if not isinstance(level, int):
+        warnings.warn(
+            f"Unknown LOG_LEVEL {settings.log_level!r}, using {logging.getLevelName(default)}"
+        )
+        return default
+    return level
+
+
+# common formatter
+if settings.log_format == "json":
+    formatter = JsonLineFormatter()
+else:
+    formatter = OneLineExceptionFormatter(
+        "%(asctime)-15s - %(request_id)s - %(name)-5s - %(levelname)s - [%(filename)s:%(lineno)s - %(funcName)s() ] - %(message)s"
+    )
 
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setFormatter(formatter)
 
-logger.addHandler(console_handler)
-logger.addFilter(ContextFilter())
+# the request path only enqueues records, the listener thread writes them
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = NonBlockingQueueHandler(log_queue)
+# filters run on the caller thread, where the request id context is set
+queue_handler.addFilter(ContextFilter())
+
+queue_listener = LogQueueListener(log_queue, console_handler)
+queue_listener.start()
+
+
+def stop_logging() -> None:
+    """Flushes the queued records and stops the listener thread (idempotent)."""
+    queue_listener.stop()
+
+
+atexit.register(stop_logging)
+
+# root logger
+logger = logging.getLogger("app.fastapi")
+logger.setLevel(get_log_level())
+
+logger.addHandler(queue_handler)
 
-# sql logger
+# sql logger: full statement echo on LOCAL only, elsewhere statements are
+# sampled by utils.sql_instrumentation
 sql_logger = logging.getLogger("sqlalchemy.engine.Engine")
-sql_logger.setLevel(logging.INFO)
+sql_logger.setLevel(logging.INFO if settings.environment == "LOCAL" else logging.WARNING)
 
-sql_logger.addHandler(console_handler)
-sql_logger.addFilter(ContextFilter())
+sql_logger.addHandler(queue_handler)
 
 # stop delegate logs to root logger (avoid duplicate logs)
 sql_logger.propagate = 0
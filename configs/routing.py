@@ -0,0 +1,11 @@
+def db_free(endpoint):
+    """
+    Marks a route endpoint as not using the database.
+
+    get_db() refuses to open a session for such routes, so a DB-free route
+    can never pay for a session or a connection checkout by accident.
+    Kept apart from configs.database so that declaring routes does not
+    import SQLAlchemy.
+    """
+    endpoint.db_free = True
+    return endpoint
@@ -1,14 +1,12 @@
 from exceptions.saiene_exception import SaieneException
-from utils.messages import load_messages
-
-messages = load_messages()
 
 
 class AppException(SaieneException):
-    def __init__(self, error_code: str, rollback: bool = False):
+    def __init__(self, error_code: str, rollback: bool = False, params: dict | None = None):
         self.http_code = 200
         self.error_code = error_code
-        self.message = messages["APP_EXCEPTION"].get(error_code, "Application error")
+        self.params = params
+        self._set_message("APP_EXCEPTION", "Application error")
         self.rollback = rollback
 
 
@@ -29,3 +27,36 @@ class DecodeError(AppException):
 class ConflictError(AppException):
     def __init__(self):
         super().__init__("CONCURRENCY_CONFLICT_ERROR")
+
+
+class InvalidCursor(AppException):
+    def __init__(self):
+        super().__init__("INVALID_CURSOR")
+
+
+class RequiredError(AppException):
+    def __init__(self, field_name: str):
+        super().__init__("REQUIRED_ERROR", params={"field_name": field_name})
+
+
+class NotFoundError(AppException):
+    def __init__(self, field_name: str):
+        super().__init__("NOT_FOUND_ERROR", params={"field_name": field_name})
+
+
+class MinLengthError(AppException):
+    def __init__(self, field_name: str, min_len: int):
+        super().__init__("MIN_LEN_ERROR", params={"field_name": field_name, "min_len": min_len})
+
+
+class MaxLengthError(AppException):
+    def __init__(self, field_name: str, max_len: int):
+        super().__init__("MAX_LEN_ERROR", params={"field_name": field_name, "max_len": max_len})
+
+
+class ValidationErrors(AppException):
+    """Several validation failures returned together in one response."""
+
+    def __init__(self, errors: list[AppException]):
+        super().__init__("VALIDATION_ERROR")
+        self.errors = errors
@@ -1,5 +1,29 @@
+from utils.error_catalog import FAIL_PREFIX, FAIL_SUFFIX, CompiledMessage, encode_error, get_catalog
+
+
 class SaieneException(Exception):
     http_code: int | str
     error_code: str
     message: str
     rollback: bool
+    params: dict | None = None
+    _entry: CompiledMessage | None = None
+
+    def _set_message(self, section: str, default: str) -> None:
+        """Sets message from the compiled catalog entry of error_code, formatted with params."""
+        self._entry = get_catalog().get(section, self.error_code)
+        self.message = self._entry.format(self.params) if self._entry else default
+
+    def error_json(self) -> bytes:
+        """Returns the encoded error object, prebuilt for fixed messages."""
+        entry = self._entry
+        if entry is not None and entry.error_json is not None and self.message == entry.template:
+            return entry.error_json
+        return encode_error(self.error_code, self.message)
+
+    def response_body(self) -> bytes:
+        """Returns the encoded failed response of this error alone."""
+        entry = self._entry
+        if entry is not None and entry.body is not None and self.message == entry.template:
+            return entry.body
+        return FAIL_PREFIX + self.error_json() + FAIL_SUFFIX
@@ -1,8 +1,36 @@
+import asyncio
+
 import azure.functions as func
 from api.main import app as main_app
 
 app = func.FunctionApp()
 
+# one bridge for every invocation: the ASGI lifespan (and the pre-warm hook of
+# the app) runs once per worker instead of the adapter being rebuilt per request
+asgi_bridge = func.AsgiMiddleware(main_app)
+_startup: asyncio.Future | None = None
+
+
+async def ensure_startup() -> None:
+    """
+    Runs the ASGI lifespan startup once, concurrent first invocations wait for it.
+    A startup that raised is run again by the next invocation.
+    """
+    global _startup
+    if _startup is None:
+        _startup = asyncio.ensure_future(asgi_bridge.notify_startup())
+    startup = _startup
+    try:
+        # shielded: a cancelled invocation does not cancel the shared startup
+        await asyncio.shield(startup)
+    except Exception:
+        if _startup is startup:
+            _startup = None
+        raise
+
+
 @app.route(route="{*route}", auth_level=func.AuthLevel.ANONYMOUS)
 async def main_api(req: func.HttpRequest, context: func.Context) -> func.HttpResponse:
-    return await func.AsgiMiddleware(main_app).handle_async(req, context)
+    if _startup is None or not _startup.done():
+        await ensure_startup()
+    return await asgi_bridge.handle_async(req, context)
@@ -1,42 +1,45 @@
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
 
 from configs.env import get_settings
 from configs.logging_conf import logger
-from exceptions.app_exception import AppException, Unauthorized, DecodeError
-from exceptions.system_exception import SystemException
-from utils.response import response_fail
-import jwt
+from exceptions.app_exception import Unauthorized
+from middlewares.base_asgi_middleware import BaseASGIMiddleware
+from utils.jwt_verification import get_token_verifier
+from utils.request_metrics import record_stage
 
 settings = get_settings()
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class AuthMiddleware(BaseASGIMiddleware):
+    async def dispatch(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Do something for authentication here
         logger.info(">>>>>> Start auth")
         try:
-            # check_token(request)
-            return await call_next(request)
-        except AppException as e:
-            return response_fail(e)
-        except Exception:
-            logger.exception("")
-            return response_fail(SystemException())
+            await self.call_next_guarded(scope, receive, send, self.authenticate)
         finally:
             logger.info(">>>>>> End auth")
 
+    async def authenticate(self, scope: Scope, receive: Receive, send: Send) -> None:
+        with record_stage("auth"):
+            if settings.auth_enabled:
+                await check_token(Request(scope))
+        await self.app(scope, receive, send)
 
-def check_token(request: Request):
+
+async def check_token(request: Request):
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer"):
         logger.warning(">>>>>> No auth header")
         raise Unauthorized()
-    try:
-        token = auth_header[7:]
-        decode = jwt.decode(token, options={"verify_signature": False})
-        request.state.email = decode["preferred_username"]
-        request.state.name = decode["name"]
-    except jwt.PyJWTError as e:
-        logger.error(f"JWT Decode Error: {str(e)}")
-        raise DecodeError()
+
+    token = auth_header[7:]
+    # signature and claims are verified, repeated tokens come from the cache
+    verifier = get_token_verifier()
+    decode = verifier.cached(token)
+    if decode is None:
+        # off the event loop: an unknown kid reloads the JWKS over the network
+        decode = await run_in_threadpool(verifier.decode, token)
+    request.state.email = decode["preferred_username"]
+    request.state.name = decode["name"]
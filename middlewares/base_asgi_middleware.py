@@ -0,0 +1,64 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from configs.logging_conf import logger
+from exceptions.app_exception import AppException
+from exceptions.system_exception import SystemException
+from utils.response import response_fail
+
+
+class BaseASGIMiddleware:
+    """
+    Base class for pure ASGI middlewares.
+
+    Unlike Starlette's BaseHTTPMiddleware, no extra task or body-streaming
+    wrapper is created per request: the next app is awaited directly with the
+    original receive/send channels.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        await self.dispatch(scope, receive, send)
+
+    async def dispatch(self, scope: Scope, receive: Receive, send: Send) -> None:
+        raise NotImplementedError()  # pragma: no cover
+
+    async def call_next_guarded(
+        self, scope: Scope, receive: Receive, send: Send, app: ASGIApp | None = None
+    ) -> None:
+        """
+        Calls the next app and converts unhandled exceptions to a failed response.
+
+        The error response is only sent when the downstream app has not started
+        its own response yet, otherwise the exception is re-raised.
+
+        :param scope: The ASGI scope.
+        :param receive: The ASGI receive channel.
+        :param send: The ASGI send channel.
+        :param app: The app to call instead of the next app (e.g. a wrapper of it).
+        """
+        app = app or self.app
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await app(scope, receive, send_wrapper)
+        except AppException as e:
+            if response_started:
+                raise
+            await response_fail(e)(scope, receive, send)
+        except Exception:
+            logger.exception("")
+            if response_started:
+                raise
+            await response_fail(SystemException())(scope, receive, send)
@@ -0,0 +1,187 @@
+import gzip
+import zlib
+from http import HTTPStatus
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from configs.env import get_settings
+from middlewares.base_asgi_middleware import BaseASGIMiddleware
+from utils.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+settings = get_settings()
+
+# content types worth compressing (xlsx, images... are already compressed)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+compression_bytes_in = registry.counter(
+    "http_compression_bytes_in_total",
+    "Response bytes before compression.",
+    ["encoding"],
+)
+compression_bytes_out = registry.counter(
+    "http_compression_bytes_out_total",
+    "Response bytes after compression.",
+    ["encoding"],
+)
+compression_bytes_saved = registry.counter(
+    "http_compression_bytes_saved_total",
+    "Response bytes saved by compression.",
+    ["encoding"],
+)
+
+
+def _record(encoding: str, bytes_in: int, bytes_out: int) -> None:
+    compression_bytes_in.inc(bytes_in, encoding=encoding)
+    compression_bytes_out.inc(bytes_out, encoding=encoding)
+    compression_bytes_saved.inc(bytes_in - bytes_out, encoding=encoding)
+
+
+class _Compressor:
+    """Incremental gzip or brotli compressor of one response."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.compression_brotli_quality)
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            # wbits 16 + MAX_WBITS: gzip container
+            self._compressor = zlib.compressobj(
+                settings.compression_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        self.bytes_in += len(data)
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+        else:
+            out = self._compressor.compress(data)
+        # streamed chunks are flushed so that the client gets them right away
+        out += self._finish() if last else self._flush()
+        self.bytes_out += len(out)
+        if last:
+            _record(self.encoding, self.bytes_in, self.bytes_out)
+        return out
+
+
+def _compress_body(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.compression_brotli_quality)
+    return gzip.compress(body, settings.compression_gzip_level, mtime=0)
+
+
+def select_encoding(accept_encoding: str) -> str | None:
+    """Returns the preferred supported encoding of an Accept-Encoding header."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        quality = params.strip().removeprefix("q=")
+        if quality:
+            try:
+                if float(quality) == 0:
+                    continue
+            except ValueError:
+                pass
+        accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware(BaseASGIMiddleware):
+    """
+    Compresses the JSON and text responses of at least COMPRESSION_MINIMUM_SIZE
+    bytes with brotli (when the brotli package is installed) or gzip,
+    following Accept-Encoding. Streamed responses are compressed chunk by
+    chunk. Saved bytes are exported on /api/metrics.
+
+    Every compressible response gets Vary: Accept-Encoding, also when it is
+    sent uncompressed (small body, no accepted encoding): a shared cache
+    would otherwise serve it whatever the Accept-Encoding of the next client.
+    """
+
+    def __init__(self, app: ASGIApp):
+        super().__init__(app)
+        self.minimum_size = settings.compression_minimum_size
+
+    async def dispatch(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+        start_message: Message | None = None
+        compressor: _Compressor | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                content_type = headers.get("content-type", "")
+                if message["status"] == HTTPStatus.NOT_MODIFIED:
+                    # same Vary as the 200 it revalidates
+                    headers.add_vary_header("Accept-Encoding")
+                    await send(message)
+                    return
+                if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    await send(message)
+                    return
+                # held until the body size is known
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is not None:
+                message["body"] = compressor.compress(body, last=not more_body)
+                await send(message)
+                return
+            if start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+
+            if not more_body:
+                if len(body) < self.minimum_size:
+                    await send(start)
+                    await send(message)
+                    return
+                compressed = _compress_body(encoding, body)
+                _record(encoding, len(body), len(compressed))
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                message["body"] = compressed
+                await send(start)
+                await send(message)
+                return
+
+            # streamed: the total size is unknown, compress every chunk
+            compressor = _Compressor(encoding)
+            headers["Content-Encoding"] = encoding
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            message["body"] = compressor.compress(body, last=False)
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
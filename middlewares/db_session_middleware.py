@@ -1,27 +1,52 @@
-from fastapi import Request
-from sqlalchemy.exc import DatabaseError
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import Message, Receive, Scope, Send
 
-from configs.database import get_db_session
 from configs.logging_conf import logger
 from exceptions.system_exception import DBOperationalError
+from middlewares.base_asgi_middleware import BaseASGIMiddleware
+from utils.lazy_loads import detect_lazy_loads
 from utils.response import response_fail
 
 
-class DatabaseSessionMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class DatabaseSessionMiddleware(BaseASGIMiddleware):
+    async def dispatch(self, scope: Scope, receive: Receive, send: Send) -> None:
         logger.info(">>>>>>> Start DB session")
 
-        # Declare a db_session for the request
-        request.state.db = get_db_session()
+        # The session is created lazily by configs.database.get_db and stored
+        # as request.state.db; requests that never use it cost nothing here.
+        state = scope.setdefault("state", {})
+        commit_failed = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal commit_failed
+            if commit_failed:
+                # the response has been replaced by the commit error response
+                return
+
+            db = state.get("db")
+            if message["type"] == "http.response.start" and db is not None:
+                # a session exists, so configs.database (and SQLAlchemy) is
+                # already loaded: importing it here keeps it off app startup
+                from configs.database import commit_if_pending
+
+                # commit before the response is released to the client
+                try:
+                    await commit_if_pending(db)
+                except DBOperationalError as e:
+                    logger.exception("")
+                    commit_failed = True
+                    await response_fail(e)(scope, receive, send)
+                    return
+
+            await send(message)
 
         try:
-            response = await call_next(request)
-            request.state.db.commit()
-            return response
-        except DatabaseError:
-            logger.exception("")
-            return response_fail(DBOperationalError())
+            # N+1 detection (LOCAL only) over the handler and the serialization
+            with detect_lazy_loads(f"{scope['method']} {scope['path']}"):
+                await self.app(scope, receive, send_wrapper)
         finally:
-            request.state.db.close()
+            db = state.pop("db", None)
+            if db is not None:
+                from configs.database import close_session
+
+                await close_session(db)
             logger.info(">>>>>>> End DB session")
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import Message, Receive, Scope, Send
+
+from middlewares.base_asgi_middleware import BaseASGIMiddleware
+from utils.etag import etag_matches, etag_of
+
+
+class ETagMiddleware(BaseASGIMiddleware):
+    """
+    Conditional GET for the single body 200 responses (response_success).
+
+    Responses get a weak ETag from their body unless the route set one
+    (utils.etag.fingerprint_etag), and become a 304 without body when it
+    matches If-None-Match. Streamed responses and HEAD requests are passed
+    through.
+
+    A tag computed here comes after the query and the serialization: the 304
+    only saves the transfer. Routes that want to skip the work too compute a
+    fingerprint_etag before querying and answer response_not_modified
+    themselves (utils.response.response_not_modified).
+    """
+
+    async def dispatch(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # not HEAD: its empty body would give a tag that never matches the GET one
+        if scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message: Message | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start" and message["status"] == HTTPStatus.OK:
+                # held until the body tells whether the response is streamed
+                start_message = message
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            if message.get("more_body", False):
+                await send(start)
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            etag = headers.get("etag")
+            if etag is None:
+                etag = headers["ETag"] = etag_of(message.get("body", b""))
+
+            if etag_matches(if_none_match, etag):
+                not_modified = MutableHeaders()
+                for name in ("etag", "cache-control", "vary"):
+                    if name in headers:
+                        not_modified[name] = headers[name]
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": HTTPStatus.NOT_MODIFIED,
+                        "headers": not_modified.raw,
+                    }
+                )
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,41 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import Message, Receive, Scope, Send
+
+from configs.context import request_timings
+from middlewares.base_asgi_middleware import BaseASGIMiddleware
+from utils.request_metrics import RequestTimings, observe_request
+
+
+class MetricsMiddleware(BaseASGIMiddleware):
+    """
+    Measures every request: stage wall times, SQL statements and response
+    size, exported on /api/metrics and summarized in a Server-Timing header.
+    """
+
+    async def dispatch(self, scope: Scope, receive: Receive, send: Send) -> None:
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timings.mark_response_start()
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing())
+            elif message["type"] == "http.response.body":
+                timings.response_size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timings.reset(token)
+            route = scope.get("route")
+            observe_request(
+                timings,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+            )
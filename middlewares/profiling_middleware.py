@@ -0,0 +1,61 @@
+import random
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import Message, Receive, Scope, Send
+
+from configs.context import request_id
+from configs.env import get_settings
+from configs.logging_conf import logger, queue_listener
+from middlewares.base_asgi_middleware import BaseASGIMiddleware
+from utils.profiling import RequestProfiler
+
+settings = get_settings()
+
+PROFILE_HEADER = "x-profile"
+
+
+class ProfilingMiddleware(BaseASGIMiddleware):
+    """
+    Profiles the requests sampled by PROFILING_SAMPLE_RATE, or asking for it
+    with an "X-Profile: 1" header when PROFILING_ENABLED.
+
+    Only added to the app when profiling is configured, so it costs nothing
+    otherwise. The profile file is named after the request id, which is
+    returned in the X-Profile-Id header.
+    """
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if settings.profiling_enabled and Headers(scope=scope).get(PROFILE_HEADER) == "1":
+            return True
+        return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
+
+    async def dispatch(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # the log listener writes records of every request, not this one
+        listener = queue_listener.thread
+        profiler = RequestProfiler({listener.ident} if listener else set())
+        name = str(request_id.get())
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", name)
+            await send(message)
+
+        started = False
+        try:
+            started = profiler.start()
+            if not started:
+                logger.info(">>>>>> Profiling skipped: a cProfile session is already running")
+            await self.app(scope, receive, send_wrapper if started else send)
+        finally:
+            if started:
+                profiler.stop()
+                try:
+                    path = await run_in_threadpool(profiler.save, name)
+                    logger.info(f">>>>>> Profile saved to {path}")
+                except OSError:
+                    logger.exception("")
@@ -1,29 +1,20 @@
-import logging
 import uuid
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import Receive, Scope, Send
 
 from configs.context import request_id
 from configs.logging_conf import logger
-from exceptions.app_exception import AppException
-from exceptions.system_exception import SystemException
-from utils.response import response_fail
+from middlewares.base_asgi_middleware import BaseASGIMiddleware
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class RequestLoggingMiddleware(BaseASGIMiddleware):
+    async def dispatch(self, scope: Scope, receive: Receive, send: Send) -> None:
         # unique id for each request
         request_id.set(uuid.uuid4())
 
         logger.info(">>>>>> Start request")
         try:
-            logging.info(f"FastAPI is processing path: {request.scope.get('path')}")
-            return await call_next(request)
-        except AppException as e:
-            return response_fail(e)
-        except Exception:
-            logger.exception("")
-            return response_fail(SystemException())
+            logger.debug("FastAPI is processing path: %s", scope.get("path"))
+            await self.call_next_guarded(scope, receive, send)
         finally:
             logger.info(">>>>>> End request")
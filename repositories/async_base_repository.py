@@ -0,0 +1,560 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Generic, Iterable, Union
+
+from sqlalchemy import Select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import select
+
+from configs.database import ModelType
+from exceptions.app_exception import ConflictError, ResourceNotFound
+from repositories.base_repository import BULK_BATCH_SIZE, QueryBuilderMixin, _batched
+
+
+class AsyncBaseRepository(QueryBuilderMixin[ModelType]):
+    """
+    Base class for data repositories running on an AsyncSession.
+
+    Exposes the same API as BaseRepository, with every method touching the
+    database being a coroutine. Query builders (_query, _get_by, _maybe_join,
+    ...) come from QueryBuilderMixin, shared with BaseRepository; it is not a
+    BaseRepository, whose methods are synchronous.
+    """
+
+    session: AsyncSession
+
+    def __init__(self, db_session: AsyncSession):
+        """
+        Initialize the repository with an async database session.
+
+        Args:
+            db_session: SQLAlchemy AsyncSession
+        """
+        self.session = db_session
+        self.db = db_session
+
+    async def create(self, attributes: dict[str, Any] = None) -> ModelType:
+        """
+        Creates the model instance.
+
+        :param attributes: The attributes to create the model with.
+        :return: The created model instance.
+        """
+        if attributes is None:
+            attributes = {}
+
+        try:
+            model = self.model(**attributes)
+            self.session.add(model)
+            await self.session.flush()
+            return model
+        except Exception:
+            await self.session.rollback()
+            raise
+
+    async def bulk_create(
+        self,
+        rows: Iterable[dict[str, Any]],
+        return_ids: bool = False,
+        id_key: str = "id",
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> list[Any] | None:
+        """
+        Inserts many rows with multi-row INSERTs (see BaseRepository.bulk_create).
+
+        :param rows: The attributes of the rows to insert.
+        :param return_ids: Whether to return the generated ids.
+        :param id_key: The id field name.
+        :param batch_size: The number of rows sent per execute().
+        :return: The generated ids in the order of rows if return_ids, else None.
+        """
+        query = self._bulk_create_query(return_ids, id_key)
+        return await self._execute_bulk(query, rows, return_ids, batch_size)
+
+    async def upsert(
+        self,
+        rows: Iterable[dict[str, Any]],
+        conflict_keys: list[str] | None = None,
+        update_fields: list[str] | None = None,
+        return_ids: bool = False,
+        id_key: str = "id",
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> list[Any] | None:
+        """
+        Inserts many rows with INSERT ... ON CONFLICT (see BaseRepository.upsert).
+
+        :param rows: The attributes of the rows to insert or update.
+        :param conflict_keys: The columns of the unique constraint, [id_key] by default.
+        :param update_fields: The columns to update on conflict, DO NOTHING when empty.
+        :param return_ids: Whether to return the ids of the inserted/updated rows.
+        :param id_key: The id field name.
+        :param batch_size: The number of rows sent per execute().
+        :return: The ids if return_ids, else None; with DO NOTHING only the
+            inserted rows return an id, in no particular order.
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return [] if return_ids else None
+
+        query = self._upsert_query(first, conflict_keys, update_fields, return_ids, id_key)
+        return await self._execute_bulk(query, [first, *rows], return_ids, batch_size)
+
+    async def bulk_update(
+        self,
+        rows: Iterable[dict[str, Any]],
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> None:
+        """
+        Updates many rows by primary key with executemany UPDATEs.
+
+        :param rows: The attributes to set; each row must contain the primary key.
+        :param batch_size: The number of rows sent per execute().
+        :return: None
+        """
+        await self._execute_bulk(update(self.model), rows, False, batch_size)
+
+    async def update(
+        self,
+        entity_id: Union[int, str],
+        data: dict[str, Any],
+        join_: set[str] | None = None,
+        id_key: str = "id",
+    ) -> ModelType:
+        try:
+            # the row to modify is read from the primary, a replica may lag behind
+            model_instance = await self.get_by_id(entity_id, join_, id_key, use_primary=True)
+
+            if not model_instance:
+                raise ResourceNotFound()
+
+            for attr, value in data.items():
+                setattr(model_instance, attr, value)
+
+            return model_instance
+        except Exception as e:
+            if not isinstance(e, ResourceNotFound):
+                await self.session.rollback()
+            raise
+
+    async def update_if_unchanged(
+        self,
+        entity_id: Union[int, str],
+        data: dict[str, Any],
+        client_updated_at: str | datetime,
+        id_key: str = "id",
+        version_key: str = "updated_at",
+    ) -> ModelType:
+        """
+        Updates the row only if it was not modified since the client read it
+        (see BaseRepository.update_if_unchanged).
+
+        :param entity_id: The id of the row to update.
+        :param data: The attributes to set.
+        :param client_updated_at: The version_key value the client read, at
+            the stored precision (isoformat(), not the seconds of utils.response).
+        :param id_key: The id field name.
+        :param version_key: The field changing on every update.
+        :return: The updated model instance.
+        :raises ConflictError: If the row was modified in the meantime.
+        :raises ResourceNotFound: If the row does not exist.
+        """
+        query = self._update_if_unchanged_query(
+            entity_id, data, client_updated_at, id_key, version_key
+        )
+        try:
+            result = await self.session.scalars(query)
+            model_instance = result.one_or_none()
+            if model_instance is None:
+                if not await self.session.scalar(self._exists_query(entity_id, id_key)):
+                    raise ResourceNotFound()
+                raise ConflictError()
+
+            return model_instance
+        except Exception as e:
+            if not isinstance(e, (ResourceNotFound, ConflictError)):
+                await self.session.rollback()
+            raise
+
+    async def bulk_update_if_unchanged(
+        self,
+        rows: list[dict[str, Any]],
+        id_key: str = "id",
+        version_key: str = "updated_at",
+    ) -> list[ModelType]:
+        """
+        Updates many rows only if none was modified since the client read them
+        (see BaseRepository.bulk_update_if_unchanged).
+
+        :param rows: The rows to update; each contains id_key, version_key
+            (the value the client read, at the stored precision) and the
+            same attributes to set.
+        :param id_key: The id field name.
+        :param version_key: The field changing on every update.
+        :return: The updated model instances.
+        :raises ConflictError: If any row was modified or deleted in the meantime.
+        """
+        if not rows:
+            return []
+
+        query = self._bulk_update_if_unchanged_query(rows, id_key, version_key)
+        try:
+            result = await self.session.scalars(query)
+            model_instances = result.all()
+            if len(model_instances) != len(rows):
+                raise ConflictError()
+
+            return model_instances
+        except Exception:
+            await self.session.rollback()
+            raise
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        join_: set[str] | None = None,
+        sort_by: str | None = None,
+        sort_desc: bool = False,
+        with_total: bool = False,
+    ) -> list[ModelType] | tuple[list[ModelType], int]:
+        """
+        Returns a list of model instances.
+
+        :param skip: The number of records to skip.
+        :param limit: The number of record to return.
+        :param join_: The joins to make.
+        :param sort_by: The field name to sort by. If None, no sorting is applied.
+        :param sort_desc: If True, sort in descending order. If False, sort in ascending order.
+        :param with_total: If True, also return the total number of records.
+        :return: A list of model instances, or (instances, total) with with_total.
+        """
+        query, params = self._page_statement(skip, limit, join_, sort_by, sort_desc, with_total)
+
+        if with_total:
+            return await self._all_with_total(query, skip, unique=join_ is not None, params=params)
+
+        if join_ is not None:
+            return await self._all_unique(query, params)
+
+        return await self._all(query, params)
+
+    async def get_page_by_cursor(
+        self,
+        sort_by: str,
+        limit: int = 100,
+        cursor: str | None = None,
+        sort_desc: bool = False,
+        tiebreaker: str = "id",
+        join_: set[str] | None = None,
+    ) -> tuple[list[ModelType], str | None]:
+        """
+        Returns a page of model instances using keyset (cursor) pagination
+        (see BaseRepository.get_page_by_cursor).
+
+        :param sort_by: The field name to sort by.
+        :param limit: The number of record to return.
+        :param cursor: The cursor returned with the previous page, None for the first page.
+        :param sort_desc: If True, sort in descending order.
+        :param tiebreaker: A unique field making the order total.
+        :param join_: The joins to make.
+        :return: The model instances and the cursor of the next page (None on the last page).
+        :raises NotFoundError: If sort_by or tiebreaker is not a column of the model.
+        :raises InvalidCursor: If the cursor is malformed.
+        """
+        query = self._keyset_query(sort_by, limit, cursor, sort_desc, tiebreaker, join_)
+        query = self._on_replica(query)
+
+        if join_ is not None:
+            items = await self._all_unique(query)
+        else:
+            items = await self._all(query)
+
+        return self._keyset_page(items, limit, sort_by, tiebreaker)
+
+    async def get_by_muti_fields(
+        self,
+        conditions: list,
+        join_: set[str] | None = None,
+    ) -> ModelType:
+        """
+        Returns the model instance matching the field and value.
+
+        :param conditions: List of condition.
+        :param join_: The joins to make.
+        :return: The model instance, with or without join_ (the joined rows
+            are deduplicated).
+        """
+        query = self._query(join_)
+        query = self._on_replica(self._get_by_muti_fields(query, conditions))
+
+        if join_ is not None:
+            return await self._one_unique(query)
+        return await self._one(query)
+
+    async def get_all_by_muti_fields(
+        self,
+        conditions: list,
+        join_: set[str] | None = None,
+    ) -> list[ModelType]:
+        """
+        Returns a list of model instances matching the provided conditions.
+
+        :param conditions: List of conditions.
+        :param join_: The joins to make.
+        :return: A list of model instances.
+        """
+        query = self._query(join_)
+        query = self._on_replica(self._get_by_muti_fields(query, conditions))
+
+        return await self._all(query)
+
+    async def get_by(
+        self,
+        field: str,
+        value: Any,
+        join_: set[str] | None = None,
+        unique: bool = False,
+    ) -> ModelType | list[ModelType]:
+        """
+        Returns the model instance matching the field and value.
+
+        :param field: The field to match.
+        :param value: The value to match.
+        :param join_: The joins to make.
+        :param unique: Return the single matching instance or None instead of
+            the list of matches.
+        :return: The model instance or None when unique, the list of model
+            instances otherwise, with or without join_.
+        """
+        query, params = self._get_by_statement(field, value, join_)
+
+        if unique:
+            if join_ is not None:
+                return await self._one_or_none_unique(query, params)
+            return await self._one_or_none(query, params)
+        if join_ is not None:
+            return await self._all_unique(query, params)
+
+        return await self._all(query, params)
+
+    async def get_by_id(
+        self,
+        value: Any,
+        join_: set[str] | None = None,
+        id_key="id",
+        use_primary: bool = False,
+    ) -> ModelType | None:
+        """
+        Returns the model instance matching the field and value.
+
+        :param value: The value to match.
+        :param join_: The joins to make.
+        :param id_key: The id field name.
+        :param use_primary: Read from the primary, bypassing the read replicas
+            and the query cache (lookups before a write).
+        :return: The model instance or None, with or without join_.
+        """
+        query, params = self._get_by_statement(id_key, value, join_, use_primary)
+
+        if join_ is not None:
+            return await self._one_or_none_unique(query, params)
+        return await self._one_or_none(query, params)
+
+    async def fingerprint(
+        self, conditions: list | None = None, version_key: str = "updated_at"
+    ) -> tuple[datetime | None, int]:
+        """
+        Returns max(version_key) and the count of the records matching the
+        conditions (see BaseRepository.fingerprint).
+
+        :param conditions: List of conditions.
+        :param version_key: The last modification time field name.
+        :return: The last modification time and the number of records.
+        """
+        query = self._fingerprint_query(conditions, version_key)
+
+        result = await self.session.execute(query)
+        last_modified, count = result.one()
+        return last_modified, count
+
+    async def stream(
+        self,
+        conditions: list | None = None,
+        join_: set[str] | None = None,
+        sort_by: str | None = None,
+        sort_desc: bool = False,
+        yield_per: int = 1000,
+    ) -> AsyncIterator[ModelType]:
+        """
+        Yields the model instances matching the conditions without loading
+        them all at once (see BaseRepository.stream).
+
+        :param conditions: List of conditions.
+        :param join_: The joins to make.
+        :param sort_by: The field name to sort by. If None, no sorting is applied.
+        :param sort_desc: If True, sort in descending order.
+        :param yield_per: The number of rows fetched per round trip.
+        :return: An async iterator of model instances.
+        """
+        query = self._stream_query(conditions, join_, sort_by, sort_desc, yield_per)
+
+        result = await self.session.stream_scalars(query)
+        try:
+            async for model in result:
+                yield model
+        finally:
+            await result.close()
+
+    async def delete(self, entity: ModelType) -> None:
+        """
+        Deletes the entity.
+
+        :param entity: The entity to delete.
+        :return: None
+        """
+        try:
+            await self.session.delete(entity)
+        except Exception:
+            await self.session.rollback()
+            raise
+
+    async def delete_by_id(self, id: int | str, id_key="id") -> None:
+        """
+        Deletes the entity by ID.
+
+        :param id: The ID of the entity to delete.
+        :param id_key: The id field name.
+        :return: None
+        """
+        try:
+            entity = await self.get_by_id(id, id_key=id_key, use_primary=True)
+
+            await self.session.delete(entity)
+        except Exception:
+            await self.session.rollback()
+            raise
+
+    async def _execute_bulk(
+        self,
+        query,
+        rows: Iterable[dict[str, Any]],
+        returning: bool,
+        batch_size: int,
+    ) -> list[Any] | None:
+        """
+        Executes a DML statement for batches of rows, rolling back on error.
+
+        :param query: The INSERT/UPDATE statement.
+        :param rows: The parameters of every row.
+        :param returning: Whether the statement returns ids to collect.
+        :param batch_size: The number of rows sent per execute().
+        :return: The returned ids if returning, else None.
+        """
+        ids = []
+        try:
+            for batch in _batched(rows, batch_size):
+                result = await self.session.execute(query, batch)
+                if returning:
+                    ids.extend(result.scalars().all())
+        except Exception:
+            await self.session.rollback()
+            raise
+
+        return ids if returning else None
+
+    async def _all(self, query: Select, params: dict[str, Any] | None = None) -> list[ModelType]:
+        """
+        Returns all results from the query.
+
+        :param query: The query to execute.
+        :param params: The bound parameter values of the query.
+        :return: A list of model instances.
+        """
+        query = await self.session.scalars(query, params)
+        return query.all()
+
+    async def _all_unique(
+        self, query: Select, params: dict[str, Any] | None = None
+    ) -> list[ModelType]:
+        result = await self.session.execute(query, params)
+        return result.unique().scalars().all()
+
+    async def _one_or_none_unique(
+        self, query: Select, params: dict[str, Any] | None = None
+    ) -> ModelType | None:
+        """Returns the deduplicated (joined eager loads) result from the query or None."""
+        result = await self.session.execute(query, params)
+        return result.unique().scalars().one_or_none()
+
+    async def _one_unique(self, query: Select) -> ModelType:
+        """Returns the deduplicated result from the query or raises NoResultFound."""
+        result = await self.session.execute(query)
+        return result.unique().scalars().one()
+
+    async def _all_with_total(
+        self,
+        query: Select,
+        skip: int = 0,
+        unique: bool = False,
+        params: dict[str, Any] | None = None,
+    ) -> tuple[list[ModelType], int]:
+        """
+        Returns all results from the query with the total number of records
+        ignoring offset/limit.
+
+        :param query: The paginated query to execute, with the total column (_with_total).
+        :param skip: The offset of the query.
+        :param unique: Whether to deduplicate joined rows.
+        :param params: The bound parameter values of the query.
+        :return: A list of model instances and the total.
+        """
+        result = await self.session.execute(query, params)
+        if unique:
+            result = result.unique()
+        rows = result.all()
+
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
+        if not skip:
+            return [], 0
+
+        return [], await self._count(query.limit(None).offset(None))
+
+    async def _first(self, query: Select) -> ModelType | None:
+        """
+        Returns the first result from the query.
+
+        :param query: The query to execute.
+        :return: The first model instance.
+        """
+        query = await self.session.scalars(query)
+        return query.first()
+
+    async def _one_or_none(
+        self, query: Select, params: dict[str, Any] | None = None
+    ) -> ModelType | None:
+        """Returns the first result from the query or None."""
+        query = await self.session.scalars(query, params)
+        return query.one_or_none()
+
+    async def _one(self, query: Select) -> ModelType:
+        """
+        Returns the first result from the query or raises NoResultFound.
+
+        :param query: The query to execute.
+        :return: The first model instance.
+        """
+        query = await self.session.scalars(query)
+        return query.one()
+
+    async def _count(self, query: Select) -> int:
+        """
+        Returns the count of the records.
+
+        :param query: The query to execute.
+        """
+        query = query.subquery()  # pragma: no cover
+        query = await self.session.scalars(
+            self._on_replica(select(func.count()).select_from(query))
+        )  # pragma: no cover
+        return query.one()  # pragma: no cover
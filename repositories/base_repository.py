@@ -1,21 +1,593 @@
+from datetime import datetime
 from functools import reduce
-from typing import Any, Generic, Type, TypeVar, Union
-
-from sqlalchemy import Select, func
+from itertools import islice
+from typing import Any, Callable, Generic, Iterable, Iterator, Literal, Type, TypeVar, Union
+
+from sqlalchemy import (
+    Integer,
+    inspect,
+    Select,
+    Update,
+    bindparam,
+    column,
+    exists,
+    func,
+    insert,
+    literal,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.declarative import DeclarativeMeta
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
 from sqlalchemy.sql.expression import select
 
 from configs.database import ModelType
-from exceptions.app_exception import ResourceNotFound
+from exceptions.app_exception import ConflictError, NotFoundError, ResourceNotFound
+from utils.db import parse_updated_at
+from utils.pagination import decode_cursor, encode_cursor
+from utils.query_cache import CACHE_TTL_OPTION
+from utils.read_replicas import REPLICA_OPTION
 
 T = TypeVar("T", bound=DeclarativeMeta)
 
+RelationshipLoading = Literal["selectin", "joined", "raise"]
 
-class BaseRepository(Generic[ModelType]):
-    """Base class for data repositories."""
+# eager loaders of the join_ relationships ("raise" ones are never loaded)
+_LOADER_OPTIONS = {
+    "selectin": selectinload,
+    "joined": joinedload,
+}
+
+# rows sent per execute() by the bulk methods; SQLAlchemy further pages
+# INSERTs with insertmanyvalues
+BULK_BATCH_SIZE = 1000
+
+# statements kept per repository class by _statement; the shapes are bounded
+# by the code (fields, join sets, sort columns), the cap is a safety net
+STATEMENT_CACHE_SIZE = 256
+
+
+def _join_key(join_: set[str] | None) -> frozenset[str] | None:
+    return frozenset(join_) if join_ is not None else None
+
+
+def _batched(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class QueryBuilderMixin(Generic[ModelType]):
+    """
+    Query building shared by BaseRepository and AsyncBaseRepository.
+
+    Only builds statements, never touches the session: the repositories
+    execute them with a Session or an AsyncSession.
+    """
 
     model: Type[ModelType]
+    # seconds get_by / get_by_id / get_all results are cached for (None: no
+    # cache); entries are invalidated when a write to the table commits
+    cache_ttl: float | None = None
+    # join_ name -> loading strategy of the model relationship of that name:
+    # "selectin" (default, one extra IN query, right for collections),
+    # "joined" (same query, right for many-to-one) or "raise" (never loaded,
+    # lazy loading it raises). A _join_<name> method takes precedence.
+    relationship_loading: dict[str, RelationshipLoading] = {}
+    # reuse one statement per query shape (get_by / get_by_id / get_all with
+    # their join set and sort) with the values as bound parameters
+    statement_cache: bool = True
+    _statements: dict[tuple, Select] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._statements = {}
+
+    def _query(
+        self,
+        join_: set[str] | None = None,
+        order_: dict | None = None,
+    ) -> Select:
+        """
+        Returns a callable that can be used to query the model.
+
+        :param join_: The joins to make.
+        :param order_: The order of the results. (e.g desc, asc)
+        :return: A callable that can be used to query the model.
+        """
+        query = select(self.model)  # pragma: no cover
+        query = self._maybe_join(query, join_)  # pragma: no cover
+        query = self._raise_on_load(query)  # pragma: no cover
+        query = self._maybe_ordered(query, order_)  # pragma: no cover
+
+        return query  # pragma: no cover
+
+    def _statement(self, key: tuple, build: Callable[[], Select]) -> Select:
+        """
+        Returns the statement of a query shape, built on first use and then
+        shared by every instance of the repository class.
+
+        The values are bound parameters, so the same statement object is
+        executed each time: no query building per call, and SQLAlchemy reuses
+        the cache key memoized on the statement to find its compiled form.
+
+        :param key: The query shape.
+        :param build: Builds the statement of the shape.
+        :return: The statement.
+        """
+        if not self.statement_cache:
+            return build()
+
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = build()
+            if len(self._statements) < STATEMENT_CACHE_SIZE:
+                self._statements[key] = statement
+        return statement
+
+    def _get_by_statement(
+        self,
+        field: str,
+        value: Any,
+        join_: set[str] | None = None,
+        use_primary: bool = False,
+    ) -> tuple[Select, dict[str, Any]]:
+        """
+        Returns the get_by / get_by_id statement and its parameters.
+
+        :param field: The field to match.
+        :param value: The value to match.
+        :param join_: The joins to make.
+        :param use_primary: Leave out the replica and query cache options.
+        :return: The statement and its parameters.
+        """
+
+        def read(query: Select) -> Select:
+            if use_primary:
+                return query
+            return self._on_replica(self._cacheable(query))
+
+        if value is None:
+            # IS NULL is not a comparison with a parameter
+            return read(self._get_by(self._query(join_), field, value)), {}
+
+        def build() -> Select:
+            return read(self._get_by(self._query(join_), field, bindparam("value")))
+
+        key = ("get_by", field, _join_key(join_), use_primary, self.cache_ttl)
+        return self._statement(key, build), {"value": value}
+
+    def _page_statement(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        join_: set[str] | None = None,
+        sort_by: str | None = None,
+        sort_desc: bool = False,
+        with_total: bool = False,
+    ) -> tuple[Select, dict[str, Any]]:
+        """
+        Returns the get_all statement and its parameters.
+
+        :param skip: The number of records to skip.
+        :param limit: The number of record to return.
+        :param join_: The joins to make.
+        :param sort_by: The field name to sort by. If None, no sorting is applied.
+        :param sort_desc: If True, sort in descending order.
+        :param with_total: Whether the statement has the total column (_with_total).
+        :return: The statement and its parameters.
+        """
+        if sort_by is not None and getattr(self.model, sort_by, None) is None:
+            # not sorted by _paginated_query either; keeps client input out of the keys
+            sort_by = None
+
+        def build() -> Select:
+            query = self._paginated_query(
+                bindparam("skip", type_=Integer),
+                bindparam("limit", type_=Integer),
+                join_,
+                sort_by,
+                sort_desc,
+            )
+            if with_total:
+                query = self._with_total(query)
+            return self._on_replica(self._cacheable(query))
+
+        key = ("page", _join_key(join_), sort_by, sort_desc, with_total, self.cache_ttl)
+        return self._statement(key, build), {"skip": skip, "limit": limit}
+
+    def _cacheable(self, query: Select) -> Select:
+        """
+        Returns the query served by the query result cache when the repository
+        declares a cache_ttl.
+
+        :param query: The query to cache.
+        :return: The query with the cache execution option, or unchanged.
+        """
+        if not self.cache_ttl:
+            return query
+
+        return query.execution_options(**{CACHE_TTL_OPTION: self.cache_ttl})
+
+    def _on_replica(self, query: Select) -> Select:
+        """
+        Returns the query allowed to run on a read replica (RoutingSession);
+        it still runs on the primary once the transaction has written.
+
+        :param query: The read query.
+        :return: The query with the replica execution option.
+        """
+        return query.execution_options(**{REPLICA_OPTION: True})
+
+    def _update_if_unchanged_query(
+        self,
+        entity_id: Union[int, str],
+        data: dict[str, Any],
+        client_updated_at: str | datetime,
+        id_key: str = "id",
+        version_key: str = "updated_at",
+    ) -> Update:
+        """
+        Returns the conditional UPDATE of update_if_unchanged.
+
+        :param entity_id: The id of the row to update.
+        :param data: The attributes to set.
+        :param client_updated_at: The version_key value the client read.
+        :param id_key: The id field name.
+        :param version_key: The field changing on every update.
+        :return: The UPDATE returning the updated entity.
+        """
+        return (
+            update(self.model)
+            .where(
+                getattr(self.model, id_key) == entity_id,
+                getattr(self.model, version_key) == parse_updated_at(client_updated_at),
+            )
+            .values(**data)
+            .returning(self.model)
+        )
+
+    def _bulk_update_if_unchanged_query(
+        self,
+        rows: list[dict[str, Any]],
+        id_key: str = "id",
+        version_key: str = "updated_at",
+    ) -> Update:
+        """
+        Returns the UPDATE ... FROM (VALUES ...) of bulk_update_if_unchanged.
+
+        :param rows: The rows to update.
+        :param id_key: The id field name.
+        :param version_key: The field changing on every update.
+        :return: The UPDATE returning the updated entities.
+        """
+        fields = [key for key in rows[0] if key not in (id_key, version_key)]
+        keys = [id_key, version_key, *fields]
+        if any(row.keys() != rows[0].keys() for row in rows):
+            raise ValueError("Every row must contain the same keys")
+
+        data = values(
+            *[column(key, getattr(self.model, key).type) for key in keys], name="data"
+        ).data(
+            [
+                tuple(
+                    parse_updated_at(row[key]) if key == version_key else row[key]
+                    for key in keys
+                )
+                for row in rows
+            ]
+        )
+
+        return (
+            update(self.model)
+            .where(
+                getattr(self.model, id_key) == data.c[id_key],
+                getattr(self.model, version_key) == data.c[version_key],
+            )
+            .values({field: data.c[field] for field in fields})
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _exists_query(self, entity_id: Union[int, str], id_key: str = "id") -> Select:
+        return select(exists().where(getattr(self.model, id_key) == entity_id))
+
+    def _paginated_query(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        join_: set[str] | None = None,
+        sort_by: str | None = None,
+        sort_desc: bool = False,
+    ) -> Select:
+        """
+        Returns the query for a page of model instances.
+
+        :param skip: The number of records to skip.
+        :param limit: The number of record to return.
+        :param join_: The joins to make.
+        :param sort_by: The field name to sort by. If None, no sorting is applied.
+        :param sort_desc: If True, sort in descending order.
+        :return: The paginated query.
+        """
+        query = self._query(join_)
+
+        # Apply sorting if sort_by is provided
+        if sort_by is not None:
+            sort_column = getattr(self.model, sort_by, None)
+            if sort_column is not None:
+                if sort_desc:
+                    query = query.order_by(sort_column.desc())
+                else:
+                    query = query.order_by(sort_column.asc())
+
+        return query.offset(skip).limit(limit)
+
+    def _fingerprint_query(self, conditions: list | None, version_key: str) -> Select:
+        query = select(func.max(getattr(self.model, version_key)), func.count()).select_from(
+            self.model
+        )
+        if conditions:
+            query = self._get_by_muti_fields(query, conditions)
+        return self._on_replica(query)
+
+    def _stream_query(
+        self,
+        conditions: list | None = None,
+        join_: set[str] | None = None,
+        sort_by: str | None = None,
+        sort_desc: bool = False,
+        yield_per: int = 1000,
+    ) -> Select:
+        """
+        Returns the query used by stream().
+
+        :param conditions: List of conditions.
+        :param join_: The joins to make.
+        :param sort_by: The field name to sort by. If None, no sorting is applied.
+        :param sort_desc: If True, sort in descending order.
+        :param yield_per: The number of rows fetched per round trip.
+        :return: The query with yield_per (server side cursor) enabled.
+        """
+        query = self._query(join_)
+        if conditions:
+            query = self._get_by_muti_fields(query, conditions)
+        if sort_by is not None:
+            query = self._sort_by(query, sort_by, "desc" if sort_desc else "asc")
+
+        return query.execution_options(yield_per=yield_per)
+
+    def _keyset_columns(self, sort_by: str, tiebreaker: str) -> list[str]:
+        # the keyset is built from client input: only mapped columns are allowed
+        fields = [sort_by] if sort_by == tiebreaker else [sort_by, tiebreaker]
+        columns = inspect(self.model).column_attrs
+        for field in fields:
+            if field not in columns:
+                raise NotFoundError(field)
+        return fields
+
+    def _keyset_query(
+        self,
+        sort_by: str,
+        limit: int = 100,
+        cursor: str | None = None,
+        sort_desc: bool = False,
+        tiebreaker: str = "id",
+        join_: set[str] | None = None,
+    ) -> Select:
+        """
+        Returns the query of a keyset page, fetching one extra row to detect
+        whether a next page exists.
+
+        :param sort_by: The field name to sort by.
+        :param limit: The number of record to return.
+        :param cursor: The cursor of the previous page.
+        :param sort_desc: If True, sort in descending order.
+        :param tiebreaker: A unique field making the order total.
+        :param join_: The joins to make.
+        :return: The keyset query.
+        """
+        fields = self._keyset_columns(sort_by, tiebreaker)
+        columns = [getattr(self.model, field) for field in fields]
+        query = self._query(join_)
+
+        if cursor is not None:
+            values = decode_cursor(cursor, len(columns))
+            key, bound = tuple_(*columns), tuple_(*[literal(v) for v in values])
+            query = query.where(key < bound if sort_desc else key > bound)
+
+        for column in columns:
+            query = query.order_by(column.desc() if sort_desc else column.asc())
+
+        return query.limit(limit + 1)
+
+    def _keyset_page(
+        self, items: list[ModelType], limit: int, sort_by: str, tiebreaker: str
+    ) -> tuple[list[ModelType], str | None]:
+        if len(items) <= limit:
+            return items, None
+
+        items = items[:limit]
+        last = items[-1]
+        fields = self._keyset_columns(sort_by, tiebreaker)
+        return items, encode_cursor(tuple(getattr(last, field) for field in fields))
+
+    def _bulk_create_query(self, return_ids: bool, id_key: str):
+        query = insert(self.model)
+        if return_ids:
+            query = query.returning(getattr(self.model, id_key), sort_by_parameter_order=True)
+        return query
+
+    def _upsert_query(
+        self,
+        first: dict[str, Any],
+        conflict_keys: list[str] | None,
+        update_fields: list[str] | None,
+        return_ids: bool,
+        id_key: str,
+    ):
+        """
+        Returns the INSERT ... ON CONFLICT statement of upsert.
+
+        :param first: The first row, giving the default update_fields.
+        :param conflict_keys: The columns of the unique constraint, [id_key] by default.
+        :param update_fields: The columns to update on conflict, DO NOTHING when empty.
+        :param return_ids: Whether the statement returns the ids.
+        :param id_key: The id field name.
+        :return: The upsert statement.
+        """
+        conflict_keys = conflict_keys or [id_key]
+        if update_fields is None:
+            update_fields = [key for key in first if key not in conflict_keys]
+
+        query = pg_insert(self.model)
+        if update_fields:
+            query = query.on_conflict_do_update(
+                index_elements=conflict_keys,
+                set_={field: query.excluded[field] for field in update_fields},
+            )
+            if return_ids:
+                query = query.returning(getattr(self.model, id_key), sort_by_parameter_order=True)
+        else:
+            query = query.on_conflict_do_nothing(index_elements=conflict_keys)
+            if return_ids:
+                # skipped rows return nothing, which breaks the correlation of
+                # sort_by_parameter_order with the rows: ids in no given order
+                query = query.returning(getattr(self.model, id_key))
+        return query
+
+    def _with_total(self, query: Select) -> Select:
+        return query.add_columns(func.count().over().label("total"))
+
+    def _sort_by(
+        self,
+        query: Select,
+        sort_by: str,
+        order: str | None = "asc",
+        case_insensitive: bool = False,
+    ) -> Select:
+        """
+        Returns the query sorted by the given column.
+
+        :param query: The query to sort.
+        :param sort_by: The column to sort by.
+        :param order: The order to sort by.
+        :param model: The model to sort.
+        :param case_insensitive: Whether to sort case insensitively.
+        :return: The sorted query.
+        """
+
+        order_column = None
+
+        if case_insensitive:
+            order_column = func.lower(getattr(self.model, sort_by))  # pragma: no cover
+        else:
+            order_column = getattr(self.model, sort_by)
+
+        if order == "desc":
+            return query.order_by(order_column.desc())  # pragma: no cover
+
+        return query.order_by(order_column.asc())
+
+    def _get_by(self, query: Select, field: str, value: Any) -> Select:
+        """
+        Returns the query filtered by the given column.
+
+        :param query: The query to filter.
+        :param field: The column to filter by.
+        :param value: The value to filter by.
+        :return: The filtered query.
+        """
+        return query.where(getattr(self.model, field) == value)
+
+    def _get_by_muti_fields(self, query: Select, conditions: list) -> Select:
+        """
+        Returns the query filtered by the given column.
+
+        :param query: The query to filter.
+        :param conditions: list of conditions
+        :return: The filtered query.
+        """
+        return query.filter(*conditions)
+
+    def _maybe_join(self, query: Select, join_: set[str] | None = None) -> Select:
+        """
+        Returns the query with the given joins.
+
+        :param query: The query to join.
+        :param join_: The joins to make.
+        :return: The query with the given joins.
+        """
+        if not join_:
+            return query
+
+        if not isinstance(join_, set):
+            raise TypeError("join_ must be a set")
+
+        return reduce(self._add_join_to_query, join_, query)
+
+    def _maybe_ordered(self, query: Select, order_: dict | None = None) -> Select:
+        """
+        Returns the query ordered by the given column.
+
+        :param query: The query to order.
+        :param order_: The order to make.
+        :return: The query ordered by the given column.
+        """
+        if order_:
+            if order_["asc"]:
+                for order in order_["asc"]:
+                    query = query.order_by(getattr(self.model, order).asc())
+            else:
+                for order in order_["desc"]:
+                    query = query.order_by(getattr(self.model, order).desc())
+
+        return query
+
+    def _add_join_to_query(self, query: Select, join_: str) -> Select:
+        """
+        Returns the query with the given join.
+
+        The _join_<name> method of the repository is used when defined,
+        otherwise the model relationship is eager loaded with the strategy
+        declared in relationship_loading (selectin by default).
+
+        :param query: The query to join.
+        :param join_: The join to make.
+        :return: The query with the given join.
+        """
+        method = getattr(self, "_join_" + join_, None)
+        if method is not None:
+            return method(query)  # pragma: no cover
+
+        strategy = self.relationship_loading.get(join_, "selectin")
+        if strategy == "raise":
+            raise ValueError(f"{self.model.__name__}.{join_} is declared as never loaded")
+
+        relationship = getattr(self.model, join_, None)
+        if relationship is None:
+            raise ValueError(f"{self.model.__name__} has no relationship {join_}")
+
+        return query.options(_LOADER_OPTIONS[strategy](relationship))
+
+    def _raise_on_load(self, query: Select) -> Select:
+        """
+        Returns the query with raiseload for the relationships declared "raise".
+
+        :param query: The query to modify.
+        :return: The query with the raiseload options.
+        """
+        for name, strategy in self.relationship_loading.items():
+            if strategy == "raise":
+                query = query.options(raiseload(getattr(self.model, name)))
+
+        return query
+
+
+class BaseRepository(QueryBuilderMixin[ModelType]):
+    """Base class for data repositories."""
 
     def __init__(self, db_session: Session):
         """
@@ -46,6 +618,73 @@ class BaseRepository(Generic[ModelType]):
             self.session.rollback()
             raise
 
+    def bulk_create(
+        self,
+        rows: Iterable[dict[str, Any]],
+        return_ids: bool = False,
+        id_key: str = "id",
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> list[Any] | None:
+        """
+        Inserts many rows with multi-row INSERTs (insertmanyvalues) instead of
+        one flush per model instance.
+
+        :param rows: The attributes of the rows to insert.
+        :param return_ids: Whether to return the generated ids.
+        :param id_key: The id field name.
+        :param batch_size: The number of rows sent per execute().
+        :return: The generated ids in the order of rows if return_ids, else None.
+        """
+        query = self._bulk_create_query(return_ids, id_key)
+        return self._execute_bulk(query, rows, return_ids, batch_size)
+
+    def upsert(
+        self,
+        rows: Iterable[dict[str, Any]],
+        conflict_keys: list[str] | None = None,
+        update_fields: list[str] | None = None,
+        return_ids: bool = False,
+        id_key: str = "id",
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> list[Any] | None:
+        """
+        Inserts many rows with INSERT ... ON CONFLICT DO UPDATE.
+
+        :param rows: The attributes of the rows to insert or update.
+        :param conflict_keys: The columns of the unique constraint, [id_key] by default.
+        :param update_fields: The columns to update on conflict, every non
+            conflict column of the first row by default. When empty, conflicting
+            rows are skipped (ON CONFLICT DO NOTHING).
+        :param return_ids: Whether to return the ids of the inserted/updated rows.
+        :param id_key: The id field name.
+        :param batch_size: The number of rows sent per execute().
+        :return: The ids if return_ids, else None; in the order of rows, except
+            with ON CONFLICT DO NOTHING where only the inserted rows return an
+            id, in no particular order.
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return [] if return_ids else None
+
+        query = self._upsert_query(first, conflict_keys, update_fields, return_ids, id_key)
+        return self._execute_bulk(query, [first, *rows], return_ids, batch_size)
+
+    def bulk_update(
+        self,
+        rows: Iterable[dict[str, Any]],
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> None:
+        """
+        Updates many rows by primary key with executemany UPDATEs, without
+        loading the entities first.
+
+        :param rows: The attributes to set; each row must contain the primary key.
+        :param batch_size: The number of rows sent per execute().
+        :return: None
+        """
+        self._execute_bulk(update(self.model), rows, False, batch_size)
+
     def update(
         self,
         entity_id: Union[int, str],
@@ -54,7 +693,8 @@ class BaseRepository(Generic[ModelType]):
         id_key: str = "id",
     ) -> ModelType:
         try:
-            model_instance = self.get_by_id(entity_id, join_, id_key)
+            # the row to modify is read from the primary, a replica may lag behind
+            model_instance = self.get_by_id(entity_id, join_, id_key, use_primary=True)
 
             if not model_instance:
                 raise ResourceNotFound()
@@ -68,6 +708,80 @@ class BaseRepository(Generic[ModelType]):
                 self.session.rollback()
             raise
 
+    def update_if_unchanged(
+        self,
+        entity_id: Union[int, str],
+        data: dict[str, Any],
+        client_updated_at: str | datetime,
+        id_key: str = "id",
+        version_key: str = "updated_at",
+    ) -> ModelType:
+        """
+        Updates the row only if it was not modified since the client read it,
+        checking and writing in a single UPDATE ... WHERE ... RETURNING.
+
+        :param entity_id: The id of the row to update.
+        :param data: The attributes to set.
+        :param client_updated_at: The version_key value the client read, at
+            the stored precision (isoformat(), not the seconds of utils.response).
+        :param id_key: The id field name.
+        :param version_key: The field changing on every update.
+        :return: The updated model instance.
+        :raises ConflictError: If the row was modified in the meantime.
+        :raises ResourceNotFound: If the row does not exist.
+        """
+        query = self._update_if_unchanged_query(
+            entity_id, data, client_updated_at, id_key, version_key
+        )
+        try:
+            model_instance = self.session.scalars(query).one_or_none()
+            if model_instance is None:
+                # no row matched: tell a missing row from a stale version
+                if not self.session.scalar(self._exists_query(entity_id, id_key)):
+                    raise ResourceNotFound()
+                raise ConflictError()
+
+            return model_instance
+        except Exception as e:
+            if not isinstance(e, (ResourceNotFound, ConflictError)):
+                self.session.rollback()
+            raise
+
+    def bulk_update_if_unchanged(
+        self,
+        rows: list[dict[str, Any]],
+        id_key: str = "id",
+        version_key: str = "updated_at",
+    ) -> list[ModelType]:
+        """
+        Updates many rows only if none was modified since the client read them,
+        with one UPDATE ... FROM (VALUES ...) RETURNING.
+
+        The update is all or nothing: when a row does not match, the session
+        is rolled back and ConflictError raised.
+
+        :param rows: The rows to update; each contains id_key, version_key
+            (the value the client read, at the stored precision) and the
+            same attributes to set.
+        :param id_key: The id field name.
+        :param version_key: The field changing on every update.
+        :return: The updated model instances.
+        :raises ConflictError: If any row was modified or deleted in the meantime.
+        """
+        if not rows:
+            return []
+
+        query = self._bulk_update_if_unchanged_query(rows, id_key, version_key)
+        try:
+            model_instances = self.session.scalars(query).all()
+            if len(model_instances) != len(rows):
+                raise ConflictError()
+
+            return model_instances
+        except Exception:
+            self.session.rollback()
+            raise
+
     def get_all(
         self,
         skip: int = 0,
@@ -75,7 +789,8 @@ class BaseRepository(Generic[ModelType]):
         join_: set[str] | None = None,
         sort_by: str | None = None,
         sort_desc: bool = False,
-    ) -> list[ModelType]:
+        with_total: bool = False,
+    ) -> list[ModelType] | tuple[list[ModelType], int]:
         """
         Returns a list of model instances.
 
@@ -84,25 +799,55 @@ class BaseRepository(Generic[ModelType]):
         :param join_: The joins to make.
         :param sort_by: The field name to sort by. If None, no sorting is applied.
         :param sort_desc: If True, sort in descending order. If False, sort in ascending order.
-        :return: A list of model instances.
+        :param with_total: If True, also return the total number of records,
+            computed by a window function in the same round trip.
+        :return: A list of model instances, or (instances, total) with with_total.
         """
-        query = self._query(join_)
+        query, params = self._page_statement(skip, limit, join_, sort_by, sort_desc, with_total)
 
-        # Apply sorting if sort_by is provided
-        if sort_by is not None:
-            sort_column = getattr(self.model, sort_by, None)
-            if sort_column is not None:
-                if sort_desc:
-                    query = query.order_by(sort_column.desc())
-                else:
-                    query = query.order_by(sort_column.asc())
+        if with_total:
+            return self._all_with_total(query, skip, unique=join_ is not None, params=params)
 
-        query = query.offset(skip).limit(limit)
+        if join_ is not None:
+            return self._all_unique(query, params)
+
+        return self._all(query, params)
+
+    def get_page_by_cursor(
+        self,
+        sort_by: str,
+        limit: int = 100,
+        cursor: str | None = None,
+        sort_desc: bool = False,
+        tiebreaker: str = "id",
+        join_: set[str] | None = None,
+    ) -> tuple[list[ModelType], str | None]:
+        """
+        Returns a page of model instances using keyset (cursor) pagination.
+
+        Unlike get_all(skip=...), the cost does not grow with the page depth:
+        the next page starts with an index friendly (sort_by, tiebreaker) > (...)
+        predicate. sort_by should be NOT NULL and (sort_by, tiebreaker) indexed.
+
+        :param sort_by: The field name to sort by.
+        :param limit: The number of record to return.
+        :param cursor: The cursor returned with the previous page, None for the first page.
+        :param sort_desc: If True, sort in descending order.
+        :param tiebreaker: A unique field making the order total.
+        :param join_: The joins to make.
+        :return: The model instances and the cursor of the next page (None on the last page).
+        :raises NotFoundError: If sort_by or tiebreaker is not a column of the model.
+        :raises InvalidCursor: If the cursor is malformed.
+        """
+        query = self._keyset_query(sort_by, limit, cursor, sort_desc, tiebreaker, join_)
+        query = self._on_replica(query)
 
         if join_ is not None:
-            return self.all_unique(query)
+            items = self._all_unique(query)
+        else:
+            items = self._all(query)
 
-        return self._all(query)
+        return self._keyset_page(items, limit, sort_by, tiebreaker)
 
     def get_by_muti_fields(
         self,
@@ -114,13 +859,14 @@ class BaseRepository(Generic[ModelType]):
 
         :param conditions: List of condition.
         :param join_: The joins to make.
-        :return: The model instance.
+        :return: The model instance, with or without join_ (the joined rows
+            are deduplicated).
         """
         query = self._query(join_)
-        query = self._get_by_muti_fields(query, conditions)
+        query = self._on_replica(self._get_by_muti_fields(query, conditions))
 
         if join_ is not None:
-            return self.all_unique(query)
+            return self._one_unique(query)
         return self._one(query)
 
     def get_all_by_muti_fields(
@@ -136,7 +882,7 @@ class BaseRepository(Generic[ModelType]):
         :return: A list of model instances.
         """
         query = self._query(join_)
-        query = self._get_by_muti_fields(query, conditions)
+        query = self._on_replica(self._get_by_muti_fields(query, conditions))
 
         return self._all(query)
 
@@ -153,35 +899,94 @@ class BaseRepository(Generic[ModelType]):
         :param field: The field to match.
         :param value: The value to match.
         :param join_: The joins to make.
-        :return: The model instance.
+        :param unique: Return the single matching instance or None instead of
+            the list of matches.
+        :return: The model instance or None when unique, the list of model
+            instances otherwise, with or without join_.
         """
-        query = self._query(join_)
-        query = self._get_by(query, field, value)
+        query, params = self._get_by_statement(field, value, join_)
 
-        if join_ is not None:
-            return self.all_unique(query)
         if unique:
-            return self._one_or_none(query)
+            if join_ is not None:
+                return self._one_or_none_unique(query, params)
+            return self._one_or_none(query, params)
+        if join_ is not None:
+            return self._all_unique(query, params)
 
-        return self._all(query)
+        return self._all(query, params)
 
     def get_by_id(
-        self, value: Any, join_: set[str] | None = None, id_key="id"
-    ) -> ModelType:
+        self,
+        value: Any,
+        join_: set[str] | None = None,
+        id_key="id",
+        use_primary: bool = False,
+    ) -> ModelType | None:
         """
         Returns the model instance matching the field and value.
 
         :param value: The value to match.
         :param join_: The joins to make.
         :param id_key: The id field name.
-        :return: The model instance.
+        :param use_primary: Read from the primary, bypassing the read replicas
+            and the query cache (lookups before a write).
+        :return: The model instance or None, with or without join_.
         """
-        query = self._query(join_)
-        query = self._get_by(query, id_key, value)
+        query, params = self._get_by_statement(id_key, value, join_, use_primary)
 
         if join_ is not None:
-            return self.all_unique(query)
-        return self._one_or_none(query)
+            return self._one_or_none_unique(query, params)
+        return self._one_or_none(query, params)
+
+    def fingerprint(
+        self, conditions: list | None = None, version_key: str = "updated_at"
+    ) -> tuple[datetime | None, int]:
+        """
+        Returns max(version_key) and the count of the records matching the
+        conditions, in one aggregate query: a cheap fingerprint of the data
+        for conditional GETs (utils.etag.fingerprint_etag).
+
+        :param conditions: List of conditions.
+        :param version_key: The last modification time field name.
+        :return: The last modification time and the number of records.
+        """
+        query = self._fingerprint_query(conditions, version_key)
+
+        result = self.session.execute(query)
+        last_modified, count = result.one()
+        return last_modified, count
+
+    def stream(
+        self,
+        conditions: list | None = None,
+        join_: set[str] | None = None,
+        sort_by: str | None = None,
+        sort_desc: bool = False,
+        yield_per: int = 1000,
+    ) -> Iterator[ModelType]:
+        """
+        Yields the model instances matching the conditions without loading
+        them all at once.
+
+        Rows are fetched yield_per at a time through a server side cursor, so
+        memory stays flat whatever the size of the result. The session must
+        not be committed while iterating (it would close the cursor), and
+        joins must not eager load collections.
+
+        :param conditions: List of conditions.
+        :param join_: The joins to make.
+        :param sort_by: The field name to sort by. If None, no sorting is applied.
+        :param sort_desc: If True, sort in descending order.
+        :param yield_per: The number of rows fetched per round trip.
+        :return: An iterator of model instances.
+        """
+        query = self._stream_query(conditions, join_, sort_by, sort_desc, yield_per)
+
+        result = self.session.scalars(query)
+        try:
+            yield from result
+        finally:
+            result.close()
 
     def delete(self, entity: ModelType) -> None:
         """
@@ -205,45 +1010,98 @@ class BaseRepository(Generic[ModelType]):
         :return: None
         """
         try:
-            entity = self.get_by_id(id, id_key=id_key)
+            entity = self.get_by_id(id, id_key=id_key, use_primary=True)
 
             self.session.delete(entity)
         except Exception:
             self.session.rollback()
             raise
 
-    def _query(
+    def _all_with_total(
         self,
-        join_: set[str] | None = None,
-        order_: dict | None = None,
-    ) -> Select:
+        query: Select,
+        skip: int = 0,
+        unique: bool = False,
+        params: dict[str, Any] | None = None,
+    ) -> tuple[list[ModelType], int]:
         """
-        Returns a callable that can be used to query the model.
+        Returns all results from the query with the total number of records
+        ignoring offset/limit.
+
+        :param query: The paginated query to execute, with the total column (_with_total).
+        :param skip: The offset of the query.
+        :param unique: Whether to deduplicate joined rows.
+        :param params: The bound parameter values of the query.
+        :return: A list of model instances and the total.
+        """
+        result = self.session.execute(query, params)
+        if unique:
+            result = result.unique()
+        rows = result.all()
 
-        :param join_: The joins to make.
-        :param order_: The order of the results. (e.g desc, asc)
-        :return: A callable that can be used to query the model.
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
+        if not skip:
+            return [], 0
+
+        # page past the end: the window count is unknown without rows
+        return [], self._count(query.limit(None).offset(None))
+
+    def _execute_bulk(
+        self,
+        query,
+        rows: Iterable[dict[str, Any]],
+        returning: bool,
+        batch_size: int,
+    ) -> list[Any] | None:
         """
-        query = select(self.model)  # pragma: no cover
-        query = self._maybe_join(query, join_)  # pragma: no cover
-        query = self._maybe_ordered(query, order_)  # pragma: no cover
+        Executes a DML statement for batches of rows, rolling back on error.
 
-        return query  # pragma: no cover
+        :param query: The INSERT/UPDATE statement.
+        :param rows: The parameters of every row.
+        :param returning: Whether the statement returns ids to collect.
+        :param batch_size: The number of rows sent per execute().
+        :return: The returned ids if returning, else None.
+        """
+        ids = []
+        try:
+            for batch in _batched(rows, batch_size):
+                result = self.session.execute(query, batch)
+                if returning:
+                    ids.extend(result.scalars().all())
+        except Exception:
+            self.session.rollback()
+            raise
 
-    def _all(self, query: Select) -> list[ModelType]:
+        return ids if returning else None
+
+    def _all(self, query: Select, params: dict[str, Any] | None = None) -> list[ModelType]:
         """
         Returns all results from the query.
 
         :param query: The query to execute.
+        :param params: The bound parameter values of the query.
         :return: A list of model instances.
         """
-        query = self.session.scalars(query)
+        query = self.session.scalars(query, params)
         return query.all()
 
-    def _all_unique(self, query: Select) -> list[ModelType]:
-        result = self.session.execute(query)
+    def _all_unique(self, query: Select, params: dict[str, Any] | None = None) -> list[ModelType]:
+        result = self.session.execute(query, params)
         return result.unique().scalars().all()
 
+    def _one_or_none_unique(
+        self, query: Select, params: dict[str, Any] | None = None
+    ) -> ModelType | None:
+        """Returns the deduplicated (joined eager loads) result from the query or None."""
+        result = self.session.execute(query, params)
+        return result.unique().scalars().one_or_none()
+
+    def _one_unique(self, query: Select) -> ModelType:
+        """Returns the deduplicated result from the query or raises NoResultFound."""
+        result = self.session.execute(query)
+        return result.unique().scalars().one()
+
     def _first(self, query: Select) -> ModelType | None:
         """
         Returns the first result from the query.
@@ -254,9 +1112,9 @@ class BaseRepository(Generic[ModelType]):
         query = self.session.scalars(query)
         return query.first()
 
-    def _one_or_none(self, query: Select) -> ModelType | None:
+    def _one_or_none(self, query: Select, params: dict[str, Any] | None = None) -> ModelType | None:
         """Returns the first result from the query or None."""
-        query = self.session.scalars(query)
+        query = self.session.scalars(query, params)
         return query.one_or_none()
 
     def _one(self, query: Select) -> ModelType:
@@ -277,101 +1135,6 @@ class BaseRepository(Generic[ModelType]):
         """
         query = query.subquery()  # pragma: no cover
         query = self.session.scalars(
-            select(func.count()).select_from(query)
+            self._on_replica(select(func.count()).select_from(query))
         )  # pragma: no cover
         return query.one()  # pragma: no cover
-
-    def _sort_by(
-        self,
-        query: Select,
-        sort_by: str,
-        order: str | None = "asc",
-        case_insensitive: bool = False,
-    ) -> Select:
-        """
-        Returns the query sorted by the given column.
-
-        :param query: The query to sort.
-        :param sort_by: The column to sort by.
-        :param order: The order to sort by.
-        :param model: The model to sort.
-        :param case_insensitive: Whether to sort case insensitively.
-        :return: The sorted query.
-        """
-
-        order_column = None
-
-        if case_insensitive:
-            order_column = func.lower(getattr(self.model, sort_by))  # pragma: no cover
-        else:
-            order_column = getattr(self.model, sort_by)
-
-        if order == "desc":
-            return query.order_by(order_column.desc())  # pragma: no cover
-
-        return query.order_by(order_column.asc())
-
-    def _get_by(self, query: Select, field: str, value: Any) -> Select:
-        """
-        Returns the query filtered by the given column.
-
-        :param query: The query to filter.
-        :param field: The column to filter by.
-        :param value: The value to filter by.
-        :return: The filtered query.
-        """
-        return query.where(getattr(self.model, field) == value)
-
-    def _get_by_muti_fields(self, query: Select, conditions: list) -> Select:
-        """
-        Returns the query filtered by the given column.
-
-        :param query: The query to filter.
-        :param conditions: list of conditions
-        :return: The filtered query.
-        """
-        return query.filter(*conditions)
-
-    def _maybe_join(self, query: Select, join_: set[str] | None = None) -> Select:
-        """
-        Returns the query with the given joins.
-
-        :param query: The query to join.
-        :param join_: The joins to make.
-        :return: The query with the given joins.
-        """
-        if not join_:
-            return query
-
-        if not isinstance(join_, set):
-            raise TypeError("join_ must be a set")
-
-        return reduce(self._add_join_to_query, join_, query)
-
-    def _maybe_ordered(self, query: Select, order_: dict | None = None) -> Select:
-        """
-        Returns the query ordered by the given column.
-
-        :param query: The query to order.
-        :param order_: The order to make.
-        :return: The query ordered by the given column.
-        """
-        if order_:
-            if order_["asc"]:
-                for order in order_["asc"]:
-                    query = query.order_by(getattr(self.model, order).asc())
-            else:
-                for order in order_["desc"]:
-                    query = query.order_by(getattr(self.model, order).desc())
-
-        return query
-
-    def _add_join_to_query(self, query: Select, join_: set[str]) -> Select:
-        """
-        Returns the query with the given join.
-
-        :param query: The query to join.
-        :param join_: The join to make.
-        :return: The query with the given join.
-        """
-        return getattr(self, "_join_" + join_)(query)  # pragma: no cover
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+# configs.env reads the settings at import: tests run without a .env, on
+# SQLite, and must never reach the DATABASE_* of a developer's shell
+for name, value in {
+    "APP_NAME": "EXAM-API-TEST",
+    "API_VERSION": "0.0.1",
+    "ALGORITHMS_JWT": '["RS256"]',
+    "ENVIRONMENT": "PRODUCTION",
+    "DATABASE_HOSTNAME": "localhost",
+    "DATABASE_USERNAME": "test",
+    "DATABASE_PASSWORD": "test",
+    "DATABASE_PORT": "5432",
+    "DATABASE_NAME": "test",
+    "DATABASE_NAME_TEST": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+from tests.models import Base  # noqa: E402 (after the settings)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def async_session():
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
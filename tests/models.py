@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import declarative_base, relationship
+
+Base = declarative_base()
+
+
+class Parent(Base):
+    __tablename__ = "test_parent"
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String(20), unique=True, nullable=False)
+    name = Column(String(200))
+    updated_at = Column(DateTime, default=lambda: datetime(2024, 1, 1, 10, 0, 0))
+    children = relationship("Child")
+
+
+class Child(Base):
+    __tablename__ = "test_child"
+
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(ForeignKey("test_parent.id"))
@@ -0,0 +1,156 @@
+import json
+import uuid
+
+import pytest
+from starlette.responses import PlainTextResponse
+
+from configs.context import request_id
+from exceptions.app_exception import ConflictError
+from middlewares import auth_middleware
+from middlewares.auth_middleware import AuthMiddleware
+from middlewares.base_asgi_middleware import BaseASGIMiddleware
+from middlewares.request_logging_middleware import RequestLoggingMiddleware
+
+
+class GuardedMiddleware(BaseASGIMiddleware):
+    async def dispatch(self, scope, receive, send):
+        await self.call_next_guarded(scope, receive, send)
+
+
+def _scope(**kwargs):
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [],
+        "query_string": b"",
+        **kwargs,
+    }
+
+
+async def _call(app, scope=None):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope or _scope(), receive, send)
+    return messages
+
+
+def _status_and_body(messages):
+    start, body = messages
+    return start["status"], json.loads(body["body"])
+
+
+def _failing(exc, after_start=False):
+    async def app(scope, receive, send):
+        if after_start:
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+        raise exc
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_non_http_scopes_skip_dispatch():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["type"])
+
+    await _call(GuardedMiddleware(app), {"type": "lifespan"})
+
+    assert calls == ["lifespan"]
+
+
+@pytest.mark.asyncio
+async def test_response_passes_through():
+    messages = await _call(GuardedMiddleware(PlainTextResponse("ok")))
+
+    assert messages[0]["status"] == 200
+    assert messages[1]["body"] == b"ok"
+
+
+@pytest.mark.asyncio
+async def test_app_exception_becomes_its_failed_response():
+    messages = await _call(GuardedMiddleware(_failing(ConflictError())))
+
+    status, body = _status_and_body(messages)
+    assert status == 200
+    assert body["success"] is False
+    assert body["errors"][0]["code"] == "CONCURRENCY_CONFLICT_ERROR"
+
+
+@pytest.mark.asyncio
+async def test_unhandled_exception_becomes_a_system_error(mocker):
+    log = mocker.patch("middlewares.base_asgi_middleware.logger.exception")
+
+    messages = await _call(GuardedMiddleware(_failing(RuntimeError("boom"))))
+
+    status, body = _status_and_body(messages)
+    assert status == 500
+    assert body["errors"][0]["code"] == "SYSTEM_ERROR"
+    log.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("exc", [ConflictError(), RuntimeError("boom")])
+async def test_exception_after_the_response_started_is_raised(exc, mocker):
+    mocker.patch("middlewares.base_asgi_middleware.logger.exception")
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    with pytest.raises(type(exc)):
+        await GuardedMiddleware(_failing(exc, after_start=True))(_scope(), None, send)
+    # no second response start on the started response
+    assert [message["type"] for message in messages] == ["http.response.start"]
+
+
+@pytest.mark.asyncio
+async def test_request_logging_sets_a_request_id():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(request_id.get())
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    await _call(RequestLoggingMiddleware(app))
+
+    assert seen[0] != uuid.UUID(int=0)
+
+
+@pytest.mark.asyncio
+async def test_auth_rejects_a_missing_token(monkeypatch):
+    monkeypatch.setattr(auth_middleware.settings, "auth_enabled", True)
+    app = AuthMiddleware(PlainTextResponse("ok"))
+
+    _, body = _status_and_body(await _call(app))
+
+    assert body["errors"][0]["code"] == "UNAUTHORIZED"
+
+
+@pytest.mark.asyncio
+async def test_auth_sets_the_user_of_a_valid_token(monkeypatch, mocker):
+    monkeypatch.setattr(auth_middleware.settings, "auth_enabled", True)
+    verifier = mocker.Mock()
+    verifier.cached.return_value = {"preferred_username": "user@example.com", "name": "User"}
+    mocker.patch.object(auth_middleware, "get_token_verifier", return_value=verifier)
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen.update(scope["state"])
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    messages = await _call(
+        AuthMiddleware(app), _scope(headers=[(b"authorization", b"Bearer token")], state={})
+    )
+
+    assert messages[1]["body"] == b"ok"
+    assert seen == {"email": "user@example.com", "name": "User"}
+    verifier.cached.assert_called_once_with("token")
@@ -0,0 +1,135 @@
+import inspect
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+
+from exceptions.app_exception import ConflictError, ResourceNotFound
+from repositories.async_base_repository import AsyncBaseRepository
+from repositories.base_repository import BaseRepository, QueryBuilderMixin
+from tests.models import Child, Parent
+
+
+class AsyncParentRepository(AsyncBaseRepository[Parent]):
+    model = Parent
+
+
+class ParentRepository(BaseRepository[Parent]):
+    model = Parent
+
+
+@pytest_asyncio.fixture
+async def repository(async_session):
+    async_session.add_all(
+        Parent(id=i, code=f"C{i}", name=f"n{i % 2}", children=[Child()]) for i in range(1, 6)
+    )
+    await async_session.commit()
+    return AsyncParentRepository(async_session)
+
+
+def test_is_not_a_sync_repository():
+    assert issubclass(AsyncBaseRepository, QueryBuilderMixin)
+    assert not issubclass(AsyncBaseRepository, BaseRepository)
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        name
+        for name, member in vars(BaseRepository).items()
+        if inspect.isfunction(member) and name != "__init__"
+    ],
+)
+def test_every_database_method_is_a_coroutine(name):
+    method = getattr(AsyncBaseRepository, name)
+
+    assert inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method)
+
+
+def test_statements_are_shared_with_the_sync_repository(session, async_session):
+    sync_query = ParentRepository(session)._get_by_statement("code", "C1")[0]
+    async_query = AsyncParentRepository(async_session)._get_by_statement("code", "C1")[0]
+
+    assert str(sync_query) == str(async_query)
+
+
+@pytest.mark.asyncio
+async def test_reads(repository):
+    assert (await repository.get_by_id(2)).code == "C2"
+    assert await repository.get_by_id(99) is None
+    assert (await repository.get_by("code", "C3", unique=True)).id == 3
+    assert [parent.id for parent in await repository.get_by("name", "n1")] == [1, 3, 5]
+    assert (await repository.get_by_muti_fields([Parent.code == "C4"])).id == 4
+
+
+@pytest.mark.asyncio
+async def test_join_loads_the_relationship(repository):
+    parent = await repository.get_by_id(1, join_={"children"})
+
+    # a lazy load would raise MissingGreenlet outside of run_sync
+    assert len(parent.children) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_all(repository):
+    parents, total = await repository.get_all(1, 2, sort_by="id", sort_desc=True, with_total=True)
+
+    assert [parent.id for parent in parents] == [4, 3]
+    assert total == 5
+
+
+@pytest.mark.asyncio
+async def test_get_page_by_cursor(repository):
+    ids, cursor = [], None
+    while True:
+        parents, cursor = await repository.get_page_by_cursor("name", limit=2, cursor=cursor)
+        ids.extend(parent.id for parent in parents)
+        if cursor is None:
+            break
+
+    assert ids == [2, 4, 1, 3, 5]
+
+
+@pytest.mark.asyncio
+async def test_create_update_delete(repository, async_session):
+    created = await repository.create({"id": 10, "code": "C10"})
+    updated = await repository.update(10, {"name": "ten"})
+    await async_session.commit()
+
+    assert created is updated
+    assert (await repository.get_by_id(10)).name == "ten"
+
+    await repository.delete_by_id(10)
+    await async_session.commit()
+    assert await repository.get_by_id(10) is None
+
+
+@pytest.mark.asyncio
+async def test_update_missing_row(repository):
+    with pytest.raises(ResourceNotFound):
+        await repository.update(99, {"name": "none"})
+
+
+@pytest.mark.asyncio
+async def test_update_if_unchanged(repository):
+    read_at = datetime(2024, 1, 1, 10, 0, 0).isoformat()
+
+    updated = await repository.update_if_unchanged(1, {"name": "new"}, read_at)
+    assert updated.name == "new"
+
+    with pytest.raises(ConflictError):
+        await repository.update_if_unchanged(2, {"name": "new"}, "2023-01-01T00:00:00")
+    with pytest.raises(ResourceNotFound):
+        await repository.update_if_unchanged(99, {"name": "new"}, read_at)
+
+
+@pytest.mark.asyncio
+async def test_fingerprint(repository):
+    assert await repository.fingerprint() == (datetime(2024, 1, 1, 10, 0, 0), 5)
+
+
+@pytest.mark.asyncio
+async def test_stream(repository):
+    ids = [parent.id async for parent in repository.stream(sort_by="id", yield_per=2)]
+
+    assert ids == [1, 2, 3, 4, 5]
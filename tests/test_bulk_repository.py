@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from repositories.async_base_repository import AsyncBaseRepository
+from repositories.base_repository import BaseRepository
+from tests.models import Parent
+
+
+class ParentRepository(BaseRepository[Parent]):
+    model = Parent
+
+
+class AsyncParentRepository(AsyncBaseRepository[Parent]):
+    model = Parent
+
+
+def _rows(codes):
+    return [{"code": code, "name": f"name {code}"} for code in codes]
+
+
+def test_bulk_create_returns_ids_in_row_order(session):
+    repository = ParentRepository(session)
+    session.add(Parent(id=100, code="existing"))
+    session.flush()
+
+    codes = [f"C{i}" for i in range(7)]
+    ids = repository.bulk_create(_rows(codes), return_ids=True, batch_size=3)
+
+    by_id = dict(session.execute(select(Parent.id, Parent.code)).all())
+    assert [by_id[id_] for id_ in ids] == codes
+
+
+def test_bulk_create_without_ids(session):
+    assert ParentRepository(session).bulk_create(_rows(["A", "B"])) is None
+    assert session.scalar(select(Parent.code).where(Parent.code == "B")) == "B"
+
+
+def test_bulk_update(session):
+    repository = ParentRepository(session)
+    ids = repository.bulk_create(_rows(["A", "B"]), return_ids=True)
+
+    repository.bulk_update([{"id": ids[1], "name": "updated"}])
+
+    assert session.scalar(select(Parent.name).where(Parent.id == ids[1])) == "updated"
+    assert session.scalar(select(Parent.name).where(Parent.id == ids[0])) == "name A"
+
+
+def test_upsert_do_update_returns_ids_in_row_order():
+    query = ParentRepository(None)._upsert_query(
+        {"code": "A", "name": "a"}, ["code"], None, True, "id"
+    )
+
+    assert "ON CONFLICT (code) DO UPDATE SET name = excluded.name" in str(
+        query.compile(dialect=postgresql.dialect())
+    )
+    assert query._sort_by_parameter_order
+
+
+def test_upsert_do_nothing_does_not_correlate_ids():
+    # skipped rows return nothing: the ids cannot be matched to the rows
+    query = ParentRepository(None)._upsert_query({"code": "A"}, ["code"], [], True, "id")
+
+    assert "ON CONFLICT (code) DO NOTHING RETURNING" in str(
+        query.compile(dialect=postgresql.dialect())
+    )
+    assert not query._sort_by_parameter_order
+
+
+def test_upsert_empty_rows():
+    assert ParentRepository(None).upsert([], return_ids=True) == []
+
+
+@pytest.mark.asyncio
+async def test_async_bulk_create_and_update(async_session):
+    repository = AsyncParentRepository(async_session)
+
+    ids = await repository.bulk_create(_rows(["A", "B", "C"]), return_ids=True, batch_size=2)
+    assert await repository.bulk_create(_rows(["D"])) is None
+    await repository.bulk_update([{"id": ids[2], "name": "updated"}])
+
+    rows = (await async_session.execute(select(Parent.id, Parent.code, Parent.name))).all()
+    assert [code for _, code, _ in sorted(rows)] == ["A", "B", "C", "D"]
+    assert dict((id_, name) for id_, _, name in rows)[ids[2]] == "updated"
+    assert [dict((id_, code) for id_, code, _ in rows)[id_] for id_ in ids] == ["A", "B", "C"]
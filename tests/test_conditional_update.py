@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from exceptions.app_exception import ConflictError, ResourceNotFound
+from repositories.base_repository import BaseRepository
+from tests.models import Parent
+
+READ_AT = datetime(2024, 1, 1, 10, 0, 0)
+
+
+class ParentRepository(BaseRepository[Parent]):
+    model = Parent
+
+
+@pytest.fixture
+def repository(session):
+    session.add_all(
+        [
+            Parent(id=1, code="A", name="a", updated_at=READ_AT),
+            Parent(id=2, code="B", name="b", updated_at=datetime(2024, 1, 2)),
+            Parent(id=3, code="C", name="c", updated_at=datetime(2024, 1, 1, 10, 0, 0, 500000)),
+        ]
+    )
+    session.commit()
+    return ParentRepository(session)
+
+
+def test_update_if_unchanged(repository):
+    updated = repository.update_if_unchanged(1, {"name": "new"}, "2024-01-01T10:00:00")
+
+    assert updated.name == "new"
+    assert repository.session.scalar(select(Parent.name).where(Parent.id == 1)) == "new"
+
+
+def test_update_if_unchanged_stale_version(repository):
+    with pytest.raises(ConflictError):
+        repository.update_if_unchanged(2, {"name": "new"}, READ_AT)
+
+    assert repository.session.scalar(select(Parent.name).where(Parent.id == 2)) == "b"
+
+
+def test_update_if_unchanged_same_second(repository):
+    # modified within the second the client read: still a stale version
+    with pytest.raises(ConflictError):
+        repository.update_if_unchanged(3, {"name": "new"}, READ_AT)
+
+    assert repository.update_if_unchanged(3, {"name": "new"}, "2024-01-01T10:00:00.500000").name == "new"
+
+
+def test_update_if_unchanged_missing_row(repository):
+    with pytest.raises(ResourceNotFound):
+        repository.update_if_unchanged(4, {"name": "new"}, READ_AT)
+
+
+def test_bulk_update_if_unchanged_query():
+    query = ParentRepository(None)._bulk_update_if_unchanged_query(
+        [{"id": 1, "updated_at": READ_AT, "name": "x"}, {"id": 2, "updated_at": READ_AT, "name": "y"}]
+    )
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "FROM (VALUES" in sql
+    assert "test_parent.id = data.id AND test_parent.updated_at = data.updated_at" in sql
+    assert "RETURNING" in sql
+
+
+def test_bulk_update_if_unchanged_rejects_mixed_keys():
+    with pytest.raises(ValueError):
+        ParentRepository(None)._bulk_update_if_unchanged_query(
+            [{"id": 1, "updated_at": READ_AT, "name": "x"}, {"id": 2, "updated_at": READ_AT}]
+        )
+
+
+def test_bulk_update_if_unchanged_is_all_or_nothing(mocker):
+    # UPDATE ... FROM (VALUES ...) does not run on SQLite: one of the two rows matched
+    session = mocker.Mock()
+    session.scalars.return_value.all.return_value = [Parent(id=1)]
+    rows = [{"id": 1, "updated_at": READ_AT, "name": "x"}, {"id": 2, "updated_at": READ_AT, "name": "y"}]
+
+    with pytest.raises(ConflictError):
+        ParentRepository(session).bulk_update_if_unchanged(rows)
+    session.rollback.assert_called_once()
@@ -0,0 +1,122 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+from configs import database
+from configs.database import get_db, has_pending_changes
+from configs.routing import db_free
+from middlewares.db_session_middleware import DatabaseSessionMiddleware
+from tests.models import Base, Parent
+
+
+@pytest.fixture
+def engine():
+    # the handlers and the middleware run the session on different threads
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def sessions(session, mocker):
+    # every get_db_session() hands out the SQLite session of the test
+    opened = []
+
+    def get_db_session():
+        opened.append(session)
+        return session
+
+    mocker.patch.object(database, "get_db_session", side_effect=get_db_session)
+    mocker.patch.object(session, "close", wraps=session.close)
+    return opened
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/free")
+    @db_free
+    def free():
+        return {"ok": True}
+
+    @app.get("/free-but-asks")
+    @db_free
+    def free_but_asks(db=Depends(get_db)):
+        return {"ok": True}  # pragma: no cover
+
+    @app.get("/read")
+    def read(db=Depends(get_db), again=Depends(get_db)):
+        return {"same": db is again, "count": db.query(Parent).count()}
+
+    @app.post("/write")
+    def write(db=Depends(get_db)):
+        db.add(Parent(id=1, code="C1"))
+        db.flush()
+        return {"ok": True}
+
+    app.add_middleware(DatabaseSessionMiddleware)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_route_without_db_opens_no_session(client, sessions):
+    assert client.get("/free").json() == {"ok": True}
+    assert sessions == []
+
+
+def test_db_free_route_cannot_open_a_session(client, sessions):
+    with pytest.raises(RuntimeError, match="free_but_asks is declared DB-free"):
+        TestClient(client.app).get("/free-but-asks")
+    assert sessions == []
+
+
+def test_session_is_created_once_and_closed(client, sessions, session):
+    assert client.get("/read").json() == {"same": True, "count": 0}
+    assert len(sessions) == 1
+    session.close.assert_called_once()
+
+
+def test_writes_are_committed_before_the_response(client, sessions, session, mocker):
+    commit = mocker.spy(session, "commit")
+
+    assert client.post("/write").status_code == 200
+    commit.assert_called_once()
+    assert session.get(Parent, 1) is not None
+
+
+def test_reads_are_not_committed(client, sessions, session, mocker):
+    commit = mocker.spy(session, "commit")
+
+    client.get("/read")
+    commit.assert_not_called()
+
+
+def test_failed_commit_replaces_the_response(client, sessions, session, mocker):
+    mocker.patch("middlewares.db_session_middleware.logger.exception")
+    mocker.patch.object(session, "commit", side_effect=OperationalError("COMMIT", {}, Exception()))
+
+    response = client.post("/write")
+
+    assert response.status_code == 500
+    assert response.json()["errors"][0]["code"] == "DB_OPERATIONAL"
+    session.close.assert_called_once()
+
+
+def test_has_pending_changes(session):
+    assert not has_pending_changes(session)
+
+    session.add(Parent(id=2, code="C2"))
+    assert has_pending_changes(session)
+
+    # flushed: nothing left in new, the write is remembered until the commit
+    session.flush()
+    assert has_pending_changes(session)
+
+    session.commit()
+    assert not has_pending_changes(session)
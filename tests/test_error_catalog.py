@@ -0,0 +1,142 @@
+import json
+import os
+from http import HTTPStatus
+
+import orjson
+import pytest
+from fastapi.responses import JSONResponse
+
+from exceptions.app_exception import (
+    ConflictError,
+    DecodeError,
+    InvalidCursor,
+    MaxLengthError,
+    MinLengthError,
+    NotFoundError,
+    RequiredError,
+    ResourceNotFound,
+    Unauthorized,
+    ValidationErrors,
+)
+from exceptions.system_exception import DBOperationalError, SystemException
+from utils import error_catalog, messages
+from utils.response import response_fail
+
+
+def legacy_response_fail(exc):
+    """response_fail before the error catalog, the reference body."""
+    if isinstance(exc, list):
+        errors = [{"code": e.error_code, "message": e.message} for e in exc]
+        status_code = exc[0].http_code if exc else HTTPStatus.INTERNAL_SERVER_ERROR
+    else:
+        errors = [{"code": exc.error_code, "message": exc.message}]
+        status_code = exc.http_code
+
+    return JSONResponse(
+        content={"success": False, "data": None, "errors": errors},
+        status_code=status_code,
+    )
+
+
+EXCEPTIONS = [
+    lambda: ResourceNotFound(),
+    lambda: Unauthorized(),
+    lambda: DecodeError(),
+    lambda: ConflictError(),
+    lambda: InvalidCursor(),
+    lambda: SystemException(),
+    lambda: DBOperationalError(),
+    lambda: RequiredError("code"),
+    lambda: NotFoundError("sort_by"),
+    lambda: MinLengthError("name", 3),
+    lambda: MaxLengthError("name", 200),
+]
+
+
+@pytest.mark.parametrize("make_exception", EXCEPTIONS)
+def test_body_identical_to_legacy(make_exception):
+    exc = make_exception()
+    response, legacy = response_fail(exc), legacy_response_fail(exc)
+
+    assert response.body == legacy.body
+    assert response.status_code == legacy.status_code
+
+
+def test_list_body_identical_to_legacy():
+    errors = [RequiredError("code"), ConflictError()]
+
+    assert response_fail(errors).body == legacy_response_fail(errors).body
+
+
+def test_fixed_messages_are_prebuilt():
+    first, second = InvalidCursor(), InvalidCursor()
+
+    assert first.response_body() is second.response_body()
+    assert orjson.loads(first.response_body())["errors"] == [
+        {"code": "INVALID_CURSOR", "message": "The pagination cursor is invalid."}
+    ]
+
+
+def test_required_error_payload():
+    assert orjson.loads(response_fail(RequiredError("code")).body)["errors"] == [
+        {"code": "REQUIRED_ERROR", "message": "code is required."}
+    ]
+
+
+def test_validation_errors_payload():
+    exc = ValidationErrors([RequiredError("code"), MaxLengthError("name", 200)])
+    response = response_fail(exc)
+
+    assert response.status_code == 200
+    assert orjson.loads(response.body) == {
+        "success": False,
+        "data": None,
+        "errors": [
+            {"code": "REQUIRED_ERROR", "message": "code is required."},
+            {"code": "MAX_LEN_ERROR", "message": "name must be maximum 200 characters long."},
+        ],
+    }
+
+
+def test_unknown_placeholder_is_kept():
+    entry = error_catalog.CompiledMessage("X", "{field_name} and {other}")
+
+    assert entry.format({"field_name": "code"}) == "code and {other}"
+
+
+@pytest.fixture
+def messages_file(tmp_path, monkeypatch):
+    path = tmp_path / "messages.json"
+    path.write_text(json.dumps({"APP_EXCEPTION": {"INVALID_CURSOR": "Bad cursor."}}), encoding="utf-8")
+    for module in (messages, error_catalog):
+        monkeypatch.setattr(module, "MESSAGES_PATH", str(path))
+    monkeypatch.setattr(error_catalog, "RELOAD_CHECK_INTERVAL", 0)
+    yield path
+    monkeypatch.undo()
+    error_catalog.reload_catalog()
+
+
+def _write(path, content: str, mtime: int):
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_hot_reload_on_mtime_change(messages_file):
+    assert InvalidCursor().message == "Bad cursor."
+
+    _write(
+        messages_file,
+        json.dumps({"APP_EXCEPTION": {"INVALID_CURSOR": "Con trỏ không hợp lệ."}}, ensure_ascii=False),
+        2_000_000_000,
+    )
+    exc = InvalidCursor()
+
+    assert exc.message == "Con trỏ không hợp lệ."
+    assert response_fail(exc).body == legacy_response_fail(exc).body
+
+
+def test_broken_file_keeps_the_catalog(messages_file):
+    InvalidCursor()
+    _write(messages_file, "{not json", 2_000_000_000)
+
+    assert InvalidCursor().message == "Bad cursor."
@@ -0,0 +1,159 @@
+import gzip
+import json
+
+import brotli
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from middlewares.compression_middleware import CompressionMiddleware, select_encoding
+from middlewares.etag_middleware import ETagMiddleware
+
+LARGE = {"rows": [{"id": i, "name": f"row {i}"} for i in range(200)]}
+
+
+def _stream(request):
+    async def chunks():
+        for i in range(3):
+            yield f'{{"chunk": {i}}}\n'.encode() * 100
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+routes = [
+    Route("/large", lambda request: JSONResponse(LARGE), methods=["GET", "HEAD"]),
+    Route("/small", lambda request: JSONResponse({"id": 1})),
+    Route("/stream", _stream),
+    Route(
+        "/xlsx",
+        lambda request: Response(b"x" * 4096, media_type="application/vnd.ms-excel"),
+    ),
+    Route("/tagged", lambda request: JSONResponse(LARGE, headers={"ETag": 'W/"v1"'})),
+]
+
+
+@pytest.fixture
+def client():
+    # the order of utils.application: compression outside the ETag
+    app = CompressionMiddleware(ETagMiddleware(Starlette(routes=routes)))
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("GZIP;q=0.5", "gzip"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_select_encoding(accept_encoding, expected):
+    assert select_encoding(accept_encoding) == expected
+
+
+def test_brotli_is_preferred(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept-Encoding"
+    # the test client decodes the body, the metadata tells the wire size
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == LARGE
+
+
+def test_gzip_when_brotli_is_not_accepted(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == LARGE
+
+
+def test_streamed_response_is_compressed_by_chunk(client):
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw).count(b"\n") == 300
+
+
+@pytest.mark.parametrize(
+    "path, accept_encoding",
+    [("/small", "gzip, br"), ("/large", "identity")],
+)
+def test_uncompressed_negotiable_response_has_vary(client, path, accept_encoding):
+    response = client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_incompressible_type_is_left_alone(client):
+    response = client.get("/xlsx", headers={"Accept-Encoding": "br"})
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+
+
+def test_etag_is_added(client):
+    response = client.get("/large")
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+
+
+def test_matching_if_none_match_gives_304(client):
+    etag = client.get("/large", headers={"Accept-Encoding": "br"}).headers["etag"]
+    response = client.get("/large", headers={"If-None-Match": etag, "Accept-Encoding": "br"})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_etag_does_not_depend_on_the_encoding(client):
+    # computed on the uncompressed body, inside the compression
+    etags = {
+        client.get("/large", headers={"Accept-Encoding": encoding}).headers["etag"]
+        for encoding in ("br", "gzip", "identity")
+    }
+
+    assert len(etags) == 1
+
+
+def test_stale_if_none_match_gives_200(client):
+    response = client.get("/large", headers={"If-None-Match": 'W/"stale"'})
+
+    assert response.status_code == 200
+    assert response.json() == LARGE
+
+
+def test_route_etag_is_kept(client):
+    assert client.get("/tagged").headers["etag"] == 'W/"v1"'
+    # a strong If-None-Match matches the weak tag
+    assert client.get("/tagged", headers={"If-None-Match": '"v1"'}).status_code == 304
+
+
+def test_streamed_response_has_no_etag(client):
+    assert "etag" not in client.get("/stream").headers
+
+
+def test_head_is_left_out_of_the_etag(client):
+    etag = client.get("/large").headers["etag"]
+    response = client.head("/large", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_brotli_body_round_trips(client):
+    with client.stream("GET", "/large", headers={"Accept-Encoding": "br"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert json.loads(brotli.decompress(raw)) == LARGE
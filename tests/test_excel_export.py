@@ -0,0 +1,52 @@
+import os
+
+import pytest
+from openpyxl import load_workbook
+from openpyxl.worksheet._writer import ALL_TEMP_FILES
+
+from utils.excel_export import ExcelColumn, awrite_xlsx, write_xlsx
+
+COLUMNS = [ExcelColumn("code", "Code"), ExcelColumn("value", "Value", number_format="#,##0.00")]
+
+
+def _leftover_temp_files() -> list[str]:
+    return [path for path in ALL_TEMP_FILES if os.path.exists(path)]
+
+
+def _rows(count: int, fail_at: int | None = None):
+    for i in range(count):
+        if i == fail_at:
+            raise RuntimeError("source failed")
+        yield {"code": f"C{i}", "value": i / 4}
+
+
+def test_write_xlsx():
+    path, count = write_xlsx(_rows(5), COLUMNS, chunk_rows=2)
+    try:
+        rows = list(load_workbook(path).active.values)
+    finally:
+        os.remove(path)
+
+    assert count == 5
+    assert rows[0] == ("Code", "Value")
+    assert rows[-1] == ("C4", 1.0)
+    assert _leftover_temp_files() == []
+
+
+def test_write_xlsx_failing_rows_removes_temp_files():
+    with pytest.raises(RuntimeError):
+        write_xlsx(_rows(10, fail_at=5), COLUMNS, chunk_rows=2)
+
+    assert _leftover_temp_files() == []
+
+
+@pytest.mark.asyncio
+async def test_awrite_xlsx_failing_rows_removes_temp_files():
+    async def rows():
+        for row in _rows(10, fail_at=5):
+            yield row
+
+    with pytest.raises(RuntimeError):
+        await awrite_xlsx(rows(), COLUMNS, chunk_rows=2)
+
+    assert _leftover_temp_files() == []
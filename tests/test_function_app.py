@@ -0,0 +1,80 @@
+import asyncio
+
+import azure.functions as func
+import pytest
+
+import function_app
+
+main_api = function_app.app.get_functions()[0].get_user_function()
+
+
+@pytest.fixture
+def bridge(monkeypatch):
+    """Counts the lifespan startups and the requests handled by the bridge."""
+    calls = {"startup": 0, "requests": 0, "fail": 0}
+
+    async def notify_startup():
+        calls["startup"] += 1
+        await asyncio.sleep(0.01)
+        if calls["fail"]:
+            calls["fail"] -= 1
+            raise RuntimeError("startup failed")
+        return True
+
+    async def handle_async(req, context):
+        calls["requests"] += 1
+        return func.HttpResponse("ok")
+
+    monkeypatch.setattr(function_app, "_startup", None)
+    monkeypatch.setattr(function_app.asgi_bridge, "notify_startup", notify_startup)
+    monkeypatch.setattr(function_app.asgi_bridge, "handle_async", handle_async)
+    return calls
+
+
+def _request() -> func.HttpRequest:
+    return func.HttpRequest(method="GET", url="http://localhost/api/healthcheck/", headers={}, body=b"")
+
+
+@pytest.mark.asyncio
+async def test_one_bridge_for_every_invocation(bridge, monkeypatch):
+    def new_bridge(*args, **kwargs):
+        raise AssertionError("a bridge was built per invocation")
+
+    monkeypatch.setattr(func, "AsgiMiddleware", new_bridge)
+
+    for _ in range(3):
+        await main_api(_request(), None)
+    assert bridge["requests"] == 3
+
+
+@pytest.mark.asyncio
+async def test_startup_runs_once(bridge):
+    # concurrent first invocations wait for the same startup
+    await asyncio.gather(*[main_api(_request(), None) for _ in range(5)])
+    await main_api(_request(), None)
+
+    assert bridge == {"startup": 1, "requests": 6, "fail": 0}
+
+
+@pytest.mark.asyncio
+async def test_failed_startup_is_retried(bridge):
+    bridge["fail"] = 1
+
+    results = await asyncio.gather(
+        *[main_api(_request(), None) for _ in range(3)], return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    assert (await main_api(_request(), None)).get_body() == b"ok"
+    await main_api(_request(), None)
+    assert (bridge["startup"], bridge["requests"]) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_invocation_does_not_cancel_the_startup(bridge):
+    first = asyncio.ensure_future(main_api(_request(), None))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert (await main_api(_request(), None)).get_body() == b"ok"
+    assert bridge["startup"] == 1
@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from utils import health
+from utils.health import HealthCheck, HealthReport
+from utils.read_replicas import ReplicaSet
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    engines = {name: create_engine("sqlite://") for name in ("replica_0", "replica_1")}
+    replicas = ReplicaSet(engines)
+    monkeypatch.setattr(health.settings, "database_session_mode", "async")
+    monkeypatch.setattr(health.settings, "health_check_timeout", 0.4)
+    monkeypatch.setattr("configs.database.get_async_replica_set", lambda: replicas)
+    yield replicas
+    for engine in engines.values():
+        engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_hanging_replica_is_down_not_failed(replicas, monkeypatch):
+    async def ping(name):
+        if name == "replica_1":
+            await asyncio.sleep(10)
+
+    monkeypatch.setattr(health, "_ping_async", ping)
+    check = HealthCheck("replicas", health.check_replicas, 0.4, critical=False)
+
+    start = time.perf_counter()
+    result = await check.run()
+
+    # bounded by the ping timeout, well below the check timeout
+    assert time.perf_counter() - start < 0.35
+    assert result["status"] == "warn"
+    assert result["replicas"] == {"replica_0": "up", "replica_1": "down"}
+    assert replicas.is_healthy("replica_0")
+    assert not replicas.is_healthy("replica_1")
+
+
+@pytest.mark.asyncio
+async def test_hanging_replica_sync_mode(replicas, monkeypatch):
+    def ping(name):
+        if name == "replica_1":
+            time.sleep(0.5)
+
+    monkeypatch.setattr(health.settings, "database_session_mode", "sync")
+    monkeypatch.setattr("configs.database.get_replica_set", lambda: replicas)
+    monkeypatch.setattr(health, "_ping_sync", ping)
+
+    result = await health.check_replicas()
+
+    assert result["replicas"] == {"replica_0": "up", "replica_1": "down"}
+
+
+@pytest.mark.asyncio
+async def test_replicas_are_pinged_concurrently(replicas, monkeypatch):
+    async def ping(name):
+        await asyncio.sleep(0.15)
+
+    monkeypatch.setattr(health, "_ping_async", ping)
+
+    start = time.perf_counter()
+    result = await health.check_replicas()
+
+    assert time.perf_counter() - start < 0.25
+    assert result == {"status": "ok", "replicas": {"replica_0": "up", "replica_1": "up"}}
+
+
+@pytest.mark.asyncio
+async def test_failed_non_critical_check_warns():
+    async def broken():
+        raise RuntimeError("down")
+
+    assert (await HealthCheck("replicas", broken, 1, critical=False).run())["status"] == "warn"
+    assert (await HealthCheck("database", broken, 1).run())["status"] == "fail"
+
+
+@pytest.mark.asyncio
+async def test_report_status():
+    async def ok():
+        return None
+
+    async def warn():
+        return {"status": "warn"}
+
+    async def fail():
+        raise RuntimeError("down")
+
+    def report(*funcs):
+        return HealthReport([HealthCheck(f"check_{i}", f, 1) for i, f in enumerate(funcs)], 0)
+
+    assert (await report(ok, ok).get())["status"] == "ok"
+    assert (await report(ok, warn).get())["status"] == "warn"
+    assert (await report(warn, fail).get())["status"] == "fail"
+
+
+@pytest.mark.asyncio
+async def test_exhausted_pool_warns(monkeypatch):
+    limit = health.settings.database_pool_size + health.settings.database_max_overflow
+    monkeypatch.setattr(
+        "utils.pool_metrics.pool_status",
+        lambda: {
+            "sync": {"size": 5, "checked_out": limit},
+            "async": {"size": 5, "checked_out": 0},
+        },
+    )
+
+    result = await HealthCheck("pool", health.check_pool, 1).run()
+
+    assert result["status"] == "warn"
+    assert result["exhausted"] == ["sync"]
+
+
+@pytest.mark.asyncio
+async def test_checks_time_out_concurrently():
+    async def hang():
+        await asyncio.sleep(10)
+
+    report = HealthReport([HealthCheck(f"check_{i}", hang, 0.2) for i in range(3)], 0)
+
+    start = time.perf_counter()
+    result = await report.get()
+
+    assert time.perf_counter() - start < 0.5
+    assert result["status"] == "fail"
+    assert all(check["error"] == "timed out after 0.2 s" for check in result["checks"].values())
+
+
+@pytest.mark.asyncio
+async def test_report_is_cached_for_the_ttl():
+    runs = []
+
+    async def count():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+
+    report = HealthReport([HealthCheck("count", count, 1)], 0.3)
+
+    # concurrent probes share the run in flight
+    await asyncio.gather(*[report.get() for _ in range(5)])
+    await report.get()
+    assert len(runs) == 1
+
+    await asyncio.sleep(0.3)
+    await report.get()
+    assert len(runs) == 2
+
+
+@pytest.mark.parametrize(
+    "status, status_code",
+    [("ok", 200), ("warn", 200), ("fail", 503)],
+)
+def test_ready_status_codes(monkeypatch, status, status_code):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from api.healthcheck import healthcheck_controller
+
+    class Report:
+        async def get(self):
+            return {"status": status, "checks": {}}
+
+    monkeypatch.setattr(healthcheck_controller, "health_report", Report())
+    app = FastAPI()
+    app.include_router(healthcheck_controller.router, prefix="/api/healthcheck")
+
+    with TestClient(app) as client:
+        assert client.get("/api/healthcheck/ready").status_code == status_code
+        # liveness never depends on the checks
+        assert client.get("/api/healthcheck/live").json() == {"status": "ok"}
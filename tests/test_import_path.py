@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from benchmarks.bench_import_time import LAZY_MODULES, MODULE, import_times, loaded_lazy_modules
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import time of the app's own modules, on top of FastAPI (itself 0.5-1 s
+# depending on the machine, see benchmarks.bench_import_time for the total)
+APP_IMPORT_BUDGET_MS = 250
+
+
+@pytest.fixture(autouse=True)
+def project_path(monkeypatch):
+    # the fresh interpreters import the app from the project root
+    monkeypatch.setenv("PYTHONPATH", ROOT)
+
+
+def test_app_import_leaves_heavy_modules_lazy():
+    assert loaded_lazy_modules() == []
+
+
+def test_app_import_time_within_budget():
+    # best of a few runs: the budget is about the imports, not the machine load
+    runs = [import_times() for _ in range(3)]
+
+    assert not set(LAZY_MODULES) & set(runs[-1])
+    assert min(run[MODULE] - run["fastapi"] for run in runs) / 1000 < APP_IMPORT_BUDGET_MS
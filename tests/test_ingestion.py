@@ -0,0 +1,177 @@
+import csv
+from datetime import datetime
+
+import pytest
+
+from batch.ingestion.checkpoint import CHECKPOINT_TABLE
+from batch.ingestion.pipeline import IngestionPipeline, _copy_value
+from batch.ingestion.validation import RowValidator
+
+COLUMNS = ["code", "name"]
+
+
+class FakeDatabase:
+    """The committed state of a Postgres: the COPYed rows and the checkpoints."""
+
+    def __init__(self):
+        self.rows = []
+        self.checkpoints = {}
+        self.copies = 0
+        self.fail_at_copy = None
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self._result = None
+
+    def execute(self, query, params=None):
+        database = self.connection.database
+        if query.startswith("SELECT"):
+            self._result = database.checkpoints.get(params)
+        elif query.strip().startswith(f"INSERT INTO {CHECKPOINT_TABLE}"):
+            source, target, signature, rows_done = params
+            self.connection.pending.append(("save", (source, target), (signature, rows_done)))
+        elif query.startswith(f"DELETE FROM {CHECKPOINT_TABLE}"):
+            self.connection.pending.append(("clear", params, None))
+        else:
+            raise AssertionError(f"unexpected statement: {query}")
+
+    def fetchone(self):
+        return self._result
+
+    def copy_expert(self, query, buffer):
+        database = self.connection.database
+        database.copies += 1
+        if database.copies == database.fail_at_copy:
+            raise RuntimeError("connection lost")
+        rows = [tuple(line.split("\t")) for line in buffer.read().splitlines()]
+        self.connection.pending.append(("copy", None, rows))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, database: FakeDatabase):
+        self.database = database
+        self.pending = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        for action, key, value in self.pending:
+            if action == "copy":
+                self.database.rows.extend(value)
+            elif action == "save":
+                self.database.checkpoints[key] = value
+            else:
+                self.database.checkpoints.pop(key, None)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+
+class FakePipeline(IngestionPipeline):
+    def _copy_sql(self, cursor) -> str:
+        # psycopg2.sql needs a real connection to quote the identifiers
+        return f"COPY {self.table} ({', '.join(self.columns)}) FROM STDIN"
+
+
+@pytest.fixture
+def database():
+    return FakeDatabase()
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.csv"
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["name", "code", "ignored"])
+        for i in range(1, 8):
+            # rows 3 and 5 have no code
+            writer.writerow([f"name {i}", "" if i in (3, 5) else f"C{i}", "x"])
+    return str(path)
+
+
+def _pipeline(database, tmp_path, resume=True):
+    return FakePipeline(
+        "target",
+        COLUMNS,
+        validator=RowValidator(COLUMNS, required={"code"}),
+        chunk_size=3,
+        resume=resume,
+        rejects_path=str(tmp_path / "rejects.csv"),
+        connection_factory=lambda: FakeConnection(database),
+    )
+
+
+def _rejects(tmp_path) -> list[str]:
+    with open(tmp_path / "rejects.csv", encoding="utf-8", newline="") as file:
+        return [row[0] for row in csv.reader(file)]
+
+
+def test_copy_value():
+    assert _copy_value(None) == "\\N"
+    assert _copy_value(True) == "t"
+    assert _copy_value(datetime(2024, 1, 2, 3, 4)) == "2024-01-02T03:04:00"
+    assert _copy_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+
+
+def test_load(database, source, tmp_path):
+    stats = _pipeline(database, tmp_path).run(source)
+
+    assert database.rows == [(f"C{i}", f"name {i}") for i in (1, 2, 4, 6, 7)]
+    assert (stats.chunks, stats.rejected, stats.skipped) == (3, 2, 0)
+    assert _rejects(tmp_path) == ["3", "5"]
+    # cleared once the whole file is loaded
+    assert database.checkpoints == {}
+
+
+def test_resume_after_a_failed_chunk(database, source, tmp_path):
+    database.fail_at_copy = 2
+    with pytest.raises(RuntimeError):
+        _pipeline(database, tmp_path).run(source)
+
+    # the first chunk is committed with its checkpoint, the second rolled back
+    assert database.rows == [("C1", "name 1"), ("C2", "name 2")]
+    assert [rows_done for _, rows_done in database.checkpoints.values()] == [3]
+    assert _rejects(tmp_path) == ["3"]
+
+    database.fail_at_copy = None
+    stats = _pipeline(database, tmp_path).run(source)
+
+    assert stats.skipped == 3
+    assert database.rows == [(f"C{i}", f"name {i}") for i in (1, 2, 4, 6, 7)]
+    # each rejected row once, although row 5 was validated by both runs
+    assert _rejects(tmp_path) == ["3", "5"]
+
+
+def test_no_resume_loads_the_whole_file(database, source, tmp_path):
+    database.fail_at_copy = 2
+    with pytest.raises(RuntimeError):
+        _pipeline(database, tmp_path).run(source)
+    database.fail_at_copy = None
+
+    stats = _pipeline(database, tmp_path, resume=False).run(source)
+
+    assert stats.skipped == 0
+    assert len(database.rows) == 2 + 5
+
+
+def test_checkpoint_of_another_file_version_is_ignored(database, source, tmp_path):
+    database.fail_at_copy = 2
+    with pytest.raises(RuntimeError):
+        _pipeline(database, tmp_path).run(source)
+    database.fail_at_copy = None
+
+    (key, (signature, rows_done)), = database.checkpoints.items()
+    database.checkpoints[key] = ('{"size": 0, "mtime": 0}', rows_done)
+
+    assert _pipeline(database, tmp_path).run(source).skipped == 0
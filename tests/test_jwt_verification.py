@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from exceptions.app_exception import DecodeError
+from utils.jwt_verification import JwksKeyStore, TokenVerifier, VerifiedTokenCache, parse_algorithms
+
+AUDIENCE = "exam-api"
+ISSUER = "https://login.example.com/"
+
+
+def _key_pair(kid: str):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    public_jwk.update(kid=kid, use="sig", alg="RS256")
+    return private_key, public_jwk
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return {kid: _key_pair(kid) for kid in ("k1", "k2")}
+
+
+@pytest.fixture
+def jwks(keys):
+    # the in-memory document served by the store, edited to rotate keys
+    return {"keys": [keys["k1"][1]]}
+
+
+@pytest.fixture
+def verifier(jwks):
+    return TokenVerifier(
+        JwksKeyStore(jwks=jwks, min_refresh_interval=0),
+        ["RS256"],
+        audience=AUDIENCE,
+        issuer=ISSUER,
+    )
+
+
+def _token(keys, kid="k1", **claims):
+    payload = {
+        "preferred_username": "user@example.com",
+        "name": "User",
+        "aud": AUDIENCE,
+        "iss": ISSUER,
+        "exp": int(time.time()) + 300,
+        **claims,
+    }
+    # a None claim is left out of the token
+    payload = {name: value for name, value in payload.items() if value is not None}
+    return jwt.encode(payload, keys[kid][0], algorithm="RS256", headers={"kid": kid})
+
+
+def test_valid_token(verifier, keys):
+    assert verifier.verify(_token(keys))["name"] == "User"
+
+
+def test_bad_signature(verifier, keys):
+    # signed by k2 but claiming to be k1
+    header, payload, _ = _token(keys).split(".")
+    signature = _token(keys, kid="k2").split(".")[2]
+
+    with pytest.raises(DecodeError):
+        verifier.verify(f"{header}.{payload}.{signature}")
+
+
+@pytest.mark.parametrize(
+    "claims",
+    [
+        {"aud": "other-api"},
+        {"iss": "https://evil.example.com/"},
+        {"exp": int(time.time()) - 10},
+        {"exp": None},
+    ],
+)
+def test_invalid_claims(verifier, keys, claims):
+    with pytest.raises(DecodeError):
+        verifier.verify(_token(keys, **claims))
+
+
+def test_verified_tokens_are_cached(verifier, keys, mocker):
+    token = _token(keys)
+    verifier.verify(token)
+    decode = mocker.spy(jwt, "decode")
+
+    assert verifier.verify(token)["name"] == "User"
+    decode.assert_not_called()
+
+
+def test_cache_entries_expire_with_the_token(keys):
+    cache = VerifiedTokenCache()
+    cache.set("expired", {"exp": time.time() - 1})
+    cache.set("valid", {"exp": time.time() + 60})
+    cache.set("no exp", {})
+
+    assert cache.get("expired") is None
+    assert cache.get("valid") is not None
+    assert cache.get("no exp") is None
+
+
+def test_cache_size_is_bounded():
+    cache = VerifiedTokenCache(max_size=2)
+    for token in ("a", "b", "c"):
+        cache.set(token, {"exp": time.time() + 60})
+
+    assert [cache.get(token) is not None for token in ("a", "b", "c")] == [False, True, True]
+
+
+def test_unknown_kid_reloads_the_keys(verifier, jwks, keys):
+    verifier.verify(_token(keys))
+    jwks["keys"].append(keys["k2"][1])
+
+    assert verifier.verify(_token(keys, kid="k2"))["name"] == "User"
+
+
+def test_unknown_kid_reload_is_rate_limited(jwks, keys):
+    store = JwksKeyStore(jwks=jwks, min_refresh_interval=60)
+    store.get_key("k1")
+    jwks["keys"].append(keys["k2"][1])
+
+    with pytest.raises(DecodeError):
+        store.get_key("k2")
+
+
+def test_failed_load_is_retried(keys, tmp_path):
+    path = tmp_path / "jwks.json"
+    store = JwksKeyStore(file=str(path), retry_interval=0)
+
+    with pytest.raises(DecodeError):
+        store.get_key("k1")
+
+    path.write_text(json.dumps({"keys": [keys["k1"][1]]}))
+    assert store.get_key("k1").key_id == "k1"
+
+
+def test_concurrent_requests_wait_for_the_load(jwks):
+    class SlowKeyStore(JwksKeyStore):
+        def _fetch(self):
+            time.sleep(0.2)
+            return super()._fetch()
+
+    store = SlowKeyStore(jwks=jwks)
+    results = []
+
+    def get_key():
+        try:
+            results.append(store.get_key("k1").key_id)
+        except DecodeError:
+            results.append(None)
+
+    threads = [threading.Thread(target=get_key) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["k1"] * 4
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [('["RS256"]', ["RS256"]), ("[RS256, ES256]", ["RS256", "ES256"]), (None, ["RS256"])],
+)
+def test_parse_algorithms(value, expected):
+    assert parse_algorithms(value) == expected
@@ -0,0 +1,94 @@
+import logging
+import queue
+import threading
+import time
+
+import pytest
+
+from configs import logging_conf
+from configs.logging_conf import LogQueueListener, NonBlockingQueueHandler, get_log_level
+
+
+class Collect(logging.Handler):
+    def __init__(self, delay: float = 0):
+        super().__init__()
+        self.delay = delay
+        self.records = []
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.records.append(record)
+
+
+def _record(msg, *args):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+
+
+@pytest.mark.parametrize(
+    "environment, level",
+    [("LOCAL", logging.DEBUG), ("STAGING", logging.INFO), ("PRODUCTION", logging.INFO)],
+)
+def test_environment_levels_keep_the_request_logs(monkeypatch, environment, level):
+    monkeypatch.setattr(logging_conf.settings, "environment", environment)
+    monkeypatch.setattr(logging_conf.settings, "log_level", None)
+
+    assert get_log_level() == level
+    assert get_log_level() <= logging.INFO
+
+
+def test_log_level_overrides(monkeypatch):
+    monkeypatch.setattr(logging_conf.settings, "log_level", " warning ")
+
+    assert get_log_level() == logging.WARNING
+
+
+def test_unknown_log_level_falls_back(monkeypatch):
+    monkeypatch.setattr(logging_conf.settings, "environment", "PRODUCTION")
+    monkeypatch.setattr(logging_conf.settings, "log_level", "LOUD")
+
+    with pytest.warns(UserWarning, match="LOUD"):
+        assert get_log_level() == logging.INFO
+
+
+def test_arguments_merged_on_the_caller_thread():
+    log_queue = queue.SimpleQueue()
+    args = ["before"]
+
+    NonBlockingQueueHandler(log_queue).handle(_record("value %s", args))
+    args[0] = "after"
+
+    record = log_queue.get_nowait()
+    assert (record.msg, record.args) == ("value ['before']", None)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+    start = time.perf_counter()
+    for i in range(3):
+        handler.handle(_record(f"line {i}"))
+
+    assert time.perf_counter() - start < 0.1
+    assert handler.dropped == 2
+    assert handler.queue.get_nowait().msg == "line 0"
+
+
+def test_stop_writes_the_queued_records():
+    log_queue = queue.SimpleQueue()
+    # slower than the producer: records are still queued at stop()
+    output = Collect(delay=0.001)
+    listener = LogQueueListener(log_queue, output)
+    listener.start()
+    assert listener.thread.is_alive() and listener.thread is not threading.current_thread()
+
+    handler = NonBlockingQueueHandler(log_queue)
+    for i in range(200):
+        handler.handle(_record(f"line {i}"))
+    thread = listener.thread
+    listener.stop()
+
+    assert [record.msg for record in output.records] == [f"line {i}" for i in range(200)]
+    assert not thread.is_alive()
+    assert listener.thread is None
+    # idempotent (atexit and an explicit stop)
+    listener.stop()
@@ -0,0 +1,112 @@
+import base64
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+
+import orjson
+import pytest
+from sqlalchemy import event
+
+from exceptions.app_exception import InvalidCursor, NotFoundError
+from repositories.base_repository import BaseRepository
+from tests.models import Child, Parent
+from utils.pagination import decode_cursor, encode_cursor
+
+
+class ParentRepository(BaseRepository[Parent]):
+    model = Parent
+
+
+def _token(values) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(values)).rstrip(b"=").decode()
+
+
+@pytest.fixture
+def repository(session):
+    # names repeat: the id tiebreaker makes the order total
+    session.add_all(
+        Parent(id=i, code=f"C{i}", name=f"n{i % 3}", children=[Child()]) for i in range(1, 11)
+    )
+    session.commit()
+    return ParentRepository(session)
+
+
+def test_cursor_round_trip():
+    values = (datetime(2024, 1, 2, 3, 4, 5, 6), Decimal("1.10"), UUID(int=1), "a", 1, None)
+
+    assert decode_cursor(encode_cursor(values), len(values)) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        _token("not a list"),
+        _token([1, 2, 3]),
+        _token([["n", "not a number"], 1]),
+        _token([["dt", "yesterday"], 1]),
+        _token([["u", "not-a-uuid"], 1]),
+        _token([["x", "1"], 1]),
+        _token([["n"], 1]),
+    ],
+)
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 2)
+
+
+def _pages(repository, **kwargs) -> list[list[int]]:
+    pages, cursor = [], None
+    while True:
+        items, cursor = repository.get_page_by_cursor("name", limit=3, cursor=cursor, **kwargs)
+        pages.append([parent.id for parent in items])
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pages_follow_sort_column_then_id(repository):
+    assert _pages(repository) == [[3, 6, 9], [1, 4, 7], [10, 2, 5], [8]]
+
+
+def test_keyset_pages_descending(repository):
+    assert _pages(repository, sort_desc=True) == [[8, 5, 2], [10, 7, 4], [1, 9, 6], [3]]
+
+
+def test_keyset_pages_with_join(repository):
+    items, _ = repository.get_page_by_cursor("name", limit=3, join_={"children"})
+
+    assert [len(parent.children) for parent in items] == [1, 1, 1]
+
+
+def test_keyset_last_page_exactly_full(repository):
+    items, cursor = repository.get_page_by_cursor("id", limit=10)
+
+    assert (len(items), cursor) == (10, None)
+
+
+@pytest.mark.parametrize("sort_by", ["nope", "children", "metadata"])
+def test_keyset_unknown_sort_column(repository, sort_by):
+    with pytest.raises(NotFoundError):
+        repository.get_page_by_cursor(sort_by)
+
+
+def test_keyset_malformed_cursor(repository):
+    with pytest.raises(InvalidCursor):
+        repository.get_page_by_cursor("name", cursor=_token([["n", "x"], 1]))
+
+
+def test_with_total_in_one_round_trip(repository, engine):
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+
+    items, total = repository.get_all(3, 4, sort_by="id", with_total=True)
+
+    assert ([parent.id for parent in items], total) == ([4, 5, 6, 7], 10)
+    assert len(statements) == 1
+
+
+def test_with_total_past_the_last_page(repository):
+    # no row to carry the window count: counted separately
+    assert repository.get_all(20, 5, with_total=True) == ([], 10)
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from configs import database
+from configs.context import request_timings
+from utils import pool_metrics
+from utils.metrics import registry
+from utils.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedNullPool,
+    InstrumentedQueuePool,
+    pool_checkout_timeouts,
+    pool_status,
+    register_engine,
+)
+from utils.request_metrics import RequestTimings
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    # a private registry entry, removed after the test
+    monkeypatch.setattr(pool_metrics, "_engines", {})
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+        pool_logging_name="test_pool",
+    )
+    register_engine("test_pool", engine)
+    yield engine
+    engine.dispose()
+
+
+def test_pool_status(engine):
+    with engine.connect():
+        assert pool_status() == {
+            "test_pool": {
+                "class": "InstrumentedQueuePool",
+                "size": 1,
+                "checked_out": 1,
+                "overflow": 0,
+            }
+        }
+
+    assert pool_status()["test_pool"]["checked_out"] == 0
+
+
+def test_gauges_are_read_at_render_time(engine):
+    with engine.connect():
+        metrics = registry.render()
+
+    assert 'db_pool_checked_out{engine="test_pool"} 1' in metrics
+    assert 'db_pool_size{engine="test_pool"} 1' in metrics
+    assert 'db_pool_checkout_seconds_count{engine="test_pool"}' in metrics
+
+
+def test_checkout_timeout_is_counted(engine):
+    before = pool_checkout_timeouts.get(engine="test_pool")
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    assert pool_checkout_timeouts.get(engine="test_pool") == before + 1
+
+
+def test_checkout_is_part_of_the_session_stage(engine):
+    timings = RequestTimings()
+    token = request_timings.set(timings)
+    try:
+        with engine.connect():
+            pass
+    finally:
+        request_timings.reset(token)
+
+    assert timings.stages["session"] > 0
+
+
+def test_engine_options(monkeypatch):
+    monkeypatch.setattr(database.settings, "database_pgbouncer", False)
+
+    options = database.engine_options("primary")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_logging_name"] == "primary"
+    assert options["pool_size"] == database.settings.database_pool_size
+    assert database.engine_options("primary", is_async=True)["poolclass"] is (
+        InstrumentedAsyncAdaptedQueuePool
+    )
+
+
+def test_engine_options_behind_pgbouncer(monkeypatch):
+    monkeypatch.setattr(database.settings, "database_pgbouncer", True)
+
+    options = database.engine_options("primary_async", is_async=True)
+    assert options["poolclass"] is InstrumentedNullPool
+    assert "pool_size" not in options
+    # transaction pooling: no server side prepared statements
+    assert options["connect_args"] == {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    assert "connect_args" not in database.engine_options("primary")
@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+
+import pytest
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+from configs.logging_conf import queue_listener
+from middlewares import profiling_middleware
+from middlewares.profiling_middleware import ProfilingMiddleware
+from utils import profiling
+from utils.profiling import RequestProfiler, StackSampler, prune_profiles
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(100))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop,))
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_sampler_collects_busy_stacks(busy_thread, tmp_path):
+    sampler = StackSampler(0.001)
+    sampler.start()
+    time.sleep(0.1)
+    sampler.stop()
+
+    assert any(stack.split(";")[-1].startswith("busy_loop") for stack in sampler.samples)
+    # idle threads (thread pool workers, the log listener) are left out
+    assert not any("_monitor (handlers.py" in stack.split(";")[-1] for stack in sampler.samples)
+
+    path = tmp_path / "profile.folded"
+    sampler.dump(str(path))
+    stack, count = path.read_text().splitlines()[0].rsplit(" ", 1)
+    assert int(count) == max(sampler.samples.values())
+
+
+def test_sampler_excludes_threads(busy_thread):
+    sampler = StackSampler(0.001, exclude={busy_thread.ident})
+    sampler.start()
+    time.sleep(0.05)
+    sampler.stop()
+
+    assert not any("busy_loop" in stack for stack in sampler.samples)
+
+
+@pytest.fixture
+def cprofile(monkeypatch):
+    monkeypatch.setattr(profiling.settings, "profiling_mode", "cprofile")
+
+
+def test_one_cprofile_session_at_a_time(cprofile):
+    first, second = RequestProfiler(), RequestProfiler()
+
+    assert first.start()
+    try:
+        assert not second.start()
+    finally:
+        first.stop()
+
+    assert second.start()
+    second.stop()
+
+
+def _profile(directory, name: str, size: int, mtime: int) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "wb") as file:
+        file.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_prune_keeps_the_newest_files(tmp_path):
+    paths = [_profile(tmp_path, f"{i}.pstats", 10, 1_000 + i) for i in range(4)]
+    other = _profile(tmp_path, "notes.txt", 10, 1)
+
+    prune_profiles(str(tmp_path), max_files=2, max_bytes=1_000)
+
+    assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+    assert os.path.exists(other)
+
+
+def test_prune_by_size(tmp_path):
+    paths = [_profile(tmp_path, f"{i}.folded", 100, 1_000 + i) for i in range(3)]
+
+    prune_profiles(str(tmp_path), max_files=10, max_bytes=150)
+
+    assert [os.path.exists(path) for path in paths] == [False, False, True]
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling.settings, "profiling_enabled", True)
+    monkeypatch.setattr(profiling.settings, "profiling_sample_rate", 0)
+    monkeypatch.setattr(profiling.settings, "profiling_dir", str(tmp_path))
+    # no lifespan: the wrapped app is a bare response
+    return TestClient(ProfilingMiddleware(PlainTextResponse("ok")))
+
+
+def test_profiled_request(client, tmp_path):
+    response = client.get("/", headers={"X-Profile": "1"})
+
+    assert response.text == "ok"
+    assert os.listdir(tmp_path) == [f"{response.headers['X-Profile-Id']}.folded"]
+    assert "X-Profile-Id" not in client.get("/").headers
+
+
+def test_log_listener_thread_is_not_sampled(client, monkeypatch):
+    excluded = []
+
+    class Recorder(RequestProfiler):
+        def __init__(self, exclude=None):
+            excluded.append(exclude)
+            super().__init__(exclude)
+
+    monkeypatch.setattr(profiling_middleware, "RequestProfiler", Recorder)
+    client.get("/", headers={"X-Profile": "1"})
+
+    assert excluded == [{queue_listener.thread.ident}]
+
+
+def test_busy_cprofile_session_skips_the_request(client, cprofile, tmp_path):
+    running = RequestProfiler()
+    assert running.start()
+    try:
+        response = client.get("/", headers={"X-Profile": "1"})
+    finally:
+        running.stop()
+
+    assert response.text == "ok"
+    assert "X-Profile-Id" not in response.headers
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from repositories.base_repository import BaseRepository
+from tests.models import Parent
+from utils.query_cache import get_query_cache
+
+
+class CachedParentRepository(BaseRepository[Parent]):
+    model = Parent
+    cache_ttl = 60
+
+
+@pytest.fixture
+def statements(engine):
+    """The SELECTs sent to the database."""
+    sent = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            sent.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    get_query_cache().backend.clear()
+    yield sent
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    get_query_cache().backend.clear()
+
+
+@pytest.fixture
+def sessions(engine):
+    with Session(engine) as session:
+        session.add_all([Parent(id=1, code="A", name="a"), Parent(id=2, code="B", name="b")])
+        session.commit()
+
+    opened = []
+
+    def new_session() -> Session:
+        opened.append(Session(engine))
+        return opened[-1]
+
+    yield new_session
+    for session in opened:
+        session.close()
+
+
+def test_read_served_from_cache(sessions, statements):
+    assert CachedParentRepository(sessions()).get_by_id(1).name == "a"
+    assert CachedParentRepository(sessions()).get_by_id(1).name == "a"
+    assert len(statements) == 1
+
+    # the bound values are part of the key
+    assert CachedParentRepository(sessions()).get_by_id(2).name == "b"
+    assert len(statements) == 2
+
+
+def test_commit_invalidates(sessions, statements):
+    CachedParentRepository(sessions()).get_by_id(1)
+
+    writer = sessions()
+    CachedParentRepository(writer).update(1, {"name": "changed"})
+    writer.commit()
+
+    assert CachedParentRepository(sessions()).get_by_id(1).name == "changed"
+
+
+def test_bulk_statement_commit_invalidates(sessions, statements):
+    CachedParentRepository(sessions()).get_all(sort_by="id")
+
+    writer = sessions()
+    CachedParentRepository(writer).bulk_update([{"id": 2, "name": "changed"}])
+    writer.commit()
+
+    assert [p.name for p in CachedParentRepository(sessions()).get_all(sort_by="id")] == ["a", "changed"]
+
+
+def test_rollback_keeps_cache(sessions, statements):
+    CachedParentRepository(sessions()).get_by_id(1)
+
+    writer = sessions()
+    CachedParentRepository(writer).bulk_update([{"id": 1, "name": "discarded"}])
+    writer.rollback()
+
+    assert CachedParentRepository(sessions()).get_by_id(1).name == "a"
+    assert len(statements) == 1
+
+
+def test_own_writes_bypass_cache(sessions, statements):
+    CachedParentRepository(sessions()).get_by_id(2)
+
+    writer = sessions()
+    repository = CachedParentRepository(writer)
+    repository.bulk_update([{"id": 2, "name": "uncommitted"}])
+
+    assert repository.get_by(field="code", value="B", unique=True).name == "uncommitted"
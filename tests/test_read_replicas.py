@@ -0,0 +1,114 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+import configs.database  # noqa: F401 (has_writes listeners)
+from repositories.base_repository import BaseRepository
+from tests.models import Base, Parent
+from utils.read_replicas import REPLICA_OPTION, ReplicaSet, RoutingSession
+
+
+class ParentRepository(BaseRepository[Parent]):
+    model = Parent
+
+
+def _engine(name: str, url: str = "sqlite://"):
+    engine = create_engine(url, poolclass=StaticPool)
+    if url == "sqlite://":
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(Parent.__table__.insert(), [{"id": 1, "code": "A", "name": name}])
+    return engine
+
+
+@pytest.fixture
+def primary():
+    engine = _engine("primary")
+    with engine.begin() as connection:
+        # not replicated yet
+        connection.execute(Parent.__table__.insert(), [{"id": 2, "code": "B", "name": "primary"}])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica():
+    engine = _engine("replica")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(primary, replica):
+    with RoutingSession(bind=primary, replicas=ReplicaSet({"replica_0": replica})) as session:
+        yield session
+
+
+def test_reads_go_to_the_replica(session):
+    assert ParentRepository(session).get_by_id(1).name == "replica"
+    assert session.replica_name == "replica_0"
+
+
+def test_unmarked_statements_go_to_the_primary(session):
+    assert session.scalar(select(Parent.name).where(Parent.id == 1)) == "primary"
+    assert session.replica_name is None
+
+
+def test_for_update_goes_to_the_primary(session):
+    query = select(Parent).where(Parent.id == 1).with_for_update()
+    assert session.scalars(query.execution_options(**{REPLICA_OPTION: True})).one().name == "primary"
+
+
+def test_update_reads_the_primary(session):
+    repository = ParentRepository(session)
+
+    assert repository.update(1, {"code": "A2"}).name == "primary"
+    # not on the replica yet
+    assert repository.update(2, {"code": "B2"}).name == "primary"
+
+
+def test_delete_reads_the_primary(session):
+    ParentRepository(session).delete_by_id(2)
+    session.flush()
+
+    assert session.get(Parent, 2) is None
+
+
+def test_reads_after_a_write_go_to_the_primary(session):
+    repository = ParentRepository(session)
+    repository.bulk_update([{"id": 1, "code": "A2"}])
+
+    assert repository.get_by("code", "A2", unique=True).name == "primary"
+    assert session.replica_name is None
+
+
+def test_unreachable_replica_falls_back_to_the_primary(primary, tmp_path):
+    broken = _engine("broken", f"sqlite:///{tmp_path}/missing/replica.db")
+    replicas = ReplicaSet({"replica_0": broken}, retry_interval=60)
+
+    with RoutingSession(bind=primary, replicas=replicas) as session:
+        assert ParentRepository(session).get_by_id(1).name == "primary"
+        assert not replicas.is_healthy("replica_0")
+
+        # left out of the rotation until retry_interval
+        assert ParentRepository(session).get_by_id(2).name == "primary"
+        assert session.replica_name is None
+    broken.dispose()
+
+
+def test_replica_back_after_retry_interval(replica):
+    replicas = ReplicaSet({"replica_0": replica}, retry_interval=0)
+    replicas.mark_down("replica_0")
+
+    assert replicas.choose() == "replica_0"
+
+
+def test_choose_round_robin_skips_down_replicas(replica):
+    replicas = ReplicaSet({"replica_0": replica, "replica_1": replica, "replica_2": replica})
+    replicas.mark_down("replica_1")
+
+    assert [replicas.choose() for _ in range(4)] == ["replica_0", "replica_2", "replica_0", "replica_2"]
+
+    replicas.mark_down("replica_0")
+    replicas.mark_down("replica_2")
+    assert replicas.choose() is None
@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+from repositories.base_repository import BaseRepository
+from tests.models import Child, Parent
+from utils import lazy_loads
+from utils.lazy_loads import detect_lazy_loads, record_lazy_load
+
+
+class ParentRepository(BaseRepository[Parent]):
+    model = Parent
+
+
+class JoinedParentRepository(BaseRepository[Parent]):
+    model = Parent
+    relationship_loading = {"children": "joined"}
+
+
+class RaiseParentRepository(BaseRepository[Parent]):
+    model = Parent
+    relationship_loading = {"children": "raise"}
+
+
+@pytest.fixture
+def session(session):
+    session.add_all(
+        Parent(id=i, code=f"C{i}", name=f"n{i % 2}", children=[Child(), Child()])
+        for i in range(1, 4)
+    )
+    session.commit()
+    session.expunge_all()
+    # configs.database registers it on every Session once imported
+    if not event.contains(Session, "do_orm_execute", record_lazy_load):
+        event.listen(session, "do_orm_execute", record_lazy_load)
+    return session
+
+
+@pytest.fixture
+def statements(session):
+    executed = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: executed.append(args[2]))
+    return executed
+
+
+@pytest.fixture
+def warning(mocker):
+    mocker.patch.object(lazy_loads, "LAZY_LOAD_DETECTION", True)
+    return mocker.patch.object(lazy_loads.logger, "warning")
+
+
+@pytest.mark.parametrize("repository_class", [ParentRepository, JoinedParentRepository])
+def test_join_returns_one_instance(session, repository_class):
+    repository = repository_class(session)
+
+    parent = repository.get_by_id(1, join_={"children"})
+    assert isinstance(parent, Parent)
+    assert len(parent.children) == 2
+    assert repository.get_by_id(99, join_={"children"}) is None
+
+    assert repository.get_by("code", "C2", join_={"children"}, unique=True).id == 2
+    assert repository.get_by_muti_fields([Parent.code == "C3"], join_={"children"}).id == 3
+
+
+def test_join_without_unique_returns_a_list(session):
+    parents = ParentRepository(session).get_by("name", "n1", join_={"children"})
+
+    assert sorted(parent.id for parent in parents) == [1, 3]
+    assert all(len(parent.children) == 2 for parent in parents)
+
+
+def test_selectin_loads_with_one_extra_query(session, statements):
+    parents = ParentRepository(session).get_all(0, 10, join_={"children"})
+    [len(parent.children) for parent in parents]
+
+    assert len(statements) == 2
+    assert " IN " in statements[1]
+
+
+def test_joined_loads_in_the_same_query(session, statements):
+    parents = JoinedParentRepository(session).get_all(0, 10, join_={"children"})
+    [len(parent.children) for parent in parents]
+
+    assert len(statements) == 1
+    assert "JOIN" in statements[0]
+
+
+def test_raise_relationship_is_never_loaded(session):
+    repository = RaiseParentRepository(session)
+    parent = repository.get_by_id(1)
+
+    with pytest.raises(InvalidRequestError):
+        parent.children
+    with pytest.raises(ValueError):
+        repository.get_by_id(1, join_={"children"})
+
+
+def test_lazy_loads_are_logged(session, warning):
+    with detect_lazy_loads("GET /parents"):
+        for parent in ParentRepository(session).get_all(0, 10):
+            len(parent.children)
+
+    warning.assert_called_once()
+    message = warning.call_args.args[0]
+    assert "GET /parents" in message
+    assert "Parent.children x3" in message
+
+
+def test_eager_loads_are_not_logged(session, warning):
+    with detect_lazy_loads("GET /parents"):
+        for parent in ParentRepository(session).get_all(0, 10, join_={"children"}):
+            len(parent.children)
+
+    warning.assert_not_called()
+
+
+def test_detection_is_off_outside_local(session, mocker):
+    warning = mocker.patch.object(lazy_loads.logger, "warning")
+
+    with detect_lazy_loads("GET /parents"):
+        for parent in ParentRepository(session).get_all(0, 10):
+            len(parent.children)
+
+    warning.assert_not_called()
@@ -0,0 +1,104 @@
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.metrics.metrics_controller import router as metrics_router
+from middlewares.metrics_middleware import MetricsMiddleware
+from utils.request_metrics import RequestTimings, add_query_time, record_stage
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/metered/{item_id}")
+    def metered(item_id: int):
+        with record_stage("serialization"):
+            add_query_time(0.004)
+            add_query_time(0.006)
+        return {"id": item_id}
+
+    app.include_router(metrics_router, prefix="/api/metrics")
+    app.add_middleware(MetricsMiddleware)
+    return TestClient(app)
+
+
+def _server_timing(response):
+    return {
+        name: float(duration)
+        for name, duration in re.findall(r"(\w+);dur=([\d.]+)", response.headers["server-timing"])
+    }
+
+
+def _sample(metrics, name, **labels):
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{name}{{{re.escape(label_text)}}} (\S+)$", metrics, re.MULTILINE)
+    return float(match.group(1)) if match else 0
+
+
+def test_server_timing_header(client):
+    response = client.get("/metered/1")
+    timings = _server_timing(response)
+
+    assert set(timings) == {"serialization", "handler", "db", "total"}
+    assert 'db;dur=10.00;desc="2 queries"' in response.headers["server-timing"]
+    assert timings["total"] >= timings["serialization"]
+
+
+def test_request_is_exported_by_route_template(client):
+    before = _sample(
+        client.get("/api/metrics/").text,
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="/metered/{item_id}",
+        status="200",
+    )
+
+    client.get("/metered/1")
+    client.get("/metered/2")
+    metrics = client.get("/api/metrics/").text
+
+    labels = {"method": "GET", "route": "/metered/{item_id}", "status": "200"}
+    assert _sample(metrics, "http_request_duration_seconds_count", **labels) == before + 2
+    assert _sample(
+        metrics, "http_request_stage_seconds_count", route="/metered/{item_id}", stage="handler"
+    ) >= 2
+    assert _sample(metrics, "http_request_db_queries_sum", route="/metered/{item_id}") >= 4
+    assert _sample(metrics, "http_response_size_bytes_sum", route="/metered/{item_id}") >= 2 * len(
+        b'{"id":1}'
+    )
+
+
+def test_unmatched_requests_share_one_label(client):
+    client.get("/nowhere/1")
+    client.get("/nowhere/2")
+    metrics = client.get("/api/metrics/").text
+
+    assert _sample(
+        metrics,
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="unmatched",
+        status="404",
+    ) >= 2
+    assert "/nowhere" not in metrics
+
+
+def test_metrics_endpoint_format(client):
+    response = client.get("/api/metrics/")
+
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+
+def test_handler_stage_excludes_the_other_stages():
+    timings = RequestTimings()
+    timings.started -= 0.5
+    timings.add_stage("auth", 0.1)
+    timings.add_stage("session", 0.15)
+
+    timings.mark_response_start()
+
+    assert timings.stages["handler"] == pytest.approx(0.25, abs=0.05)
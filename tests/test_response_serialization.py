@@ -0,0 +1,104 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+import pytest
+from fastapi.responses import JSONResponse
+
+from tests.models import Child, Parent
+from utils.response import response_success, serialize_data
+
+
+def legacy_serialize_data(data: any) -> any:
+    """serialize_data before the per-type serializers, the reference output."""
+    if hasattr(data, "__dict__"):
+        data_dict: dict[str, any] = data.__dict__
+        data = {k: v for k, v in data_dict.items() if not k.startswith("_")}
+        return legacy_serialize_data(data)
+    elif isinstance(data, dict):
+        return {key: legacy_serialize_data(value) for key, value in data.items()}
+    elif isinstance(data, (list, tuple)):
+        return [legacy_serialize_data(item) for item in data]
+    elif isinstance(data, datetime):
+        return data.strftime("%Y-%m-%d %H:%M:%S")
+    elif isinstance(data, (str, int, float, bool, type(None))):
+        return data
+    else:
+        return str(data)
+
+
+class Color(Enum):
+    RED = 1
+
+
+class Status(str, Enum):
+    ACTIVE = "active"
+
+
+class Plain:
+    def __init__(self):
+        self.created_at = datetime(2024, 5, 6, 7, 8, 9, 123456)
+        self.amount = Decimal("12.50")
+        self._private = "hidden"
+
+
+def _parent(session) -> Parent:
+    session.add(
+        Parent(
+            id=1,
+            code="A",
+            name=None,
+            updated_at=datetime(2024, 1, 2, 3, 4, 5, 678901),
+            children=[Child(id=1), Child(id=2)],
+        )
+    )
+    session.commit()
+    session.expunge_all()
+    parent = session.get(Parent, 1)
+    # loaded relationship: serialized nested, like any public attribute
+    assert len(parent.children) == 2
+    return parent
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        datetime(2024, 1, 2, 3, 4, 5, 678901),
+        datetime(2024, 1, 2),
+        date(2024, 1, 2),
+        time(3, 4, 5),
+        Decimal("1.10"),
+        Decimal("1E+2"),
+        UUID("12345678-1234-5678-1234-567812345678"),
+        None,
+        True,
+        1.5,
+        "text",
+        Color.RED,
+        Status.ACTIVE,
+        {"at": datetime(2024, 1, 2), "nested": [(1, Decimal("2")), {"none": None}]},
+        [Plain(), Plain()],
+    ],
+)
+def test_same_output_as_legacy(data):
+    assert serialize_data(data) == legacy_serialize_data(data)
+
+
+def test_same_output_as_legacy_for_entities(session):
+    parent = _parent(session)
+
+    assert serialize_data(parent) == legacy_serialize_data(parent)
+    assert serialize_data([parent, parent.children[0]]) == legacy_serialize_data(
+        [parent, parent.children[0]]
+    )
+
+
+def test_same_body_as_legacy(session):
+    data = {"parent": _parent(session), "amount": Decimal("3.30"), "color": Color.RED}
+
+    legacy = JSONResponse(
+        content={"success": True, "data": legacy_serialize_data(data), "errors": []}
+    )
+    assert json.loads(response_success(data).body) == json.loads(legacy.body)
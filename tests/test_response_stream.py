@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from repositories.base_repository import BaseRepository
+from tests.models import Base, Parent
+from utils import response
+from utils.response import STREAM_CHUNK_ROWS, response_stream, serialize_data
+
+
+class ParentRepository(BaseRepository[Parent]):
+    model = Parent
+
+
+def _rows(count):
+    return [{"id": i, "name": f"row {i}"} for i in range(count)]
+
+
+def _failing_rows(count):
+    yield from _rows(count)
+    raise RuntimeError("cursor lost")
+
+
+async def _async_rows(rows):
+    for row in rows:
+        yield row
+
+
+def _get(rows, ndjson=False):
+    app = Starlette(routes=[Route("/", lambda request: response_stream(rows, ndjson))])
+    return TestClient(app).get("/")
+
+
+@pytest.fixture
+def engine():
+    # sync rows are iterated in the thread pool
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def quiet(mocker):
+    return mocker.patch.object(response.logger, "exception")
+
+
+@pytest.mark.parametrize("count", [0, 1, STREAM_CHUNK_ROWS, STREAM_CHUNK_ROWS * 2 + 1])
+@pytest.mark.parametrize("wrap", [iter, _async_rows], ids=["sync", "async"])
+def test_json(count, wrap):
+    result = _get(wrap(_rows(count)))
+
+    assert result.headers["content-type"] == "application/json"
+    # the same envelope as response_success
+    assert result.json() == {"success": True, "data": _rows(count), "errors": []}
+
+
+@pytest.mark.parametrize("count", [0, 1, STREAM_CHUNK_ROWS * 2 + 1])
+@pytest.mark.parametrize("wrap", [iter, _async_rows], ids=["sync", "async"])
+def test_ndjson(count, wrap):
+    result = _get(wrap(_rows(count)), ndjson=True)
+
+    assert result.headers["content-type"] == "application/x-ndjson"
+    header, *lines = result.text.splitlines()
+    assert json.loads(header) == {"success": True, "errors": []}
+    assert [json.loads(line) for line in lines] == _rows(count)
+
+
+def test_failure_is_reported_in_the_json_envelope(quiet):
+    result = _get(_failing_rows(STREAM_CHUNK_ROWS + 3))
+
+    body = result.json()
+    assert result.status_code == 200
+    # the chunks sent before the failure
+    assert body["data"] == _rows(STREAM_CHUNK_ROWS)
+    assert body["errors"][0]["code"] == "SYSTEM_ERROR"
+    quiet.assert_called_once()
+
+
+def test_failure_is_reported_on_the_last_ndjson_line():
+    lines = _get(_failing_rows(STREAM_CHUNK_ROWS + 3), ndjson=True).text.splitlines()
+
+    assert len(lines) == STREAM_CHUNK_ROWS + 2
+    last = json.loads(lines[-1])
+    assert last["success"] is False
+    assert last["errors"][0]["code"] == "SYSTEM_ERROR"
+
+
+def test_repository_stream(session):
+    session.add_all(Parent(id=i, code=f"C{i}", name=f"n{i}") for i in range(1, 4))
+    session.commit()
+    expected = serialize_data(ParentRepository(session).get_all(sort_by="id"))
+
+    result = _get(ParentRepository(session).stream(sort_by="id", yield_per=2))
+
+    assert result.json()["data"] == json.loads(json.dumps(expected))
@@ -0,0 +1,96 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from configs.context import request_timings
+from utils import sql_instrumentation
+from utils.metrics import registry
+from utils.request_metrics import RequestTimings
+from utils.sql_instrumentation import (
+    MAX_LOGGED_PARAMETERS,
+    _operation,
+    db_slow_queries,
+    instrument_engine,
+)
+
+
+@pytest.fixture
+def log(mocker):
+    mocker.patch.object(sql_instrumentation.sql_logger, "isEnabledFor", return_value=True)
+    return mocker.patch.object(sql_instrumentation.sql_logger, "log")
+
+
+def _engine(monkeypatch, name, slow_threshold_ms=10_000, sample_rate=0):
+    monkeypatch.setattr(sql_instrumentation.settings, "sql_slow_threshold_ms", slow_threshold_ms)
+    monkeypatch.setattr(sql_instrumentation.settings, "sql_log_sample_rate", sample_rate)
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, name)
+    return engine
+
+
+def _execute(engine, statement="SELECT :value", **params):
+    with engine.connect() as connection:
+        connection.execute(text(statement), params or {"value": 1})
+
+
+@pytest.mark.parametrize(
+    "statement, operation",
+    [("SELECT 1", "SELECT"), ("\n  insert into t values (1)", "INSERT"), ("", "")],
+)
+def test_operation(statement, operation):
+    assert _operation(statement) == operation
+
+
+def test_fast_statements_are_measured_not_logged(monkeypatch, log):
+    _execute(_engine(monkeypatch, "sql_fast"))
+
+    log.assert_not_called()
+    assert 'db_query_seconds_count{engine="sql_fast",operation="SELECT"} 1' in registry.render()
+
+
+def test_slow_statements_are_logged_as_warnings(monkeypatch, log):
+    engine = _engine(monkeypatch, "sql_slow", slow_threshold_ms=0)
+    _execute(engine)
+
+    level, *args = log.call_args.args
+    assert level == logging.WARNING
+    assert "SELECT ?" in args
+    assert db_slow_queries.get(engine="sql_slow", operation="SELECT") == 1
+
+
+def test_sampled_statements_are_logged_as_info(monkeypatch, log, mocker):
+    engine = _engine(monkeypatch, "sql_sampled", sample_rate=0.5)
+
+    mocker.patch("utils.sql_instrumentation.random.random", return_value=0.7)
+    _execute(engine)
+    log.assert_not_called()
+
+    mocker.patch("utils.sql_instrumentation.random.random", return_value=0.2)
+    _execute(engine)
+    assert log.call_args.args[0] == logging.INFO
+    assert db_slow_queries.get(engine="sql_sampled", operation="SELECT") == 0
+
+
+def test_logged_parameters_are_truncated(monkeypatch, log):
+    engine = _engine(monkeypatch, "sql_long", slow_threshold_ms=0)
+    _execute(engine, value="x" * 2000)
+
+    *_, precision, parameters = log.call_args.args
+    assert precision == MAX_LOGGED_PARAMETERS
+    # %.*s cuts the repr when the record is formatted
+    assert len("%.*s" % (precision, parameters)) == MAX_LOGGED_PARAMETERS
+
+
+def test_statements_are_counted_in_the_request(monkeypatch):
+    engine = _engine(monkeypatch, "sql_request")
+    timings = RequestTimings()
+    token = request_timings.set(timings)
+    try:
+        _execute(engine)
+        _execute(engine)
+    finally:
+        request_timings.reset(token)
+
+    assert timings.db_queries == 2
+    assert timings.db_seconds > 0
@@ -0,0 +1,109 @@
+import pytest
+
+from repositories import base_repository
+from repositories.base_repository import BaseRepository
+from tests.models import Child, Parent
+
+
+class ParentRepository(BaseRepository[Parent]):
+    model = Parent
+
+
+class UncachedParentRepository(BaseRepository[Parent]):
+    model = Parent
+    statement_cache = False
+
+
+class ChildRepository(BaseRepository[Child]):
+    model = Child
+
+
+@pytest.fixture
+def repository(session):
+    ParentRepository._statements.clear()
+    session.add_all(
+        Parent(id=i, code=f"C{i}", name=None if i == 5 else f"n{i % 2}", children=[Child()])
+        for i in range(1, 6)
+    )
+    session.commit()
+    return ParentRepository(session)
+
+
+def test_same_shape_reuses_the_statement(repository):
+    first, first_params = repository._get_by_statement("id", 1)
+    second, second_params = repository._get_by_statement("id", 2)
+
+    assert first is second
+    assert (first_params, second_params) == ({"value": 1}, {"value": 2})
+
+
+def test_shapes_are_keyed_separately(repository):
+    by_id = repository._get_by_statement("id", 1)[0]
+
+    assert repository._get_by_statement("code", "C1")[0] is not by_id
+    assert repository._get_by_statement("id", 1, {"children"})[0] is not by_id
+    assert repository._get_by_statement("id", 1, use_primary=True)[0] is not by_id
+    assert repository._page_statement(sort_by="id")[0] is not repository._page_statement()[0]
+    assert (
+        repository._page_statement(sort_by="id", sort_desc=True)[0]
+        is not repository._page_statement(sort_by="id")[0]
+    )
+    assert repository._page_statement(with_total=True)[0] is not repository._page_statement()[0]
+
+
+def test_equal_join_sets_share_the_statement(repository):
+    first = repository._get_by_statement("id", 1, {"children"})[0]
+
+    # a new set object per call, as built by the controllers
+    assert repository._get_by_statement("id", 2, set(("children",)))[0] is first
+
+
+def test_unknown_sort_column_shares_the_unsorted_statement(repository):
+    assert repository._page_statement(sort_by="nope")[0] is repository._page_statement()[0]
+    assert not any(key[2] == "nope" for key in ParentRepository._statements if key[0] == "page")
+
+
+def test_cache_per_repository_class(repository, session):
+    repository.get_by_id(1)
+    ChildRepository(session).get_by_id(1)
+
+    assert all(key[0] in ("get_by", "page") for key in ParentRepository._statements)
+    assert ParentRepository._statements is not ChildRepository._statements
+    assert ChildRepository._statements.keys() == {("get_by", "id", None, False, None)}
+
+
+def test_results_bind_the_values(repository):
+    assert repository.get_by_id(2).code == "C2"
+    assert repository.get_by_id(3).code == "C3"
+    assert repository.get_by_id(99) is None
+    assert [p.id for p in repository.get_by("name", "n1")] == [1, 3]
+    # IS NULL is not cached as "= :value"
+    assert [p.id for p in repository.get_by("name", None)] == [5]
+
+
+def test_results_of_pages(repository):
+    assert [p.id for p in repository.get_all(1, 2, sort_by="id", sort_desc=True)] == [4, 3]
+    assert [p.id for p in repository.get_all(3, 2, sort_by="id", sort_desc=True)] == [2, 1]
+
+    items, total = repository.get_all(0, 2, sort_by="id", with_total=True)
+    assert ([p.id for p in items], total) == ([1, 2], 5)
+    assert repository.get_all(10, 2, with_total=True) == ([], 5)
+
+    parents = repository.get_all(0, 3, join_={"children"}, sort_by="id")
+    assert [len(p.children) for p in parents] == [1, 1, 1]
+
+
+def test_uncached_repository_matches(repository, session):
+    uncached = UncachedParentRepository(session)
+
+    assert uncached.get_by_id(2).code == repository.get_by_id(2).code
+    assert UncachedParentRepository._statements == {}
+
+
+def test_cache_size_is_bounded(repository, monkeypatch):
+    monkeypatch.setattr(base_repository, "STATEMENT_CACHE_SIZE", 2)
+
+    for field in ("id", "code", "name"):
+        repository.get_by(field, 1)
+
+    assert len(ParentRepository._statements) == 2
@@ -7,8 +7,13 @@ from exceptions.handler import app_exception_handler
 from exceptions.handler import system_exception_handler
 from exceptions.system_exception import SystemException
 from middlewares.auth_middleware import AuthMiddleware
+from middlewares.compression_middleware import CompressionMiddleware
 from middlewares.db_session_middleware import DatabaseSessionMiddleware
+from middlewares.etag_middleware import ETagMiddleware
+from middlewares.metrics_middleware import MetricsMiddleware
+from middlewares.profiling_middleware import ProfilingMiddleware
 from middlewares.request_logging_middleware import RequestLoggingMiddleware
+from utils.prewarm import lifespan
 
 settings = get_settings()
 
@@ -17,6 +22,7 @@ def create_fastapi() -> FastAPI:
     fastapi_params = {
         "title": settings.app_name,
         "version": settings.api_version,
+        "lifespan": lifespan,
     }
 
 
@@ -34,10 +40,23 @@ def create_fastapi() -> FastAPI:
     # add middlewares
     __MIDDLEWARES__ = [
         RequestLoggingMiddleware,
+        MetricsMiddleware,
         DatabaseSessionMiddleware,
         AuthMiddleware,
     ]
 
+    # profiling costs nothing unless configured
+    if settings.profiling_enabled or settings.profiling_sample_rate > 0:
+        __MIDDLEWARES__.insert(__MIDDLEWARES__.index(MetricsMiddleware) + 1, ProfilingMiddleware)
+
+    # the ETag is computed on the uncompressed body, inside the metrics (304s are counted)
+    if settings.etag_enabled:
+        __MIDDLEWARES__.insert(__MIDDLEWARES__.index(MetricsMiddleware) + 1, ETagMiddleware)
+
+    # outermost after CORS: the metrics see the uncompressed response size
+    if settings.compression_enabled:
+        __MIDDLEWARES__.insert(0, CompressionMiddleware)
+
     for middleware in __MIDDLEWARES__.__reversed__():
         app.add_middleware(middleware)
 
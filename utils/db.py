@@ -1,12 +1,27 @@
-from dateutil.parser import parser
+from datetime import datetime
+
+from dateutil import parser
 from exceptions.app_exception import ConflictError, ResourceNotFound
 
+
+def parse_updated_at(client_updated_at: str | datetime | None) -> datetime | None:
+    """Returns the updated_at sent by a client as a datetime."""
+    if isinstance(client_updated_at, str):
+        return parser.parse(client_updated_at)
+    return client_updated_at
+
+
 def check_concurrency(db_obj, client_updated_at):
+    """
+    Raises ConflictError when the row changed since the client read it.
+
+    Prefer BaseRepository.update_if_unchanged, which checks and writes in a
+    single statement.
+    """
     if db_obj is None:
         raise ResourceNotFound()
-    
-    if isinstance(client_updated_at, str):
-        client_updated_at = parser(client_updated_at)
-    
+
+    client_updated_at = parse_updated_at(client_updated_at)
+
     if db_obj.updated_at != client_updated_at:
         raise ConflictError()
@@ -0,0 +1,114 @@
+import os
+import string
+import threading
+import time
+from typing import Any
+
+import orjson
+
+from utils.messages import MESSAGES_PATH, load_messages
+
+# the envelope of a failed response around the comma separated error objects
+FAIL_PREFIX = b'{"success":false,"data":null,"errors":['
+FAIL_SUFFIX = b"]}"
+
+# seconds between two messages.json modification checks (hot reload)
+RELOAD_CHECK_INTERVAL = 1.0
+
+
+class _KeepMissing(dict):
+    """Format parameters leaving the unknown placeholders as they are."""
+
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+class CompiledMessage:
+    """
+    One catalog entry.
+
+    Fixed messages carry their error object already encoded; parameterized
+    ones keep the template and are formatted (and encoded) per exception.
+    """
+
+    __slots__ = ("code", "template", "fields", "error_json", "body")
+
+    def __init__(self, code: str, template: str):
+        self.code = code
+        self.template = template
+        self.fields = frozenset(
+            field for _, field, _, _ in string.Formatter().parse(template) if field
+        )
+        if self.fields:
+            self.error_json = None
+            self.body = None
+        else:
+            self.error_json = encode_error(code, template)
+            self.body = FAIL_PREFIX + self.error_json + FAIL_SUFFIX
+
+    def format(self, params: dict[str, Any] | None = None) -> str:
+        if not self.fields:
+            return self.template
+        return self.template.format_map(_KeepMissing(params or {}))
+
+
+class ErrorCatalog:
+    """The messages.json sections compiled once, read-only afterwards."""
+
+    def __init__(self, messages: dict[str, dict[str, str]]):
+        self.sections = {
+            section: {code: CompiledMessage(code, template) for code, template in entries.items()}
+            for section, entries in messages.items()
+        }
+
+    def get(self, section: str, code: str) -> CompiledMessage | None:
+        return self.sections.get(section, {}).get(code)
+
+
+def encode_error(code: str, message: str) -> bytes:
+    """Returns the JSON error object of a failed response."""
+    return orjson.dumps({"code": code, "message": message})
+
+
+def _messages_mtime() -> float | None:
+    try:
+        return os.stat(MESSAGES_PATH).st_mtime
+    except OSError:
+        return None
+
+
+_catalog = ErrorCatalog(load_messages())
+_catalog_mtime = _messages_mtime()
+_last_check = time.monotonic()
+_reload_lock = threading.Lock()
+
+
+def get_catalog() -> ErrorCatalog:
+    """Returns the current catalog, reloaded when messages.json changed."""
+    global _last_check
+    now = time.monotonic()
+    if now - _last_check >= RELOAD_CHECK_INTERVAL:
+        _last_check = now
+        if _messages_mtime() != _catalog_mtime:
+            reload_catalog()
+    return _catalog
+
+
+def reload_catalog() -> ErrorCatalog:
+    """
+    Recompiles the catalog from messages.json.
+
+    The new catalog replaces the old one in a single assignment: readers get
+    either of them, never a half built one. A file that cannot be read keeps
+    the current catalog.
+    """
+    global _catalog, _catalog_mtime
+    with _reload_lock:
+        mtime = _messages_mtime()
+        load_messages.cache_clear()
+        messages = load_messages()
+        if messages:
+            _catalog = ErrorCatalog(messages)
+        # a broken file is not retried until it changes again
+        _catalog_mtime = mtime
+    return _catalog
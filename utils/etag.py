@@ -0,0 +1,33 @@
+from hashlib import blake2b
+from typing import Any
+
+
+def etag_of(body: bytes) -> str:
+    """Returns the weak ETag of a response body."""
+    return f'W/"{blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def fingerprint_etag(*parts: Any) -> str:
+    """
+    Returns a weak ETag from a data fingerprint instead of the payload, e.g.
+    BaseRepository.fingerprint() with the query parameters of the list:
+
+    fingerprint_etag("facility", *repository.fingerprint(), request.url.query)
+
+    Updates move max(updated_at), inserts and deletes change the count, so the
+    tag changes with the data without querying nor serializing it.
+    """
+    return etag_of(repr(parts).encode())
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Returns whether an If-None-Match header matches the ETag (weak comparison,
+    the W/ prefixes are ignored).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
@@ -0,0 +1,304 @@
+import os
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from itertools import islice
+from operator import attrgetter
+from typing import Any, AsyncIterable, Callable, Iterable, Iterator
+from urllib.parse import quote
+from uuid import UUID
+
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+
+from configs.logging_conf import logger
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# number of rows fetched (yield_per) and written per chunk
+EXPORT_CHUNK_ROWS = 1000
+
+DECIMAL_FORMAT = "#,##0.00"
+
+# values written as they are, the others go through _cell_value
+_NATIVE_TYPES = frozenset({str, int, float, bool, Decimal, date, time, type(None)})
+
+
+def _cell_value(value: Any) -> Any:
+    """Converts the values openpyxl does not accept as they are."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # Excel has no time zones: keep the wall clock time
+        return value.replace(tzinfo=None)
+    if isinstance(value, (UUID, Enum)):
+        return str(value.value if isinstance(value, Enum) else value)
+    if isinstance(value, (dict, list)):
+        return str(value)
+    return value
+
+
+class ExcelColumn:
+    """
+    One exported column: the model attribute (or row key), its header, and
+    an optional number format and width.
+    """
+
+    __slots__ = ("key", "header", "number_format", "width")
+
+    def __init__(
+        self,
+        key: str,
+        header: str | None = None,
+        number_format: str | None = None,
+        width: float | None = None,
+    ):
+        self.key = key
+        self.header = header or key
+        self.number_format = number_format
+        self.width = width
+
+
+def _number_format_of(column_type) -> str | None:
+    # dates and times get their format from openpyxl, without a styled cell
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        return None
+    if python_type is Decimal or python_type is float:
+        scale = getattr(column_type, "scale", None)
+        if scale is None:
+            return DECIMAL_FORMAT
+        return "#,##0." + "0" * scale if scale else "#,##0"
+    return None
+
+
+def columns_for_model(
+    model, keys: list[str] | None = None, headers: dict[str, str] | None = None
+) -> list[ExcelColumn]:
+    """
+    Returns the export columns of a model. Numeric columns are formatted with
+    thousands separators and their scale; dates and times get the openpyxl
+    defaults (yyyy-mm-dd, yyyy-mm-dd h:mm:ss, h:mm:ss).
+
+    :param model: The SQLAlchemy model class.
+    :param keys: The attributes to export, every column by default.
+    :param headers: Header per attribute, the attribute name by default.
+    :return: The export columns.
+    """
+    from sqlalchemy import inspect as sa_inspect
+
+    table_columns = {column.key: column for column in sa_inspect(model).columns}
+    headers = headers or {}
+    columns = []
+    for key in keys or list(table_columns):
+        column = table_columns.get(key)
+        number_format = _number_format_of(column.type) if column is not None else None
+        columns.append(ExcelColumn(key, headers.get(key), number_format))
+    return columns
+
+
+class ExcelWriter:
+    """
+    Writes rows into an openpyxl write-only workbook saved to a temporary file.
+
+    Write-only worksheets serialize every appended row to their own temporary
+    XML file, so memory does not grow with the number of rows. Number formats
+    are applied per cell from one style per column, built once.
+    """
+
+    def __init__(self, columns: list[ExcelColumn], sheet_title: str = "Sheet1"):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
+
+        self.columns = columns
+        self.workbook = Workbook(write_only=True)
+        self.worksheet = self.workbook.create_sheet(sheet_title)
+        self.rows = 0
+
+        for index, column in enumerate(columns, 1):
+            if column.width is not None:
+                self.worksheet.column_dimensions[get_column_letter(index)].width = column.width
+
+        # (position, shared style) of the formatted columns, built once
+        self._styled = []
+        for index, column in enumerate(columns):
+            if column.number_format is not None:
+                template = WriteOnlyCell(self.worksheet)
+                template.number_format = column.number_format
+                self._styled.append((index, template._style))
+        self._cell = WriteOnlyCell
+        self._extract = None
+
+        self.worksheet.append([column.header for column in columns])
+
+    def _extractor(self, row) -> Callable[[Any], list]:
+        """Returns the function reading the column values of rows like this one."""
+        keys = [column.key for column in self.columns]
+        if isinstance(row, dict):
+            return lambda row: [row.get(key) for key in keys]
+        if hasattr(row, "_mapping"):
+            return lambda row: [row._mapping.get(key) for key in keys]
+        get = attrgetter(*keys)
+        if len(keys) == 1:
+            return lambda row: [get(row)]
+        return lambda row: list(get(row))
+
+    def _values(self, row) -> list:
+        values = self._extract(row)
+        for index, value in enumerate(values):
+            if type(value) not in _NATIVE_TYPES:
+                values[index] = _cell_value(value)
+        for index, style in self._styled:
+            value = values[index]
+            if value is not None:
+                cell = self._cell(self.worksheet, value)
+                cell._style = style
+                values[index] = cell
+        return values
+
+    def write(self, rows: Iterable) -> None:
+        """Appends a chunk of rows to the sheet."""
+        append = self.worksheet.append
+        count = 0
+        for row in rows:
+            if self._extract is None:
+                self._extract = self._extractor(row)
+            append(self._values(row))
+            count += 1
+        self.rows += count
+
+    def save(self) -> str:
+        """Saves the workbook to a new temporary file and returns its path."""
+        fd, path = tempfile.mkstemp(suffix=".xlsx", prefix="export-")
+        os.close(fd)
+        try:
+            self.workbook.save(path)
+        except Exception:
+            os.remove(path)
+            self.discard()
+            raise
+        return path
+
+    def discard(self) -> None:
+        """
+        Drops the workbook of a failed export: closes the sheet stream and
+        removes its temporary XML file (openpyxl only does it on save or at
+        process exit).
+        """
+        writer = self.worksheet._writer
+        if writer is None:
+            return
+        if self.worksheet._rows is not None:
+            self.worksheet._rows.close()
+        writer.close()
+        try:
+            writer.cleanup()
+        except (OSError, ValueError):
+            # already removed by a save that failed later on
+            pass
+
+
+def _chunks(rows: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def write_xlsx(
+    rows: Iterable,
+    columns: list[ExcelColumn],
+    sheet_title: str = "Sheet1",
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> tuple[str, int]:
+    """
+    Writes rows (e.g. BaseRepository.stream) into a temporary XLSX file.
+
+    :param rows: Model instances, Row objects or dicts.
+    :param columns: The exported columns.
+    :param sheet_title: The sheet name.
+    :param chunk_rows: The number of rows written per chunk.
+    :return: The temporary file path (removed by the caller) and the row count.
+    """
+    writer = ExcelWriter(columns, sheet_title)
+    try:
+        for chunk in _chunks(rows, chunk_rows):
+            writer.write(chunk)
+    except BaseException:
+        writer.discard()
+        raise
+    return writer.save(), writer.rows
+
+
+async def awrite_xlsx(
+    rows: AsyncIterable,
+    columns: list[ExcelColumn],
+    sheet_title: str = "Sheet1",
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> tuple[str, int]:
+    """
+    Async form of write_xlsx (e.g. AsyncBaseRepository.stream): rows are
+    fetched on the event loop, every chunk is written in the thread pool.
+    """
+    writer = await run_in_threadpool(ExcelWriter, columns, sheet_title)
+    try:
+        chunk = []
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                await run_in_threadpool(writer.write, chunk)
+                chunk = []
+        if chunk:
+            await run_in_threadpool(writer.write, chunk)
+    except BaseException:
+        # also on cancellation (client gone): the chunks written so far are dropped
+        writer.discard()
+        raise
+    return await run_in_threadpool(writer.save), writer.rows
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        logger.warning(f">>>>>> Could not remove the export file {path}")
+
+
+def response_xlsx(path: str, filename: str) -> FileResponse:
+    """
+    Streams a saved workbook as an attachment and removes the file once sent.
+
+    :param path: The workbook path (write_xlsx / awrite_xlsx).
+    :param filename: The download file name.
+    :return: The file response.
+    """
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"},
+        background=BackgroundTask(_remove_file, path),
+    )
+
+
+def export_xlsx(
+    rows: Iterable, columns: list[ExcelColumn], filename: str, sheet_title: str = "Sheet1"
+) -> FileResponse:
+    """
+    Exports rows as an XLSX download from a sync route, e.g.
+
+    return export_xlsx(repository.stream(yield_per=EXPORT_CHUNK_ROWS), columns_for_model(Model), "facilities.xlsx")
+
+    The workbook is complete before the response starts: a failure while
+    reading the rows is still reported as a failed response.
+    """
+    path, _ = write_xlsx(rows, columns, sheet_title)
+    return response_xlsx(path, filename)
+
+
+async def aexport_xlsx(
+    rows: AsyncIterable, columns: list[ExcelColumn], filename: str, sheet_title: str = "Sheet1"
+) -> FileResponse:
+    """Async form of export_xlsx."""
+    path, _ = await awrite_xlsx(rows, columns, sheet_title)
+    return response_xlsx(path, filename)
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from starlette.concurrency import run_in_threadpool
+
+from configs.env import get_settings
+from configs.logging_conf import logger
+
+settings = get_settings()
+
+CheckFunction = Callable[[], Awaitable[dict[str, Any] | None]]
+
+# share of HEALTH_CHECK_TIMEOUT given to the ping of one replica
+REPLICA_TIMEOUT_RATIO = 0.5
+
+
+class HealthCheck:
+    """
+    A named probe with its own timeout; it fails by raising and reports a
+    degraded service by returning {"status": "warn", ...}. The failure of a
+    non critical check is reported as "warn": it never fails readiness.
+    """
+
+    def __init__(self, name: str, func: CheckFunction, timeout: float, critical: bool = True):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.critical = critical
+
+    async def run(self) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            details = await asyncio.wait_for(self.func(), self.timeout)
+            result = {"status": "ok", **(details or {})}
+        except asyncio.TimeoutError:
+            result = {"status": "fail", "error": f"timed out after {self.timeout} s"}
+        except Exception as e:
+            logger.warning(f">>>>>> Health check {self.name} failed: {e!r}")
+            result = {"status": "fail", "error": type(e).__name__}
+        if result["status"] == "fail" and not self.critical:
+            result["status"] = "warn"
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+
+def _statement_timeout() -> str:
+    # SET LOCAL: the timeout ends with the ping transaction (PgBouncer safe)
+    return f"SET LOCAL statement_timeout = {int(settings.health_check_timeout * 1000)}"
+
+
+def _ping_sync(name: str) -> None:
+    from sqlalchemy import text
+
+    from configs.database import get_probe_engine
+
+    with get_probe_engine(name).begin() as connection:
+        connection.execute(text(_statement_timeout()))
+        connection.execute(text("SELECT 1"))
+
+
+async def _ping_async(name: str) -> None:
+    from sqlalchemy import text
+
+    from configs.database import get_async_probe_engine
+
+    async with get_async_probe_engine(name).begin() as connection:
+        await connection.execute(text(_statement_timeout()))
+        await connection.execute(text("SELECT 1"))
+
+
+async def check_database() -> None:
+    # probe engines bound the connect and the statement, the thread of a
+    # timed out sync ping does not stay blocked on an unreachable database
+    if settings.database_session_mode == "async":
+        await _ping_async("primary")
+    else:
+        await run_in_threadpool(_ping_sync, "primary")
+
+
+async def _ping_replica(replicas, name: str, ping: Awaitable[None]) -> str:
+    try:
+        await asyncio.wait_for(ping, settings.health_check_timeout * REPLICA_TIMEOUT_RATIO)
+    except Exception as e:
+        logger.warning(f">>>>>> Health check of replica {name} failed: {e!r}")
+        replicas.mark_down(name)
+        return "down"
+    replicas.mark_up(name)
+    return "up"
+
+
+async def check_replicas() -> dict[str, Any]:
+    # pinged concurrently, each under its own timeout: a hanging replica is
+    # reported down without delaying the others or failing the check
+    from configs.database import get_async_replica_set, get_replica_set
+
+    is_async = settings.database_session_mode == "async"
+    replicas = get_async_replica_set() if is_async else get_replica_set()
+    if not replicas:
+        return {"replicas": {}}
+
+    names = list(replicas.engines)
+    statuses = await asyncio.gather(
+        *[
+            _ping_replica(
+                replicas,
+                name,
+                _ping_async(name.removesuffix("_async"))
+                if is_async
+                else run_in_threadpool(_ping_sync, name),
+            )
+            for name in names
+        ]
+    )
+    # a down replica degrades the service, its reads go to the primary
+    return {
+        "status": "warn" if "down" in statuses else "ok",
+        "replicas": dict(zip(names, statuses)),
+    }
+
+
+async def check_pool() -> dict[str, Any]:
+    # an exhausted pool degrades the service (requests wait for a connection)
+    # but does not make the instance unready
+    from utils.pool_metrics import pool_status
+
+    pools = pool_status()
+    limit = settings.database_pool_size + settings.database_max_overflow
+    exhausted = [
+        name for name, status in pools.items() if status["size"] and status["checked_out"] >= limit
+    ]
+    if exhausted:
+        return {"status": "warn", "exhausted": exhausted, "pools": pools}
+    return {"pools": pools}
+
+
+async def check_cache() -> dict[str, Any]:
+    from utils.query_cache import get_query_cache
+
+    backend = get_query_cache().backend
+    await run_in_threadpool(backend.ping)
+    return {"backend": type(backend).__name__}
+
+
+CHECKS = [
+    HealthCheck("database", check_database, settings.health_check_timeout),
+    HealthCheck("replicas", check_replicas, settings.health_check_timeout, critical=False),
+    HealthCheck("pool", check_pool, 0.5),
+    HealthCheck("cache", check_cache, 1.0),
+]
+
+
+def _import_check_modules() -> None:
+    # SQLAlchemy stays off the app import path: the first run imports it here,
+    # off the event loop, so that its cost is not charged to the check latencies
+    import configs.database  # noqa: F401
+    import utils.pool_metrics  # noqa: F401
+    import utils.query_cache  # noqa: F401
+
+
+class HealthReport:
+    """
+    Runs the checks concurrently and caches the report for cache_ttl seconds.
+
+    Probes arriving while a run is in flight wait for it instead of starting
+    their own, so the database is pinged at most once per TTL.
+    """
+
+    def __init__(self, checks: list[HealthCheck], cache_ttl: float):
+        self.checks = checks
+        self.cache_ttl = cache_ttl
+        self._report: dict[str, Any] | None = None
+        self._expires_at = 0.0
+        self._running: asyncio.Future | None = None
+
+    async def _run(self) -> dict[str, Any]:
+        await run_in_threadpool(_import_check_modules)
+        results = await asyncio.gather(*[check.run() for check in self.checks])
+        checks = {check.name: result for check, result in zip(self.checks, results)}
+        statuses = {result["status"] for result in results}
+        status = "fail" if "fail" in statuses else "warn" if "warn" in statuses else "ok"
+        return {"status": status, "checks": checks}
+
+    async def get(self) -> dict[str, Any]:
+        if self._report is not None and time.monotonic() < self._expires_at:
+            return self._report
+
+        if self._running is None:
+            self._running = asyncio.ensure_future(self._run())
+            try:
+                self._report = await self._running
+                self._expires_at = time.monotonic() + self.cache_ttl
+            finally:
+                self._running = None
+            return self._report
+
+        return await asyncio.shield(self._running)
+
+
+health_report = HealthReport(CHECKS, settings.health_cache_ttl)
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from configs.env import get_settings
+from configs.logging_conf import logger
+from exceptions.app_exception import DecodeError
+from utils.metrics import registry
+
+if TYPE_CHECKING:
+    import jwt
+
+settings = get_settings()
+
+jwt_cache_lookups = registry.counter(
+    "jwt_cache_lookups_total",
+    "Verified token cache lookups.",
+    ["result"],
+)
+
+
+def parse_algorithms(value: str | None) -> list[str]:
+    """Parses ALGORITHMS_JWT, given as a list ('["RS256"]', '[RS256]') or comma separated."""
+    algorithms = [
+        algorithm.strip(" \"'") for algorithm in (value or "").strip().strip("[]").split(",")
+    ]
+    return [algorithm for algorithm in algorithms if algorithm] or ["RS256"]
+
+
+class JwksKeyStore:
+    """
+    Signing keys of a JWKS document, by kid.
+
+    Keys come from a URL (the identity provider), a local file or an
+    in-memory JWKS dict (offline tests). An unknown kid triggers a reload,
+    at most once per min_refresh_interval seconds, to pick up key rotation
+    without letting bad tokens hammer the provider. A failed load is retried
+    after retry_interval seconds.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        file: str | None = None,
+        jwks: dict | None = None,
+        min_refresh_interval: float = 60,
+        retry_interval: float = 5,
+        timeout: float = 5,
+    ):
+        if not (url or file or jwks):
+            raise ValueError("A JWKS url, file or dict is required")
+        self.url = url
+        self.file = file
+        self.jwks = jwks
+        self.min_refresh_interval = min_refresh_interval
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self._keys: dict[str | None, "jwt.PyJWK"] = {}
+        self._loaded_at = float("-inf")
+        self._failed_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _fetch(self) -> dict:
+        if self.jwks is not None:
+            return self.jwks
+        if self.file:
+            with open(self.file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            return json.load(response)
+
+    def refresh(self) -> None:
+        """
+        Reloads the keys, unless they were loaded less than
+        min_refresh_interval ago (retry_interval after a failed load).
+        """
+        import jwt
+
+        # a reload in progress is waited for: it may be the one bringing the
+        # kid of this token (first requests, key rotation)
+        if not self._lock.acquire(timeout=self.timeout):
+            return
+        try:
+            now = time.monotonic()
+            if (
+                now - self._loaded_at < self.min_refresh_interval
+                or now - self._failed_at < self.retry_interval
+            ):
+                return
+            try:
+                key_set = jwt.PyJWKSet.from_dict(self._fetch())
+            except (OSError, ValueError, jwt.PyJWKSetError):
+                self._failed_at = time.monotonic()
+                logger.exception(">>>>>> Failed to load JWKS")
+                return
+            self._keys = {key.key_id: key for key in key_set.keys}
+            self._loaded_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def get_key(self, kid: str | None) -> "jwt.PyJWK":
+        """
+        Returns the key of the kid, reloading the key set when it is unknown.
+
+        :param kid: The kid of the token header.
+        :raises DecodeError: If the key is still unknown.
+        """
+        key = self._keys.get(kid)
+        if key is None:
+            self.refresh()
+            key = self._keys.get(kid)
+        if key is None:
+            logger.warning(f">>>>>> Unknown JWT kid: {kid}")
+            raise DecodeError()
+        return key
+
+
+class VerifiedTokenCache:
+    """
+    LRU cache of verified token claims, keyed by the token SHA-256.
+
+    Entries expire with the token (exp claim), so a cached token is never
+    accepted after it would have failed verification.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, claims = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def set(self, token: str, claims: dict[str, Any]) -> None:
+        expires_at = claims.get("exp")
+        if expires_at is None:
+            return
+        with self._lock:
+            self._entries[self._key(token)] = (float(expires_at), claims)
+            self._entries.move_to_end(self._key(token))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class TokenVerifier:
+    """Verifies JWT signatures and claims, skipping the crypto for cached tokens."""
+
+    def __init__(
+        self,
+        key_store: JwksKeyStore,
+        algorithms: list[str],
+        audience: str | None = None,
+        issuer: str | None = None,
+        cache: VerifiedTokenCache | None = None,
+    ):
+        self.key_store = key_store
+        self.algorithms = algorithms
+        self.audience = audience
+        self.issuer = issuer
+        self.cache = cache or VerifiedTokenCache()
+
+    def cached(self, token: str) -> dict[str, Any] | None:
+        """Returns the claims of an already verified token, None when it is not cached."""
+        claims = self.cache.get(token)
+        jwt_cache_lookups.inc(result="miss" if claims is None else "hit")
+        return claims
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """
+        Returns the claims of a valid token.
+
+        :param token: The encoded JWT.
+        :raises DecodeError: If the token is invalid or expired.
+        """
+        claims = self.cached(token)
+        if claims is not None:
+            return claims
+        return self.decode(token)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """
+        Verifies the token and caches its claims. Blocking: an unknown kid
+        reloads the JWKS over the network, run it in the threadpool from
+        async code.
+
+        :param token: The encoded JWT.
+        :raises DecodeError: If the token is invalid or expired.
+        """
+        # pyjwt (and cryptography) are only loaded once a token is verified
+        import jwt
+
+        try:
+            header = jwt.get_unverified_header(token)
+            key = self.key_store.get_key(header.get("kid"))
+            claims = jwt.decode(
+                token,
+                key=key.key,
+                algorithms=self.algorithms,
+                audience=self.audience,
+                issuer=self.issuer,
+                options={"require": ["exp"], "verify_aud": self.audience is not None},
+            )
+        except jwt.PyJWTError as e:
+            logger.error(f"JWT Decode Error: {str(e)}")
+            raise DecodeError()
+
+        self.cache.set(token, claims)
+        return claims
+
+
+@lru_cache
+def get_token_verifier() -> TokenVerifier:
+    """Returns the process wide verifier built from the settings."""
+    return TokenVerifier(
+        JwksKeyStore(
+            url=settings.jwks_url,
+            file=settings.jwks_file,
+            min_refresh_interval=settings.jwks_min_refresh_interval,
+        ),
+        parse_algorithms(settings.algorithms_jwt),
+        audience=settings.jwt_audience,
+        issuer=settings.jwt_issuer,
+        cache=VerifiedTokenCache(settings.jwt_cache_size),
+    )
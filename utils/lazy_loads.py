@@ -0,0 +1,53 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from configs.env import get_settings
+from configs.logging_conf import logger
+
+settings = get_settings()
+
+# N+1 detection is a development aid: the listener costs a ContextVar read
+# per ORM statement, the detection itself only runs on LOCAL
+LAZY_LOAD_DETECTION = settings.environment == "LOCAL"
+
+# relationship ("Model.attr") -> lazy loads, inside a detect_lazy_loads block
+_lazy_loads: ContextVar[Counter | None] = ContextVar("lazy_loads", default=None)
+
+
+@contextmanager
+def detect_lazy_loads(where: str) -> Iterator[None]:
+    """
+    Logs a warning for the relationships lazy loaded inside the block.
+
+    A lazy load per instance of a list is the N+1 query pattern: the
+    relationship should be listed in join_ (see BaseRepository.relationship_loading).
+    DatabaseSessionMiddleware opens it around every request.
+
+    :param where: The name of the block (the request), used in the warning.
+    """
+    if not LAZY_LOAD_DETECTION:
+        yield
+        return
+
+    loads = Counter()
+    token = _lazy_loads.set(loads)
+    try:
+        yield
+    finally:
+        _lazy_loads.reset(token)
+        if loads:
+            details = ", ".join(f"{name} x{count}" for name, count in loads.most_common())
+            logger.warning(f">>>>>> Lazy loads during {where} (N+1 queries): {details}")
+
+
+def record_lazy_load(orm_execute_state) -> None:
+    """do_orm_execute listener counting lazy loads (registered by configs.database)."""
+    loads = _lazy_loads.get()
+    if loads is None or orm_execute_state.lazy_loaded_from is None:
+        return
+    # eager loaders (selectin, subquery) are relationship loads too, but
+    # without an instance to lazy load from
+    if orm_execute_state.is_relationship_load:
+        loads[str(orm_execute_state.loader_strategy_path[-1])] += 1
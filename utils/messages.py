@@ -6,6 +6,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+MESSAGES_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../resources/messages.json"
+)
+
 
 @lru_cache
 def load_messages() -> dict[str, Any]:
@@ -14,10 +18,7 @@ def load_messages() -> dict[str, Any]:
     This is the single source of truth for all error codes and messages.
     """
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        messages_path = os.path.join(current_dir, "../resources/messages.json")
-
-        with open(messages_path, "r", encoding="utf-8") as file:
+        with open(MESSAGES_PATH, "r", encoding="utf-8") as file:
             return json.load(file)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         logger.error(f"Failed to load messages.json: {str(e)}")
@@ -0,0 +1,72 @@
+import base64
+import binascii
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+from typing import Any
+from uuid import UUID
+
+import orjson
+
+from exceptions.app_exception import InvalidCursor
+
+# type tag -> (type, encoder, decoder) of the values allowed in a cursor
+_CURSOR_TYPES = {
+    "dt": (datetime, datetime.isoformat, datetime.fromisoformat),
+    "d": (date, date.isoformat, date.fromisoformat),
+    "t": (time, time.isoformat, time.fromisoformat),
+    "n": (Decimal, str, Decimal),
+    "u": (UUID, str, UUID),
+}
+
+
+def _encode_value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    for tag, (value_type, encoder, _) in _CURSOR_TYPES.items():
+        if isinstance(value, value_type):
+            return [tag, encoder(value)]
+    raise TypeError(f"{type(value).__name__} can not be used in a cursor")
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, list):
+        tag, raw = value
+        return _CURSOR_TYPES[tag][2](raw)
+    return value
+
+
+def encode_cursor(values: tuple) -> str:
+    """
+    Returns an opaque, URL safe token of the keyset values of the last row.
+
+    :param values: The values of the sort column(s) of the last row.
+    :return: The cursor token.
+    """
+    payload = orjson.dumps([_encode_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> tuple:
+    """
+    Returns the keyset values of a cursor token.
+
+    :param cursor: The cursor token returned by encode_cursor.
+    :param size: The expected number of values.
+    :return: The keyset values.
+    :raises InvalidCursor: If the token is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("unexpected cursor size")
+        return tuple(_decode_value(value) for value in values)
+    except (
+        binascii.Error,
+        orjson.JSONDecodeError,
+        InvalidOperation,
+        KeyError,
+        TypeError,
+        ValueError,
+    ):
+        raise InvalidCursor()
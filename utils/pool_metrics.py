@@ -0,0 +1,104 @@
+import time
+from typing import Type
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from utils.metrics import registry
+from utils.request_metrics import add_stage_time
+
+# engine name -> engine, read by the gauges at render time
+_engines: dict[str, Engine] = {}
+
+
+def _pool_gauge(attr: str):
+    def collect():
+        for name, engine in list(_engines.items()):
+            method = getattr(engine.pool, attr, None)
+            if method is not None:
+                yield {"engine": name}, method()
+
+    return collect
+
+
+pool_checkout_seconds = registry.histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a pooled connection.",
+    ["engine"],
+)
+pool_checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that hit the pool timeout.",
+    ["engine"],
+)
+registry.gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    ["engine"],
+    callback=_pool_gauge("checkedout"),
+)
+registry.gauge(
+    "db_pool_overflow",
+    "Connections opened above pool_size (negative while the pool is not full).",
+    ["engine"],
+    callback=_pool_gauge("overflow"),
+)
+registry.gauge(
+    "db_pool_size",
+    "Configured pool size.",
+    ["engine"],
+    callback=_pool_gauge("size"),
+)
+
+
+def instrumented_pool(pool_class: Type[Pool]) -> Type[Pool]:
+    """
+    Returns a subclass of pool_class timing every connection checkout.
+
+    The engine label is the pool logging name (create_engine(pool_logging_name=...)),
+    which survives pool recreation on engine.dispose().
+    """
+
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            name = self._orig_logging_name or "default"
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                pool_checkout_timeouts.inc(engine=name)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                pool_checkout_seconds.observe(elapsed, engine=name)
+                # connection checkout is part of the request session acquisition
+                add_stage_time("session", elapsed)
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    InstrumentedPool.__qualname__ = InstrumentedPool.__name__
+    return InstrumentedPool
+
+
+InstrumentedQueuePool = instrumented_pool(QueuePool)
+InstrumentedAsyncAdaptedQueuePool = instrumented_pool(AsyncAdaptedQueuePool)
+InstrumentedNullPool = instrumented_pool(NullPool)
+
+
+def register_engine(name: str, engine: Engine) -> None:
+    """Publishes the pool gauges of the engine under the given name."""
+    _engines[name] = engine
+
+
+def pool_status() -> dict[str, dict[str, int | str]]:
+    """Returns a snapshot of every registered pool."""
+    status = {}
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        status[name] = {
+            "class": type(pool).__name__,
+            "size": pool.size() if hasattr(pool, "size") else 0,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else 0,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else 0,
+        }
+    return status
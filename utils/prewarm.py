@@ -0,0 +1,62 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+from configs.env import get_settings
+from configs.logging_conf import logger
+from utils.messages import load_messages
+
+settings = get_settings()
+
+
+def _open_sync_connections(count: int) -> None:
+    from configs.database import get_engine
+
+    engine = get_engine()
+    connections = [engine.connect() for _ in range(count)]
+    for connection in connections:
+        # back to the pool, which keeps them open for the first requests
+        connection.close()
+
+
+async def _open_async_connections(count: int) -> None:
+    from configs.database import get_async_engine
+
+    engine = get_async_engine()
+    connections = await asyncio.gather(*[engine.connect() for _ in range(count)])
+    for connection in connections:
+        await connection.close()
+
+
+async def prewarm() -> None:
+    """
+    Does the first request work ahead of it: loads messages.json, imports
+    SQLAlchemy and the driver and opens PREWARM_CONNECTIONS pooled connections.
+
+    Failures are logged only, the app must start even if the database is down.
+    """
+    start = time.perf_counter()
+    load_messages()
+
+    count = min(settings.prewarm_connections, settings.database_pool_size)
+    try:
+        if settings.database_session_mode == "async":
+            await _open_async_connections(count)
+        else:
+            await run_in_threadpool(_open_sync_connections, count)
+    except Exception:
+        logger.exception(">>>>>> Pre-warm of the database connections failed")
+
+    logger.info(f">>>>>> Pre-warm done in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """App lifespan: runs the pre-warm hook at startup when PREWARM_ENABLED."""
+    if settings.prewarm_enabled:
+        await prewarm()
+    yield
@@ -0,0 +1,146 @@
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+
+from configs.env import get_settings
+
+settings = get_settings()
+
+# leaf frames of idle threads (thread pool workers, listeners) are not samples
+_IDLE_FILES = ("threading.py", "queue.py")
+
+# cProfile hooks the event loop thread, shared by every request: one session
+# at a time, or the profiles interleave (and Python 3.12+ refuses a second one)
+_cprofile_lock = threading.Lock()
+
+
+def _collapse(frame) -> str | None:
+    """Returns the collapsed stack (root;...;leaf) of a frame, None when idle."""
+    if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+        return None
+
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """
+    Samples the stacks of every busy thread at a fixed interval.
+
+    Sync handlers run in the thread pool, so all threads are sampled; stacks
+    of requests running concurrently show up in the same profile.
+    """
+
+    def __init__(self, interval: float, exclude: set[int] | None = None):
+        self.interval = interval
+        self.exclude = exclude or set()
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or thread_id in self.exclude:
+                    continue
+                stack = _collapse(frame)
+                if stack is not None:
+                    self.samples[stack] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: str) -> None:
+        """Writes the samples in the collapsed-stack format (flamegraph.pl, speedscope)."""
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """Profiles one request with the mode configured by PROFILING_MODE."""
+
+    def __init__(self, exclude: set[int] | None = None):
+        self.mode = settings.profiling_mode
+        if self.mode == "cprofile":
+            # only sees the calling (event loop) thread
+            self._profiler = cProfile.Profile()
+        else:
+            self._profiler = StackSampler(settings.profiling_interval_ms / 1000, exclude)
+
+    def start(self) -> bool:
+        """
+        Starts profiling.
+
+        :return: False when a cProfile session is already running, the
+            request is then not profiled.
+        """
+        if self.mode != "cprofile":
+            self._profiler.start()
+            return True
+
+        if not _cprofile_lock.acquire(blocking=False):
+            return False
+        try:
+            self._profiler.enable()
+        except ValueError:
+            # another profiler is active (Python 3.12+ sys.monitoring)
+            _cprofile_lock.release()
+            return False
+        return True
+
+    def stop(self) -> None:
+        if self.mode == "cprofile":
+            self._profiler.disable()
+            _cprofile_lock.release()
+        else:
+            self._profiler.stop()
+
+    def save(self, name: str) -> str:
+        """
+        Writes the profile as <PROFILING_DIR>/<name>.pstats|.folded and prunes
+        the oldest profiles beyond PROFILING_MAX_FILES / PROFILING_MAX_BYTES.
+
+        :param name: The file name, usually the request id.
+        :return: The profile path.
+        """
+        os.makedirs(settings.profiling_dir, exist_ok=True)
+        if self.mode == "cprofile":
+            path = os.path.join(settings.profiling_dir, f"{name}.pstats")
+            self._profiler.dump_stats(path)
+        else:
+            path = os.path.join(settings.profiling_dir, f"{name}.folded")
+            self._profiler.dump(path)
+
+        prune_profiles(settings.profiling_dir, settings.profiling_max_files, settings.profiling_max_bytes)
+        return path
+
+
+def prune_profiles(directory: str, max_files: int, max_bytes: int) -> None:
+    """Deletes the oldest profiles until the directory fits both limits."""
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith((".pstats", ".folded")):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    while entries and (len(entries) > max_files or total > max_bytes):
+        _, size, path = entries.pop(0)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,248 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.loading import merge_frozen_result
+from sqlalchemy.util import LRUCache
+
+from configs.env import get_settings
+from configs.logging_conf import logger
+from utils.metrics import registry
+
+settings = get_settings()
+
+# execution option enabling the cache for a statement, value = TTL in seconds
+CACHE_TTL_OPTION = "query_cache_ttl"
+
+# tables written in the current transaction of a session, invalidated on commit
+_CHANGED_TABLES = "query_cache_changed_tables"
+
+query_cache_lookups = registry.counter(
+    "query_cache_lookups_total",
+    "Query result cache lookups.",
+    ["table", "result"],
+)
+query_cache_invalidations = registry.counter(
+    "query_cache_invalidations_total",
+    "Query result cache invalidations (committed writes).",
+    ["table"],
+)
+
+
+class QueryCacheBackend:
+    """
+    Storage of the query cache.
+
+    Values are opaque bytes. Every table has a generation number, part of the
+    keys of the results read from it: bumping it invalidates all of them at
+    once, stale entries simply age out.
+    """
+
+    def get(self, key: str) -> bytes | None:
+        raise NotImplementedError()  # pragma: no cover
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError()  # pragma: no cover
+
+    def generations(self, tables: list[str]) -> list[int]:
+        raise NotImplementedError()  # pragma: no cover
+
+    def bump(self, table: str) -> None:
+        raise NotImplementedError()  # pragma: no cover
+
+    def ping(self) -> None:
+        """Raises when the backend is unreachable (health check)."""
+
+
+class MemoryCacheBackend(QueryCacheBackend):
+    """
+    In-process LRU cache with a TTL per entry.
+
+    Invalidations are only seen by the current process: use a shared backend
+    when several workers write the cached tables.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def generations(self, tables: list[str]) -> list[int]:
+        return [self._generations.get(table, 0) for table in tables]
+
+    def bump(self, table: str) -> None:
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend(QueryCacheBackend):
+    """
+    Redis backed cache, shared (with its invalidations) by every worker.
+
+    Requires the redis package. Calls are blocking: with async sessions they
+    run on the event loop, keep the Redis server close to the app.
+    """
+
+    def __init__(self, url: str | None = None, client=None, prefix: str = "qc:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("The redis package is required by RedisCacheBackend") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    def generations(self, tables: list[str]) -> list[int]:
+        values = self.client.mget([f"{self.prefix}gen:{table}" for table in tables])
+        return [int(value or 0) for value in values]
+
+    def bump(self, table: str) -> None:
+        self.client.incr(f"{self.prefix}gen:{table}")
+
+    def ping(self) -> None:
+        self.client.ping()
+
+
+class QueryCache:
+    """
+    Read-through cache of ORM statement results.
+
+    Statements executed with the query_cache_ttl execution option are served
+    from the backend; results are stored frozen (FrozenResult) and merged into
+    the reading session without a database round trip.
+    """
+
+    def __init__(self, backend: QueryCacheBackend):
+        self.backend = backend
+        # compiled SQL strings by statement cache key, used to build the keys
+        self._statement_cache = LRUCache(1000)
+
+    def key(self, orm_execute_state, tables: list[str]) -> str:
+        statement = orm_execute_state.statement
+        sql = statement._generate_cache_key().to_offline_string(
+            self._statement_cache, statement, orm_execute_state.parameters or {}
+        )
+        generations = self.backend.generations(tables)
+        digest = hashlib.sha256(sql.encode()).hexdigest()
+        return ":".join(f"{t}@{g}" for t, g in zip(tables, generations)) + ":" + digest
+
+    def execute(self, orm_execute_state, ttl: float):
+        """Returns the result of the statement, from the cache when possible."""
+        session = orm_execute_state.session
+        tables = sorted(
+            {table.fullname for mapper in orm_execute_state.all_mappers for table in mapper.tables}
+        )
+        label = tables[0] if tables else ""
+
+        # own uncommitted writes must be visible to the session
+        changed = session.info.get(_CHANGED_TABLES) or set()
+        if session.new or session.dirty or session.deleted or changed.intersection(tables):
+            query_cache_lookups.inc(table=label, result="bypass")
+            return None
+
+        key = self.key(orm_execute_state, tables)
+        try:
+            cached = self.backend.get(key)
+        except Exception:
+            logger.exception(">>>>>> Query cache read failed")
+            return None
+
+        if cached is None:
+            query_cache_lookups.inc(table=label, result="miss")
+            frozen = orm_execute_state.invoke_statement().freeze()
+            try:
+                self.backend.set(key, pickle.dumps(frozen), ttl)
+            except Exception:
+                logger.exception(">>>>>> Query cache write failed")
+        else:
+            query_cache_lookups.inc(table=label, result="hit")
+            frozen = pickle.loads(cached)
+
+        return merge_frozen_result(session, orm_execute_state.statement, frozen, load=False)()
+
+    def invalidate(self, tables: set[str]) -> None:
+        for table in tables:
+            try:
+                self.backend.bump(table)
+            except Exception:
+                logger.exception(f">>>>>> Query cache invalidation failed: {table}")
+                continue
+            query_cache_invalidations.inc(table=table)
+
+
+@lru_cache
+def get_query_cache() -> QueryCache:
+    """Returns the process wide cache, backend selected by QUERY_CACHE_BACKEND."""
+    if settings.query_cache_backend == "redis":
+        return QueryCache(RedisCacheBackend(settings.query_cache_redis_url))
+    return QueryCache(MemoryCacheBackend(settings.query_cache_size))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _cached_execute(orm_execute_state):
+    if orm_execute_state.is_select:
+        ttl = orm_execute_state.execution_options.get(CACHE_TTL_OPTION)
+        if ttl:
+            return get_query_cache().execute(orm_execute_state, ttl)
+        return None
+
+    # bulk INSERT/UPDATE/DELETE statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table
+        orm_execute_state.session.info.setdefault(_CHANGED_TABLES, set()).add(table.fullname)
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_tables(session: Session, _flush_context) -> None:
+    changed = session.info.setdefault(_CHANGED_TABLES, set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        changed.update(table.fullname for table in inspect(instance).mapper.tables)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_tables(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_TABLES, None)
+    if changed:
+        get_query_cache().invalidate(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tables(session: Session) -> None:
+    session.info.pop(_CHANGED_TABLES, None)
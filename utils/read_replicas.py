@@ -0,0 +1,131 @@
+import itertools
+import threading
+import time
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from configs.logging_conf import logger
+from utils.metrics import registry
+
+# execution option of the statements a replica may serve (BaseRepository reads)
+REPLICA_OPTION = "use_replica"
+
+replica_reads = registry.counter(
+    "db_replica_reads_total",
+    "Repository reads routed to a read replica.",
+    ["engine"],
+)
+replica_fallbacks = registry.counter(
+    "db_replica_fallbacks_total",
+    "Replica eligible reads sent to the primary because no replica was healthy.",
+)
+replica_failures = registry.counter(
+    "db_replica_failures_total",
+    "Connection failures that took a replica out of the rotation.",
+    ["engine"],
+)
+
+
+class ReplicaSet:
+    """
+    The read replica engines, picked round-robin among the healthy ones.
+
+    A replica whose connection fails (or whose health check fails) is left out
+    for retry_interval seconds; the next read after that tries it again.
+    """
+
+    def __init__(self, engines: dict[str, Engine], retry_interval: float = 30):
+        self.engines = engines
+        self.retry_interval = retry_interval
+        self._down_until: dict[str, float] = {}
+        self._names = itertools.cycle(list(engines))
+        self._lock = threading.Lock()
+
+        for name, engine in engines.items():
+            event.listen(engine, "handle_error", self._on_error(name))
+
+    def _on_error(self, name: str):
+        def handle_error(context) -> None:
+            # connect failures (no connection yet) and lost connections only,
+            # a failing statement says nothing about the replica health
+            if context.connection is None or context.is_disconnect:
+                self.mark_down(name)
+
+        return handle_error
+
+    def mark_down(self, name: str) -> None:
+        if self.is_healthy(name):
+            logger.warning(f">>>>>> Read replica {name} is down, reads go to the primary")
+            replica_failures.inc(engine=name)
+        self._down_until[name] = time.monotonic() + self.retry_interval
+
+    def mark_up(self, name: str) -> None:
+        self._down_until.pop(name, None)
+
+    def is_healthy(self, name: str) -> bool:
+        return self._down_until.get(name, 0) <= time.monotonic()
+
+    def choose(self) -> str | None:
+        """Returns the name of the next healthy replica, None when none is."""
+        with self._lock:
+            for _ in range(len(self.engines)):
+                name = next(self._names)
+                if self.is_healthy(name):
+                    replica_reads.inc(engine=name)
+                    return name
+        replica_fallbacks.inc()
+        return None
+
+
+class RoutingSession(Session):
+    """
+    Session sending the statements marked with the use_replica execution
+    option to a read replica, everything else to the primary (its bind).
+
+    Once the transaction has written (flushed or bulk DML), every statement
+    goes to the primary so that the transaction reads its own writes; SELECT
+    ... FOR UPDATE always does. A read whose replica cannot be reached is run
+    again on the primary.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        # replica picked by the last get_bind, None when it was the primary
+        self.replica_name: str | None = None
+
+    def get_bind(self, mapper=None, *, clause=None, bind=None, **kwargs):
+        self.replica_name = None
+        if (
+            self.replicas is not None
+            and bind is None
+            and clause is not None
+            and not self._flushing
+            and not self.info.get("has_writes")
+            and getattr(clause, "_execution_options", {}).get(REPLICA_OPTION)
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            self.replica_name = self.replicas.choose()
+            if self.replica_name is not None:
+                return self.replicas.engines[self.replica_name]
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _fallback_to_primary(orm_execute_state: ORMExecuteState):
+    """Runs a replica read again on the primary when the replica turned out to be down."""
+    session = orm_execute_state.session
+    if session.replicas is None or not orm_execute_state.execution_options.get(REPLICA_OPTION):
+        return None
+
+    try:
+        return orm_execute_state.invoke_statement()
+    except DBAPIError:
+        # handle_error marks the replica down on connection failures only
+        name = session.replica_name
+        if name is None or session.replicas.is_healthy(name):
+            raise
+        replica_fallbacks.inc()
+        return orm_execute_state.invoke_statement(bind_arguments={"bind": session.bind})
@@ -0,0 +1,115 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from configs.context import request_timings
+from utils.metrics import registry
+
+# buckets (bytes) of the response size histogram
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+# buckets of the per request query count histogram
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Wall time of HTTP requests.",
+    ["method", "route", "status"],
+)
+http_request_stage_seconds = registry.histogram(
+    "http_request_stage_seconds",
+    "Wall time of the request pipeline stages.",
+    ["route", "stage"],
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+http_request_db_seconds = registry.histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request.",
+    ["route"],
+)
+http_response_size_bytes = registry.histogram(
+    "http_response_size_bytes",
+    "Size of the response bodies.",
+    ["route"],
+    buckets=SIZE_BUCKETS,
+)
+
+
+class RequestTimings:
+    """Per request measurements, shared through the request_timings context var."""
+
+    __slots__ = ("started", "stages", "db_queries", "db_seconds", "response_size")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.response_size = 0
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_query(self, seconds: float) -> None:
+        self.db_queries += 1
+        self.db_seconds += seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def mark_response_start(self) -> None:
+        """
+        Records the handler stage: the time to the response start minus every
+        other recorded stage.
+        """
+        self.stages["handler"] = max(self.elapsed() - sum(self.stages.values()), 0.0)
+
+    def server_timing(self) -> str:
+        """Returns the Server-Timing header value (durations in milliseconds)."""
+        metrics = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        metrics.append(f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_queries} queries"')
+        metrics.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+@contextmanager
+def record_stage(name: str) -> Iterator[None]:
+    """Adds the wall time of the block to the given stage of the current request."""
+    timings = request_timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_stage(name, time.perf_counter() - start)
+
+
+def add_stage_time(name: str, seconds: float) -> None:
+    """Adds seconds to the given stage of the current request, if any."""
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add_stage(name, seconds)
+
+
+def add_query_time(seconds: float) -> None:
+    """Counts a SQL statement in the current request, if any."""
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add_query(seconds)
+
+
+def observe_request(timings: RequestTimings, method: str, route: str, status: int) -> None:
+    """Publishes the measurements of a finished request."""
+    http_request_seconds.observe(timings.elapsed(), method=method, route=route, status=str(status))
+    for name, seconds in timings.stages.items():
+        http_request_stage_seconds.observe(seconds, route=route, stage=name)
+    http_request_db_queries.observe(timings.db_queries, route=route)
+    http_request_db_seconds.observe(timings.db_seconds, route=route)
+    http_response_size_bytes.observe(timings.response_size, route=route)
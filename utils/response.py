@@ -1,57 +1,292 @@
-from datetime import datetime
+from datetime import date, datetime, time
+from decimal import Decimal
 from http import HTTPStatus
+from typing import TYPE_CHECKING, AsyncIterable, Callable, Iterable
+from uuid import UUID
 
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 
+from configs.logging_conf import logger
 from exceptions.saiene_exception import SaieneException
+from exceptions.system_exception import SystemException
+from utils.error_catalog import FAIL_PREFIX, FAIL_SUFFIX
+from utils.request_metrics import record_stage
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Row
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# number of rows encoded per chunk written by response_stream
+STREAM_CHUNK_ROWS = 500
+
+Serializer = Callable[[any], any]
+
+
+def _identity(data: any) -> any:
+    return data
+
+
+def _format_datetime(data: datetime) -> str:
+    # isoformat is much cheaper than strftime and identical for 4 digit years
+    if data.year >= 1000:
+        return data.isoformat(" ", "seconds")[:19]
+    return data.strftime(DATETIME_FORMAT)  # pragma: no cover
+
+
+def _serialize_dict(data: dict) -> dict:
+    return {key: serialize_data(value) for key, value in data.items()}
+
+
+def _serialize_list(data: list | tuple) -> list:
+    return [serialize_data(item) for item in data]
+
+
+def _serialize_row(data: "Row") -> dict:
+    return {key: serialize_data(value) for key, value in data._mapping.items()}
+
+
+# exact type -> serializer, extended at runtime by _resolve_serializer
+_SERIALIZERS: dict[type, Serializer] = {
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    type(None): _identity,
+    datetime: _format_datetime,
+    dict: _serialize_dict,
+    list: _serialize_list,
+    tuple: _serialize_list,
+    Decimal: str,
+    UUID: str,
+    date: str,
+    time: str,
+}
+
+_PASSTHROUGH_TYPES = frozenset(
+    python_type for python_type, serializer in _SERIALIZERS.items() if serializer is _identity
+)
+
+
+def _column_serializer(python_type: type) -> Serializer | None:
+    """Returns a serializer specialized for the python type of a mapped column."""
+    serializer = _SERIALIZERS.get(python_type)
+    if serializer is None or serializer is _identity:
+        return serializer
+
+    def serialize(value: any) -> any:
+        if type(value) is python_type:
+            return serializer(value)
+        return serialize_data(value)
+
+    return serialize
+
+
+def _column_plan(cls: type) -> dict[str, Serializer]:
+    """Returns the per-column serializers of a SQLAlchemy mapped class."""
+    # resolved once per class: SQLAlchemy is not needed to import this module
+    from sqlalchemy import inspect as sa_inspect
+
+    mapper = sa_inspect(cls, raiseerr=False)
+    if mapper is None or not hasattr(mapper, "column_attrs"):
+        return {}
+
+    plan = {}
+    for attr in mapper.column_attrs:
+        try:
+            python_type = attr.columns[0].type.python_type
+        except (NotImplementedError, IndexError):
+            continue
+        serializer = _column_serializer(python_type)
+        if serializer is not None:
+            plan[attr.key] = serializer
+    return plan
+
+
+def _object_serializer(cls: type) -> Serializer:
+    """Returns a serializer of the public __dict__ attributes of cls instances."""
+    plan = _column_plan(cls)
+
+    def serialize(data: any) -> dict:
+        result = {}
+        for key, value in data.__dict__.items():
+            if key[:1] == "_":
+                continue
+            if type(value) in _PASSTHROUGH_TYPES:
+                result[key] = value
+            else:
+                result[key] = plan.get(key, serialize_data)(value)
+        return result
+
+    return serialize
+
+
+def _resolve_serializer(data: any) -> Serializer:
+    """Picks the serializer for a type not seen before (same rules as the type checks)."""
+    from sqlalchemy.engine import Row
+
+    if hasattr(data, "__dict__"):
+        return _object_serializer(type(data))
+    elif isinstance(data, Row):
+        return _serialize_row
+    elif isinstance(data, dict):
+        return _serialize_dict
+    elif isinstance(data, (list, tuple)):
+        return _serialize_list
+    elif isinstance(data, datetime):
+        return _format_datetime
+    elif isinstance(data, (str, int, float, bool)):
+        return _identity
+    else:
+        return str
 
 
 def serialize_data(data: any) -> any:
     """
     Serialize different types of data to JSON-compatible format.
 
+    Serializers are resolved once per type and cached; mapped SQLAlchemy
+    classes get a per-column plan built from their column types.
+
     Args:
         data (Any): The data to be serialized.
 
     Returns:
         Any: Serialized data.
     """
-    if hasattr(data, "__dict__"):
-        data_dict: dict[str, any] = data.__dict__
-        data = {k: v for k, v in data_dict.items() if not k.startswith("_")}
-        return serialize_data(data)
-    elif isinstance(data, dict):
-        return {key: serialize_data(value) for key, value in data.items()}
-    elif isinstance(data, (list, tuple)):
-        return [serialize_data(item) for item in data]
-    elif isinstance(data, datetime):
-        return data.strftime("%Y-%m-%d %H:%M:%S")
-    elif isinstance(data, (str, int, float, bool, type(None))):
-        return data
-    else:
-        return str(data)
+    serializer = _SERIALIZERS.get(type(data))
+    if serializer is None:
+        serializer = _SERIALIZERS[type(data)] = _resolve_serializer(data)
+    return serializer(data)
+
+
+def response_success(data: any, etag: str | None = None):
+    """
+    Returns the success envelope of the data.
+
+    :param data: The data to serialize.
+    :param etag: The ETag of the data (utils.etag.fingerprint_etag), computed
+        from the body by ETagMiddleware when None.
+    """
+    with record_stage("serialization"):
+        return ORJSONResponse(
+            content={"success": True, "data": serialize_data(data), "errors": []},
+            status_code=HTTPStatus.OK,
+            headers={"ETag": etag} if etag else None,
+        )
+
+
+def response_not_modified(etag: str):
+    """
+    Returns the 304 answering a conditional GET whose If-None-Match matches,
+    e.g. before querying and serializing a list:
+
+    etag = fingerprint_etag("facility", *repository.fingerprint(), request.url.query)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return response_not_modified(etag)
+    return response_success(repository.get_all(), etag=etag)
+    """
+    return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={"ETag": etag})
+
+
+def _encode_rows(rows: list, ndjson: bool, first: bool) -> bytes:
+    encoded = [orjson.dumps(serialize_data(row), option=orjson.OPT_NON_STR_KEYS) for row in rows]
+    if ndjson:
+        return b"\n".join(encoded) + b"\n"
+    return (b"" if first else b",") + b",".join(encoded)
+
+
+def _stream_head(ndjson: bool) -> bytes:
+    return b'{"success":true,"errors":[]}\n' if ndjson else b'{"success":true,"data":['
 
 
-def response_success(data: any):
-    return JSONResponse(
-        content={"success": True, "data": serialize_data(data), "errors": []},
+def _stream_tail(ndjson: bool, exc: SaieneException | None = None) -> bytes:
+    errors = [] if exc is None else [{"code": exc.error_code, "message": exc.message}]
+    if ndjson:
+        return b"" if exc is None else orjson.dumps({"success": False, "errors": errors}) + b"\n"
+    return b'],"errors":' + orjson.dumps(errors) + b"}"
+
+
+def _iter_stream(rows: Iterable, ndjson: bool) -> Iterable[bytes]:
+    yield _stream_head(ndjson)
+    first, batch = True, []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= STREAM_CHUNK_ROWS:
+                yield _encode_rows(batch, ndjson, first)
+                first, batch = False, []
+        if batch:
+            yield _encode_rows(batch, ndjson, first)
+    except Exception:
+        # the status line is already sent: report the failure in the envelope
+        logger.exception("")
+        yield _stream_tail(ndjson, SystemException())
+        return
+    yield _stream_tail(ndjson)
+
+
+async def _aiter_stream(rows: AsyncIterable, ndjson: bool) -> AsyncIterable[bytes]:
+    yield _stream_head(ndjson)
+    first, batch = True, []
+    try:
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= STREAM_CHUNK_ROWS:
+                yield _encode_rows(batch, ndjson, first)
+                first, batch = False, []
+        if batch:
+            yield _encode_rows(batch, ndjson, first)
+    except Exception:
+        logger.exception("")
+        yield _stream_tail(ndjson, SystemException())
+        return
+    yield _stream_tail(ndjson)
+
+
+def response_stream(rows: Iterable | AsyncIterable, ndjson: bool = False):
+    """
+    Streams rows (e.g. BaseRepository.stream) inside the success envelope.
+
+    JSON writes {"success":true,"data":[...],"errors":[]} incrementally;
+    NDJSON writes a {"success":true,"errors":[]} header line followed by one
+    row per line. A failure while iterating is reported in the envelope since
+    the status code has already been sent.
+
+    :param rows: The rows to serialize, sync or async iterable.
+    :param ndjson: Whether to use the NDJSON form.
+    :return: The streaming response.
+    """
+    if hasattr(rows, "__aiter__"):
+        content = _aiter_stream(rows, ndjson)
+    else:
+        content = _iter_stream(rows, ndjson)
+
+    return StreamingResponse(
+        content,
         status_code=HTTPStatus.OK,
+        media_type="application/x-ndjson" if ndjson else "application/json",
     )
 
 
 def response_fail(exc: SaieneException | list[SaieneException]):
+    """
+    Returns the failed response of one or several errors.
+
+    Bodies come pre-encoded from the error catalog (utils.error_catalog);
+    ValidationErrors (or a list) returns every error in one response.
+    """
     if isinstance(exc, list):
-        errors = [{"code": e.error_code, "message": e.message} for e in exc]
+        errors = exc
         status_code = exc[0].http_code if exc else HTTPStatus.INTERNAL_SERVER_ERROR
     else:
-        errors = [{"code": exc.error_code, "message": exc.message}]
+        errors = getattr(exc, "errors", None)
         status_code = exc.http_code
 
-    return JSONResponse(
-        content={
-            "success": False,
-            "data": None,
-            "errors": errors,
-        },
-        status_code=status_code,
-    )
+    if errors is None:
+        body = exc.response_body()
+    else:
+        body = FAIL_PREFIX + b",".join(e.error_json() for e in errors) + FAIL_SUFFIX
+
+    return Response(content=body, status_code=status_code, media_type="application/json")
@@ -0,0 +1,80 @@
+import logging
+import random
+import time
+
+from sqlalchemy import Engine, event
+
+from configs.env import get_settings
+from utils.metrics import registry
+from utils.request_metrics import add_query_time
+
+settings = get_settings()
+
+# child of the app logger: records get the request id from its handler filter
+sql_logger = logging.getLogger("app.fastapi.sql")
+
+# longest parameters repr written in a log entry
+MAX_LOGGED_PARAMETERS = 500
+
+db_query_seconds = registry.histogram(
+    "db_query_seconds",
+    "Duration of SQL statements.",
+    ["engine", "operation"],
+)
+db_slow_queries = registry.counter(
+    "db_slow_queries_total",
+    "SQL statements slower than SQL_SLOW_THRESHOLD_MS.",
+    ["engine", "operation"],
+)
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:8].split(None, 1)
+    return head[0].upper() if head else ""
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Records the duration of every statement of the engine and logs the slow
+    or sampled ones.
+
+    A statement is logged when it is slower than SQL_SLOW_THRESHOLD_MS
+    (warning) or picked by SQL_LOG_SAMPLE_RATE (info). Full statement echo is
+    left to the sqlalchemy.engine logger, enabled on LOCAL only.
+
+    :param engine: The (sync) engine to instrument.
+    :param name: The engine name used as metrics label.
+    """
+    slow_threshold = settings.sql_slow_threshold_ms / 1000
+    sample_rate = settings.sql_log_sample_rate
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        operation = _operation(statement)
+        db_query_seconds.observe(elapsed, engine=name, operation=operation)
+        add_query_time(elapsed)
+
+        if elapsed >= slow_threshold:
+            db_slow_queries.inc(engine=name, operation=operation)
+            level = logging.WARNING
+        elif sample_rate and random.random() < sample_rate:
+            level = logging.INFO
+        else:
+            return
+
+        if sql_logger.isEnabledFor(level):
+            sql_logger.log(
+                level,
+                "SQL %s %.1f ms%s: %s | %.*s",
+                name,
+                elapsed * 1000,
+                " (executemany)" if executemany else "",
+                " ".join(statement.split()),
+                MAX_LOGGED_PARAMETERS,
+                repr(parameters),
+            )